@@ -1,38 +1,157 @@
 import pandas as pd
 import numpy as np
-import subprocess
+import threading
+import time
+import sys
 import os
+from functools import partial
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
 
 from modules import cleaning
+from modules import config, dataset, chunking, tasks
 
 
-def main():
-    if not os.path.exists('data/dados.csv'):
+def print_dry_run(report: dict):
+    """Exibe o relatório da execução simulada (ver ``cleaning.dry_run``)."""
+    total = 'estimadas' if report['total_rows_estimated'] else 'lidas'
+    print(f"Amostra de {report['sample_rows']} de {report['total_rows']} linhas ({total}) em {report['seconds']:.1f} s")
+    print(f"{'':<32}{'amostra':>10}{'projeção':>12}{'IC 95%':>26}")
+
+    def show(name: str, projection: dict):
+        interval = f"[{projection['low']}, {projection['high']}]"
+        print(f"{name:<32}{projection['sample']:>10}{projection['rows']:>12}{interval:>26}")
+
+    show('linhas mantidas', report['kept'])
+    for title, key in [('Linhas removidas por etapa', 'stages'), ('Linhas rejeitadas por restrição', 'rejections'),
+                       ('Linhas que violam cada regra', 'violations')]:
+        if report[key]:
+            print(title)
+            for name, projection in report[key].items():
+                show(f'  {name}', projection)
+
+
+# Trava das tarefas que geram gráficos: a figura atual e as configurações do matplotlib
+# são globais e não podem ser usadas por várias threads ao mesmo tempo
+figure_lock = threading.Lock()
+
+
+def figure(function, *arguments):
+    """Adapta uma função que gera um gráfico para uma tarefa do grafo: as configurações
+    do matplotlib alteradas pela função são desfeitas e as figuras são fechadas, para
+    não afetarem os gráficos das outras tarefas, como ocorria com um processo por
+    análise."""
+    def task(*results):
+        with plt.rc_context():
+            function(*arguments, *results)
+        plt.close('all')
+
+    return task
+
+
+def clean(path_input: str, path_output: str, config_data: dict) -> str:
+    """Limpa os dados, se necessário, e retorna o endereço dos dados tratados."""
+    input_pattern = config_data.get('input_pattern')
+
+    if input_pattern:
+        # Limpa os anos ainda não limpos; os anos já limpos são pulados
+        print('-' * 80)
+        print('Limpando base de dados de cada ano...')
+
+        cleaning.load_batch(input_pattern, path_output)
+
+    # Limpa os dados se ainda não existirem, se a última limpeza foi interrompida ou se
+    # o arquivo de entrada ou as configurações mudaram desde a última limpeza
+    elif not cleaning.is_cleaned(path_input, path_output, config_data):
         print('-' * 80)
         print('Limpando base de dados...')
 
-        cleaning.load_data('data/SINASC_2021.csv', 'data/dados.csv')
-    
-    print('-' * 80)
-    print('Gerando imagens para análise 1...')
+        cleaning.load_data(path_input, path_output)
 
-    subprocess.run(['python', 'modules/analysis/yure/make_images.py'])
+    return path_output
 
+
+def prepare_columns(path_output: str) -> str:
+    """Converte os dados tratados em um arquivo por coluna, lido pelas análises sem
+    reprocessar o CSV; a conversão só é refeita se os dados tratados mudarem."""
     print('-' * 80)
-    print('Gerando imagens para análise 2...')
+    print('Preparando as colunas para as análises...')
 
-    subprocess.run(['python', 'modules/analysis/saulo/make_images.py'])
+    dataset.build_column_store(path_output)
 
     print('-' * 80)
-    print('Gerando imagens para análise 3...')
+    print('Gerando imagens das análises...')
 
-    subprocess.run(['python', 'modules/analysis/henzo/make_images.py'])
+    return path_output
 
-    print('-' * 80)
-    print('Gerando imagens para análise 4...')
 
-    subprocess.run(['python', 'modules/analysis/mattos/make_images.py'])
+def analysis_graph(path_input: str, path_output: str, config_data: dict) -> tasks.TaskGraph:
+    """Declara as tarefas da limpeza, da preparação dos dados e de cada análise e
+    gráfico. Os dados lidos por uma análise são compartilhados pelos seus gráficos."""
+    yure, = tasks.import_modules('modules/analysis/yure', ['make_images'])
+    saulo, = tasks.import_modules('modules/analysis/saulo', ['make_images'])
+    henzo, = tasks.import_modules('modules/analysis/henzo', ['analysis'])
+    mattos, = tasks.import_modules('modules/analysis/mattos', ['make_images'])
+
+    graph = tasks.TaskGraph()
+    graph.add('limpeza', partial(clean, path_input, path_output, config_data))
+    graph.add('colunas', prepare_columns, ['limpeza'])
+
+    # Análise 1: Raça/cor da mãe e saúde materna
+    for name, data, plot in [('consprenat', yure.analysis.dados_racacormae_consprenat, yure.grafico_consprenat),
+                             ('locnasc', yure.analysis.dados_racacormae_locnasc, yure.grafico_locnasc),
+                             ('parto', yure.analysis.dados_racacormae_parto, yure.grafico_parto)]:
+        graph.add(f'yure.{name}', data, ['colunas'])
+        graph.add(f'yure.{name}.grafico', figure(plot), [f'yure.{name}'], figure_lock)
+
+    # Análise 2: os dados são lidos uma única vez e separados por região e por estado
+    graph.add('saulo.dados', saulo.ler_dados, ['colunas'])
+    graph.add('saulo.regioes', partial(saulo.analysis.separate_by_location, mapping=saulo.region_mapping), ['saulo.dados'])
+    graph.add('saulo.estados', partial(saulo.analysis.separate_by_location, mapping=saulo.state_mapping), ['saulo.dados'])
+    graph.add('saulo.barras', figure(saulo.grafico_barras), ['saulo.regioes'], figure_lock)
+    graph.add('saulo.boxplot', figure(saulo.grafico_boxplot), ['saulo.regioes'], figure_lock)
+    graph.add('saulo.mapa', figure(saulo.mapa_calor), ['saulo.estados'], figure_lock)
+
+    # Análise 3: Saúde do recém-nascido por raça/cor
+    for name in ['peso', 'apgar_raca', 'filmort_raca']:
+        graph.add(f'henzo.{name}', getattr(henzo, f'dados_{name}'), ['colunas'])
+        graph.add(f'henzo.{name}.grafico', figure(getattr(henzo, f'grafico_{name}')), [f'henzo.{name}'], figure_lock)
+
+    # Análise 4: os gráficos usam as frequências já calculadas em modules/analysis/mattos
+    # e não dependem da limpeza
+    for campo, xlabel_rotate, y_config in mattos.campos:
+        graph.add(f'mattos.desv.{campo}', figure(mattos.graph_desv, campo), lock=figure_lock)
+        graph.add(f'mattos.br.{campo}', figure(mattos.graph_BR, campo, xlabel_rotate), lock=figure_lock)
+        graph.add(f'mattos.uf.{campo}', figure(mattos.graph_UF, campo, xlabel_rotate, y_config), lock=figure_lock)
+
+    return graph
+
+
+def main():
+    path_input = 'data/SINASC_2021.csv'
+    path_output = dataset.dataset_path()
+    config_data = config.load_config()
+
+    # Execução simulada: estima o efeito das configurações em uma amostra, sem limpar os dados
+    if '--dry-run' in sys.argv[1:]:
+        print_dry_run(cleaning.dry_run(path_input))
+        return
+
+    # Orçamento de memória usado na divisão em blocos das análises
+    if config_data.get('memory_budget_mb') is not None:
+        os.environ[chunking.budget_variable] = str(config_data['memory_budget_mb'])
+
+    # Executa a limpeza, as análises e os gráficos no mesmo processo; tarefas
+    # independentes são executadas ao mesmo tempo
+    start = time.perf_counter()
+    graph = analysis_graph(path_input, path_output, config_data)
+    graph.run()
+
+    print('-' * 80)
+    print(f'Concluído em {time.perf_counter() - start:.1f} s (soma das tarefas: {sum(graph.seconds.values()):.1f} s)')
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
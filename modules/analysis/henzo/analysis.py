@@ -8,6 +8,7 @@ Funcionalidades:
 - Analisa os dados do índice APGAR por raça, cria um gráfico e o salva.
 - Analisa a quantidade de filhos mortos por raça, cria um gráfico e o salva.
 - Analisa o peso do bebê em relação à idade da mãe, cria um gráfico de dispersão e o salva.
+- Calcula os dados de cada gráfico separadamente da sua criação, para que os cálculos possam ser executados ao mesmo tempo que outros gráficos são criados.
 
 """
 
@@ -16,9 +17,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 import doctest
+import os
+import sys
 
-def analise_peso(path_input: str):
-    """ Trabalha com os dados limpos e plota o histograma PESO, salvando-o em ./images/.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+import dataset
+
+def dados_peso(path_input: str) -> pd.DataFrame:
+    """ Conta os pesos dos bebês nascidos com 39 a 41 semanas de gestação, por raça/cor da mãe, em intervalos de 100 gramas.
 
     Parameters
     ----------
@@ -27,20 +34,17 @@ def analise_peso(path_input: str):
 
     Returns
     -------
-    None
-
-    Examples
-    --------
-    >>> analise_peso('data/dados.csv')
+    pd.DataFrame
+        Frequências de cada intervalo de peso por raça/cor, com uma linha com o total
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de dados não existe
+    KeyError
+        O arquivo não possui as colunas utilizadas
     """
 
-    # Abre os dados filtrados
-    try:
-        df = pd.read_csv(path_input, encoding="unicode_escape", engine="python", sep=";", iterator=True, chunksize=100000)
-    except FileNotFoundError:
-        print(f"Erro: Arquivo {path_input} não encontrado.")
-        return
-    
     # Índice usado na iteração
     RACACOR_index = [1, 2, 3, 4, 5]
     PESO_index = [0] + np.arange(1000, 7101, 100).tolist()
@@ -48,16 +52,12 @@ def analise_peso(path_input: str):
     # Dataframe que contará as frequências
     data_set = pd.DataFrame(data = None, index = RACACOR_index, columns = PESO_index[:-1])
     data_set.fillna(0, inplace=True)
-    
+
+    # Abre os dados filtrados, lendo somente as colunas utilizadas
+    df = dataset.iter_dataset(path_input, ['RACACORMAE', 'PESO', 'GESTACAO'])
+
     # Itera sobre os chunks
     for chunk in df:
-
-        try:
-            chunk = chunk[['RACACORMAE', 'PESO', 'GESTACAO']]
-        except KeyError:
-            print('Erro: arquivo não possui colunas \'RACACORMAE\', \'PESO\' ou \'GESTACAO\'.')
-            return data_set
-    
         # Filtra o chunk apenas quando a GESTACAO está entre 39 e 41 semanas
         filtro = (chunk['GESTACAO'] == 5)
         chunk = chunk[filtro]
@@ -81,6 +81,20 @@ def analise_peso(path_input: str):
     data_set[6000] = data_set.loc[:, 6000:].sum(axis = 1)
     data_set.drop(PESO_index[-11:-1], axis = 1, inplace = True)
 
+    return data_set
+
+def grafico_peso(data_set: pd.DataFrame):
+    """ Plota o histograma PESO a partir das frequências de ``dados_peso``, salvando-o em ./images/.
+
+    Parameters
+    ----------
+    data_set : pd.DataFrame
+        Resultado de ``dados_peso``
+
+    Returns
+    -------
+    None
+    """
     # Plota a distribuição total do PESO
     fig, axs = plt.subplots(tight_layout = True, figsize = (10, 6))
 
@@ -97,8 +111,8 @@ def analise_peso(path_input: str):
     # Salva a imagem em ./images/
     plt.savefig('images/PMF_PESO.png')
 
-def analise_apgar_raca(path_input: str):
-    """ Trabalha com os dados limpos e plota o gráfico APGARxRACA, salvando-a em ./images/.
+def analise_peso(path_input: str):
+    """ Trabalha com os dados limpos e plota o histograma PESO, salvando-o em ./images/.
 
     Parameters
     ----------
@@ -111,16 +125,40 @@ def analise_apgar_raca(path_input: str):
 
     Examples
     --------
-    >>> analise_apgar_raca('data/dados.csv')
+    >>> analise_peso('data/dados.csv')
     """
-
-    # Abre os dados filtrados
     try:
-        df = pd.read_csv(path_input, encoding="unicode_escape", engine="python", sep=";", iterator=True, chunksize=100000)
+        data_set = dados_peso(path_input)
     except FileNotFoundError:
         print(f"Erro: Arquivo {path_input} não encontrado.")
         return
-    
+    except KeyError:
+        print('Erro: arquivo não possui colunas \'RACACORMAE\', \'PESO\' ou \'GESTACAO\'.')
+        return
+
+    grafico_peso(data_set)
+
+def dados_apgar_raca(path_input: str) -> pd.DataFrame:
+    """ Calcula a proporção de bebês em cada faixa do índice APGAR no quinto minuto, por raça/cor da mãe.
+
+    Parameters
+    ----------
+    path_input : str
+        Caminho dos dados SISNASC já limpos anteriormente.
+
+    Returns
+    -------
+    pd.DataFrame
+        Proporções das faixas BAIXO, MEDIO e ALTO por raça/cor, com uma linha com o total
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de dados não existe
+    KeyError
+        O arquivo não possui as colunas utilizadas
+    """
+
     # Índice usado na iteração
     RACACOR_index = [1, 2, 3, 4, 5]
     APGAR_index = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
@@ -129,15 +167,11 @@ def analise_apgar_raca(path_input: str):
     data_set = pd.DataFrame(data = None, index = RACACOR_index, columns = APGAR_index[:-1])
     data_set.fillna(0, inplace=True)
 
+    # Abre os dados filtrados, lendo somente as colunas utilizadas
+    df = dataset.iter_dataset(path_input, ['RACACORMAE', 'PESO', 'APGAR5'])
+
     # Itera sobre os chunks
     for chunk in df:
-
-        try:
-            chunk = chunk[['RACACORMAE', 'PESO', 'APGAR5']]
-        except KeyError:
-            print('Erro: arquivo não possui colunas \'RACACORMAE\', \'PESO\' ou \'APGAR5\'.')
-            return data_set
-    
         # Itera sobre as cores
         for COR in RACACOR_index:
 
@@ -162,6 +196,20 @@ def analise_apgar_raca(path_input: str):
 
     data_set.drop(APGAR_index[:-1], axis = 1, inplace = True)
 
+    return data_set
+
+def grafico_apgar_raca(data_set: pd.DataFrame):
+    """ Plota o gráfico APGARxRACA a partir das proporções de ``dados_apgar_raca``, salvando-o em ./images/.
+
+    Parameters
+    ----------
+    data_set : pd.DataFrame
+        Resultado de ``dados_apgar_raca``
+
+    Returns
+    -------
+    None
+    """
     # Plota o gráfico por RACA
     Label = ['Branco', 'Preto', 'Amarelo', 'Pardo', 'Indigena', 'Media']
     width = 0.4
@@ -181,8 +229,8 @@ def analise_apgar_raca(path_input: str):
     # Salva a imagem em ./images/
     plt.savefig('images/APGARxRACA.png')
 
-def analise_filmort_raca(path_input: str):
-    """ Trabalha com os dados limpos e plota o gráfico QTDFILMORTxRACA, salvando-a em ./images/.
+def analise_apgar_raca(path_input: str):
+    """ Trabalha com os dados limpos e plota o gráfico APGARxRACA, salvando-a em ./images/.
 
     Parameters
     ----------
@@ -192,20 +240,43 @@ def analise_filmort_raca(path_input: str):
     Returns
     -------
     None
-    
+
     Examples
     --------
-    >>> analise_filmort_raca('data/dados.csv')
+    >>> analise_apgar_raca('data/dados.csv')
     """
-
-
-    # Abre os dados filtrados
     try:
-        df = pd.read_csv(path_input, encoding="unicode_escape", engine="python", sep=";", iterator=True, chunksize=100000)
+        data_set = dados_apgar_raca(path_input)
     except FileNotFoundError:
         print(f"Erro: Arquivo {path_input} não encontrado.")
         return
-    
+    except KeyError:
+        print('Erro: arquivo não possui colunas \'RACACORMAE\', \'PESO\' ou \'APGAR5\'.')
+        return
+
+    grafico_apgar_raca(data_set)
+
+def dados_filmort_raca(path_input: str) -> pd.DataFrame:
+    """ Calcula a proporção de mães que já tiveram um filho nascido morto, por raça/cor da mãe.
+
+    Parameters
+    ----------
+    path_input : str
+        Caminho dos dados SISNASC já limpos anteriormente.
+
+    Returns
+    -------
+    pd.DataFrame
+        Proporção de mães com filho nascido morto (QTDFILMORT) e total de mães (TOTAL) por raça/cor
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de dados não existe
+    KeyError
+        O arquivo não possui as colunas utilizadas
+    """
+
     # Dataframe que contará as frequências
     data_set = pd.DataFrame(data = None, index = [1, 2, 3, 4, 5], columns = ['QTDFILMORT', 'TOTAL'])
     data_set.fillna(0, inplace=True)
@@ -213,16 +284,11 @@ def analise_filmort_raca(path_input: str):
     # Índice usado na iteração
     RACACOR_index = [1, 2, 3, 4, 5]
 
+    # Abre os dados filtrados, lendo somente as colunas utilizadas
+    df = dataset.iter_dataset(path_input, ['RACACORMAE', 'QTDFILVIVO', 'QTDFILMORT'])
+
     # Itera sobre os chunks
     for chunk in df:
-
-        # Fatia o chunk
-        try:
-            chunk = chunk[['RACACORMAE', 'QTDFILVIVO', 'QTDFILMORT']]
-        except KeyError:
-            print('Erro: arquivo não possui colunas \'RACACORMAE\', \'QTDFILVIVO\' ou \'QTDFILMORT\'.')
-            return data_set
-
         # Itera filtrando sobre cada COR
         for COR in RACACOR_index:
             filtro = (chunk['RACACORMAE'] == COR)
@@ -235,6 +301,20 @@ def analise_filmort_raca(path_input: str):
     # Normaliza percentualmente
     data_set['QTDFILMORT'] /= data_set['TOTAL']
 
+    return data_set
+
+def grafico_filmort_raca(data_set: pd.DataFrame):
+    """ Plota o gráfico QTDFILMORTxRACA a partir das proporções de ``dados_filmort_raca``, salvando-o em ./images/.
+
+    Parameters
+    ----------
+    data_set : pd.DataFrame
+        Resultado de ``dados_filmort_raca``
+
+    Returns
+    -------
+    None
+    """
     # Plota gráfico
     X_label = ['Branco', 'Preto', 'Amarelo', 'Pardo', 'Indigena']
 
@@ -253,6 +333,33 @@ def analise_filmort_raca(path_input: str):
     # Salva a imagem em ./images/
     plt.savefig('images/FILMORTxRACA.png')
 
+def analise_filmort_raca(path_input: str):
+    """ Trabalha com os dados limpos e plota o gráfico QTDFILMORTxRACA, salvando-a em ./images/.
+
+    Parameters
+    ----------
+    path_input : str
+        Caminho dos dados SISNASC já limpos anteriormente.
+
+    Returns
+    -------
+    None
+    
+    Examples
+    --------
+    >>> analise_filmort_raca('data/dados.csv')
+    """
+    try:
+        data_set = dados_filmort_raca(path_input)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo {path_input} não encontrado.")
+        return
+    except KeyError:
+        print('Erro: arquivo não possui colunas \'RACACORMAE\', \'QTDFILVIVO\' ou \'QTDFILMORT\'.')
+        return
+
+    grafico_filmort_raca(data_set)
+
 def analise_peso_idade(path_input: str):
     """ Trabalha com os dados limpos e plota o gráfico PESOxIDADE, salvando-a em ./images/.
 
@@ -270,13 +377,6 @@ def analise_peso_idade(path_input: str):
     >>> analise_peso_idade('data/dados.csv')
     """
 
-    # Abre os dados filtrados
-    try:
-        df = pd.read_csv(path_input, encoding="unicode_escape", engine="python", sep=";", iterator=True, chunksize=100000)
-    except FileNotFoundError:
-        print(f"Erro: Arquivo {path_input} não encontrado.")
-        return
-    
     # Índice usado na iteração
     IDADE_index = np.arange(8, 61).tolist()
     PESO_index = np.arange(0, 7001).tolist()
@@ -285,15 +385,18 @@ def analise_peso_idade(path_input: str):
     data_set = pd.DataFrame(data = None, index = IDADE_index, columns = PESO_index[:-1])
     data_set.fillna(0, inplace=True)
 
+    # Abre os dados filtrados, lendo somente as colunas utilizadas
+    try:
+        df = dataset.iter_dataset(path_input, ['PESO', 'GESTACAO', 'IDADEMAE'])
+    except FileNotFoundError:
+        print(f"Erro: Arquivo {path_input} não encontrado.")
+        return
+    except KeyError:
+        print('Erro: arquivo não possui colunas \'PESO\', \'GESTACAO\' ou \'IDADEMAE\'.')
+        return data_set
+
     # Itera sobre os chunks
     for chunk in df:
-
-        try:
-            chunk = chunk[['PESO', 'GESTACAO', 'IDADEMAE']]
-        except KeyError:
-            print('Erro: arquivo não possui colunas \'PESO\', \'GESTACAO\' ou \'IDADEMAE\'.')
-            return data_set
-
         # Itera sobre as idades
         for IDADE in IDADE_index:
             # Filtra o chunk pela IDADE
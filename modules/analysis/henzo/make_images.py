@@ -4,7 +4,11 @@ import analysis
 
 
 sys.path.append('../../../')
-path_input = 'data/dados.csv'
+sys.path.append('modules/')
+
+import dataset
+
+path_input = dataset.dataset_path()
 
 analysis.analise_peso(path_input)
 analysis.analise_apgar_raca(path_input)
@@ -6,8 +6,12 @@ import statistics
 
 
 sys.path.append('../../..')
+sys.path.append('modules/')
 
-df = pd.read_csv('data/dados.csv', sep=';', engine='python')
+import dataset
+
+# Lê somente as colunas utilizadas nas estatísticas
+df = dataset.read_dataset(dataset.dataset_path(), ['CODMUNNASC', 'IDADEMAE', 'ESCMAE', 'CONSPRENAT'])
 
 estados = {
     "AC": 12,
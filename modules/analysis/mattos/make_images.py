@@ -45,6 +45,14 @@ estados = [
     "TO"
 ]
 
+# Campos dos gráficos, com a rotação da indexação do eixo x e a indexação do eixo y dos
+# histogramas estaduais
+campos = [
+    ('IDADEMAE', 90, [0, 0.1, 0.2]),
+    ('CONSPRENAT', 90, [0, 0.1, 0.2, 0.3]),
+    ('ESCMAE', 0, [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7])
+]
+
 def graph_desv(campo: str):
     """Cria um gráfico de barras mostrando todos
     os desvios padrões estaduais referente ao
@@ -157,12 +165,9 @@ def graph_UF(campo: str, xlabel_rotate: int, y_cofing: list[float]):
     plt.savefig(f'images/fri_{campo}_UF.png')
     
 if __name__ == "__main__":
-    graph_desv('IDADEMAE')
-    graph_desv('CONSPRENAT')
-    graph_desv('ESCMAE')
-    graph_BR('IDADEMAE', 90)
-    graph_BR('CONSPRENAT', 90)
-    graph_BR('ESCMAE', 0)
-    graph_UF('IDADEMAE', 90, [0, 0.1, 0.2])
-    graph_UF('CONSPRENAT', 90, [0, 0.1, 0.2, 0.3])
-    graph_UF('ESCMAE', 0, [0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7])
\ No newline at end of file
+    for campo, xlabel_rotate, y_config in campos:
+        graph_desv(campo)
+    for campo, xlabel_rotate, y_config in campos:
+        graph_BR(campo, xlabel_rotate)
+    for campo, xlabel_rotate, y_config in campos:
+        graph_UF(campo, xlabel_rotate, y_config)
@@ -70,6 +70,9 @@ def separate_by_location(df: pd.DataFrame, mapping: Dict[str, str]) -> Dict[str,
     if mapping != state_mapping and mapping != region_mapping:
         raise ValueError("Mapeamento inválido. Use 'state_mapping' ou 'region_mapping'.")
     
+    # Trabalha em uma cópia, para que o mesmo DataFrame possa ser separado por estado e por região
+    df = df.copy()
+
     # Verifica se o mapeamento atual (mapping) é para estados (state_mapping) ou regiões (region_mapping).
     # Dependendo do mapeamento, a coluna "CODMUNNASC" é ajustada para conter os códigos apropriados.
     df['CODMUNNASC'] = df['CODMUNNASC'].astype(str)
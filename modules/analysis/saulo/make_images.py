@@ -5,9 +5,11 @@ import analysis
 from visualization import generate_bar, generate_boxplot, generate_heatmap
 from data.mapping import region_mapping, state_mapping
 
-# Caminho para o arquivo CSV inicial
+# Caminho para o conjunto de dados tratados
 sys.path.append('../../../')
-csv_file_path = "data/dados.csv"
+sys.path.append('modules/')
+
+import dataset
 
 # Caminho para o shapefile
 shapefile_path = "modules/analysis/saulo/data/shapefile/estados_2010.shp"
@@ -16,21 +18,48 @@ shapefile_path = "modules/analysis/saulo/data/shapefile/estados_2010.shp"
 column_name1 = "KOTELCHUCK"
 column_name2 = "CONSPRENAT"
 
-df = pd.read_csv(csv_file_path, encoding="unicode_escape", engine="python", sep=";")
-df = df[["CODMUNNASC", column_name1, column_name2]]
 
-# Separa o DataFrame por estado e região
-state_data = analysis.separate_by_location(df, state_mapping)
-region_data = analysis.separate_by_location(df, region_mapping)
+def ler_dados(csv_file_path: str) -> pd.DataFrame:
+    """Lê somente as colunas utilizadas nas visualizações.
+
+    Parameters
+    ----------
+    csv_file_path : str
+        Caminho do conjunto de dados tratados
+
+    Returns
+    -------
+    pd.DataFrame
+        Colunas CODMUNNASC, KOTELCHUCK e CONSPRENAT
+    """
+    return dataset.read_dataset(csv_file_path, ["CODMUNNASC", column_name1, column_name2])
+
+
+def grafico_barras(region_data: dict[str, pd.DataFrame]):
+    """Imagem 1: Gráfico de Barras para Regiões (CONSPRENAT)."""
+    output_path_1 = 'images/bar_plot_region.png'
+    generate_bar(region_data, column_name2, "Regiões", f"Média de {column_name2} por Região", output_path_1)
+
+
+def grafico_boxplot(region_data: dict[str, pd.DataFrame]):
+    """Imagem 2: Boxplot para Regiões (CONSPRENAT)."""
+    output_path_2 = 'images/boxplot_region.png'
+    generate_boxplot(region_data, column_name2, "Regiões", f"Distribuição de {column_name2} por Região", output_path_2, 20)
+
+
+def mapa_calor(state_data: dict[str, pd.DataFrame]):
+    """Imagem 3: Mapa de calor para estados (KOTELCHUCK)."""
+    output_path_3 = 'images/heatmap.png'
+    generate_heatmap(state_data, column_name1, shapefile_path, output_path_3)
+
 
-# Imagem 1: Gráfico de Barras para Regiões (CONSPRENAT)
-output_path_1 = 'images/bar_plot_region.png'
-generate_bar(region_data, column_name2, "Regiões", f"Média de {column_name2} por Região", output_path_1)
+if __name__ == "__main__":
+    df = ler_dados(dataset.dataset_path())
 
-# Imagem 2: Boxplot para Regiões (CONSPRENAT)
-output_path_2 = 'images/boxplot_region.png'
-generate_boxplot(region_data, column_name2, "Regiões", f"Distribuição de {column_name2} por Região", output_path_2, 20)
+    # Separa o DataFrame por estado e região
+    state_data = analysis.separate_by_location(df, state_mapping)
+    region_data = analysis.separate_by_location(df, region_mapping)
 
-# Teste 3: Mapa de calor cpara estados (KOTELCHUCK)
-output_path_3 = 'images/heatmap.png'
-generate_heatmap(state_data, column_name1, shapefile_path, output_path_3)
\ No newline at end of file
+    grafico_barras(region_data)
+    grafico_boxplot(region_data)
+    mapa_calor(state_data)
@@ -13,6 +13,12 @@ Funcionalidades:
 import pandas as pd
 import numpy as np
 import doctest
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+import dataset
 
 def dados_racacormae_consprenat(path: str) -> pd.DataFrame:
     """Função que recebe um arquivo csv e transforma os dados nesse arquivo em um
@@ -48,19 +54,17 @@ def dados_racacormae_consprenat(path: str) -> pd.DataFrame:
     racacormae_values = [1, 2, 3, 4, 5]
     index = pd.Index(racacormae_values, name='RACACORMAE')
 
-    df = pd.read_csv(path, encoding="unicode_escape", engine="python", sep=";", chunksize=100000)
-
     data_df = pd.DataFrame(data=None, index=index, columns=['NUMCONSULTAS', 'NUMREGISTROS'])
     data_df.fillna(0, inplace=True)
 
-    for chunk in df:
-        # Seleciona as colunas que serão utilizadas
-        try: 
-            chunk = chunk[['RACACORMAE', 'CONSPRENAT']]
-        except KeyError:
-            print('Erro: o DataFrame não possui as colunas \'RACACORMAE\' e \'CONSPRENAT\'.')
-            return data_df
+    # Lê somente as colunas que serão utilizadas
+    try:
+        df = dataset.iter_dataset(path, ['RACACORMAE', 'CONSPRENAT'])
+    except KeyError:
+        print('Erro: o DataFrame não possui as colunas \'RACACORMAE\' e \'CONSPRENAT\'.')
+        return data_df
 
+    for chunk in df:
         for racacor in racacormae_values:
             raca_chunk = chunk.loc[chunk['RACACORMAE'] == racacor]
 
@@ -112,21 +116,21 @@ def dados_racacormae_locnasc(path: str) -> pd.DataFrame:
     index_tuples = [(racacormae, locnasc) for racacormae in racacormae_values for locnasc in locnasc_values]
     multi_index = pd.MultiIndex.from_tuples(index_tuples, names=['RACACORMAE', 'LOCNASC'])
 
-    df = pd.read_csv(path, encoding="unicode_escape", engine="python", sep=";", chunksize=100000)
-
     data_df = pd.DataFrame(data=None, index=multi_index, columns=['NUMREGISTROS'])
     data_df.fillna(0, inplace=True)
 
+    # Lê somente as colunas que serão utilizadas
+    try:
+        df = dataset.iter_dataset(path, ['RACACORMAE', 'LOCNASC'])
+    except KeyError:
+        print('Erro: o DataFrame não possui as colunas \'RACACORMAE\' e \'LOCNASC\'.')
+        return data_df
+
     for chunk in df:
         for racacor in racacormae_values:
             for locnasc in locnasc_values:
                 # Encontra a quantidade de registros com base em 'RACACORMAE' e 'LOCNASC' e adiciona no DataFrame final
-                try:
-                    count = len(chunk.loc[(chunk['RACACORMAE'] == racacor) & (chunk['LOCNASC'] == locnasc)])
-                except KeyError:
-                    print('Erro: o DataFrame não possui as colunas \'RACACORMAE\' e \'LOCNASC\'.')
-                    return data_df
-                
+                count = len(chunk.loc[(chunk['RACACORMAE'] == racacor) & (chunk['LOCNASC'] == locnasc)])
                 data_df.loc[racacor, locnasc] += count
 
     return data_df
@@ -166,27 +170,24 @@ def dados_racacormae_parto(path: str) -> pd.DataFrame:
     racacormae_values = [1, 2, 3, 4, 5]
     index = pd.Index(racacormae_values, name='RACACORMAE')
 
-    df = pd.read_csv(path, encoding="unicode_escape", engine="python", sep=";", chunksize=100000)
-
     data_df = pd.DataFrame(data=None, index=index, columns=['QTDPARTNOR', 'QTDPARTCES'])
     data_df.fillna(0, inplace=True)
 
+    # Lê somente as colunas que serão utilizadas
+    try:
+        df = dataset.iter_dataset(path, ['LOCNASC', 'RACACORMAE', 'PARTO'])
+    except KeyError:
+        print('Erro: o DataFrame não possui as colunas \'LOCNASC\', \'RACACORMAE\' e \'PARTO\'.')
+        return data_df
+
     for chunk in df:
-        try:
-            chunk = chunk.loc[chunk['LOCNASC'] == 1]
-        except KeyError:
-            print('Erro: o DataFrame não possui a coluna \'LOCNASC\'')
-            return data_df
-        
+        chunk = chunk.loc[chunk['LOCNASC'] == 1]
+
         for racacor in racacormae_values:
             # Encontra a quantidade total de cada tipo de parto por raça
-            try:
-                raca_chunk = chunk.loc[chunk['RACACORMAE'] == racacor]
-                count_partnor = len(raca_chunk.loc[raca_chunk['PARTO'] == 1])
-                count_partces = len(raca_chunk.loc[raca_chunk['PARTO'] == 2])
-            except KeyError:
-                print('Erro: o DataFrame não possui as colunas \'RACACORMAE\' e \'PARTO\'.')
-                return data_df
+            raca_chunk = chunk.loc[chunk['RACACORMAE'] == racacor]
+            count_partnor = len(raca_chunk.loc[raca_chunk['PARTO'] == 1])
+            count_partces = len(raca_chunk.loc[raca_chunk['PARTO'] == 2])
 
             data_df.loc[racacor, 'QTDPARTNOR'] += count_partnor
             data_df.loc[racacor, 'QTDPARTCES'] += count_partces
@@ -0,0 +1,345 @@
+"""
+Módulo de Descompactação PKWARE DCL (blast)
+
+Este módulo contém um descompactador do formato PKWARE Data Compression Library ("implode"), usado pelos arquivos DBC do DATASUS, baseado na implementação de referência ``blast.c`` de Mark Adler (zlib/contrib/blast). Os símbolos são decodificados com tabelas de consulta e o resultado é produzido em partes, de forma que um arquivo grande é descompactado sem ser mantido inteiro na memória.
+
+Funcionalidades:
+- Constrói as tabelas de Huffman fixas do formato.
+- Descompacta um fluxo de bytes em partes, mantendo somente a janela de 4 KB necessária para as cópias.
+- Descompacta um bloco de bytes inteiro.
+- Expõe o conteúdo descompactado como um arquivo somente leitura.
+
+"""
+
+import doctest
+import io
+
+
+# Maior comprimento de um código de Huffman do formato
+max_bits = 13
+
+# Comprimentos dos códigos dos literais, comprimentos e distâncias, em repetições
+# compactadas: cada byte indica o comprimento (4 bits menos significativos) e a
+# quantidade de símbolos seguidos com esse comprimento, menos um (4 bits mais significativos)
+literal_lengths = bytes([
+    11, 124, 8, 7, 28, 7, 188, 13, 76, 4, 10, 8, 12, 10, 12, 10, 8, 23, 8,
+    9, 7, 6, 7, 8, 7, 6, 55, 8, 23, 24, 12, 11, 7, 9, 11, 12, 6, 7, 22, 5,
+    7, 24, 6, 11, 9, 6, 7, 22, 7, 11, 38, 7, 9, 8, 25, 11, 8, 11, 9, 12,
+    8, 12, 5, 38, 5, 38, 5, 11, 7, 5, 6, 21, 6, 10, 53, 8, 7, 24, 10, 27,
+    44, 253, 253, 253, 252, 252, 252, 13, 12, 45, 12, 45, 12, 61, 12, 45,
+    44, 173])
+length_lengths = bytes([2, 35, 36, 53, 38, 23])
+distance_lengths = bytes([2, 20, 53, 230, 247, 151, 248])
+
+# Base e bits extras de cada símbolo de comprimento
+length_base = (3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264)
+length_extra = (0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8)
+
+# Comprimento que indica o fim do fluxo
+end_length = 519
+
+# Tamanho máximo da janela de cópias
+window_size = 4096
+
+
+def code_lengths(compact: bytes) -> list[int]:
+    """Expande os comprimentos dos códigos compactados em repetições.
+
+    Parameters
+    ----------
+    compact : bytes
+        Comprimentos compactados
+
+    Returns
+    -------
+    list[int]
+        Comprimento do código de cada símbolo
+
+    Examples
+    --------
+    >>> code_lengths(length_lengths)
+    [2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 5, 6, 6, 6, 7, 7]
+    """
+    lengths = []
+    for value in compact:
+        lengths += [value & 15] * ((value >> 4) + 1)
+
+    return lengths
+
+
+def canonical_codes(lengths: list[int]) -> dict[int, tuple[int, int]]:
+    """Atribui os códigos de Huffman canônicos: os símbolos são ordenados pelo
+    comprimento do código e, dentro do mesmo comprimento, pelo próprio símbolo.
+
+    Parameters
+    ----------
+    lengths : list[int]
+        Comprimento do código de cada símbolo
+
+    Returns
+    -------
+    dict[int, tuple[int, int]]
+        Código e comprimento de cada símbolo com comprimento positivo
+
+    Raises
+    ------
+    ValueError
+        Os comprimentos não formam um código completo
+    """
+    count = [0] * (max_bits + 1)
+    for length in lengths:
+        count[length] += 1
+
+    # O código deve ser completo: a soma de 2^-comprimento é exatamente 1
+    if sum(count[length] << (max_bits - length) for length in range(1, max_bits + 1)) != 1 << max_bits:
+        raise ValueError("Erro: comprimentos de código de Huffman inválidos.")
+
+    codes = {}
+    code = 0
+    for length in range(1, max_bits + 1):
+        for symbol, symbol_length in enumerate(lengths):
+            if symbol_length == length:
+                codes[symbol] = (code, length)
+                code += 1
+        code <<= 1
+
+    return codes
+
+
+def decoding_table(lengths: list[int]) -> list[tuple[int, int]]:
+    """Monta a tabela de decodificação indexada pelos próximos ``max_bits`` bits do
+    fluxo. Os bits são lidos do menos significativo para o mais significativo, e os
+    códigos são gravados invertidos (cada bit é o complemento do bit do código).
+
+    Parameters
+    ----------
+    lengths : list[int]
+        Comprimento do código de cada símbolo
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        Símbolo e comprimento do código para cada valor dos próximos bits
+    """
+    table = [None] * (1 << max_bits)
+
+    for symbol, (code, length) in canonical_codes(lengths).items():
+        # O primeiro bit lido é o mais significativo do código, complementado
+        stream = 0
+        for position in range(length):
+            bit = (code >> (length - 1 - position)) & 1
+            stream |= (bit ^ 1) << position
+
+        for high in range(1 << (max_bits - length)):
+            table[stream | (high << length)] = (symbol, length)
+
+    return table
+
+
+literal_table = decoding_table(code_lengths(literal_lengths))
+length_table = decoding_table(code_lengths(length_lengths))
+distance_table = decoding_table(code_lengths(distance_lengths))
+
+
+def decompress_iter(file, read_size: int = 1 << 16, output_size: int = 1 << 20):
+    """Descompacta um fluxo PKWARE DCL, produzindo o resultado em partes de cerca de
+    ``output_size`` bytes.
+
+    Parameters
+    ----------
+    file : io.BufferedIOBase
+        Arquivo aberto em bytes, posicionado no início do fluxo compactado
+    read_size : int, optional
+        Quantidade de bytes lidos do arquivo de cada vez
+    output_size : int, optional
+        Tamanho aproximado de cada parte do resultado
+
+    Returns
+    -------
+    Iterator[bytes]
+        Partes do conteúdo descompactado
+
+    Raises
+    ------
+    ValueError
+        O fluxo é inválido ou termina antes do código de fim
+    """
+    data = b''
+    position = 0
+    bit_buffer = 0
+    bit_count = 0
+
+    def fill(need: int):
+        # Completa o buffer de bits com pelo menos ``need`` bits, se houver entrada
+        nonlocal data, position, bit_buffer, bit_count
+        while bit_count < need:
+            if position >= len(data):
+                data = file.read(read_size)
+                position = 0
+                if not data:
+                    return
+            # Vários bytes de uma vez, para que o buffer seja completado raramente
+            take = min(len(data) - position, 32)
+            bit_buffer |= int.from_bytes(data[position:position + take], 'little') << bit_count
+            position += take
+            bit_count += 8 * take
+
+    fill(16)
+    if bit_count < 16:
+        raise ValueError("Erro: fluxo PKWARE DCL incompleto.")
+
+    coded_literals = bit_buffer & 0xFF
+    dictionary_bits = (bit_buffer >> 8) & 0xFF
+    bit_buffer >>= 16
+    bit_count -= 16
+
+    if coded_literals > 1:
+        raise ValueError("Erro: tipo de literal inválido no fluxo PKWARE DCL.")
+    if dictionary_bits < 4 or dictionary_bits > 6:
+        raise ValueError("Erro: tamanho de dicionário inválido no fluxo PKWARE DCL.")
+
+    mask = (1 << max_bits) - 1
+    output = bytearray()
+    # Variáveis locais são mais rápidas no laço de decodificação
+    lengths, distances, literals = length_table, distance_table, literal_table
+    bases, extras = length_base, length_extra
+    limit = output_size + window_size
+
+    while True:
+        # Bits suficientes para o maior símbolo: 1 + 13 + 8 + 13 + 6
+        if bit_count < 41:
+            fill(41)
+        if bit_count == 0:
+            raise ValueError("Erro: fluxo PKWARE DCL termina antes do código de fim.")
+
+        flag = bit_buffer & 1
+        bit_buffer >>= 1
+        bit_count -= 1
+
+        if flag:
+            entry = lengths[bit_buffer & mask]
+            if entry is None:
+                raise ValueError("Erro: código de comprimento inválido no fluxo PKWARE DCL.")
+            symbol, length = entry
+            bit_buffer >>= length
+            extra = extras[symbol]
+            copy_length = bases[symbol] + (bit_buffer & ((1 << extra) - 1))
+            bit_buffer >>= extra
+            bit_count -= length + extra
+
+            if copy_length == end_length:
+                break
+
+            low_bits = 2 if copy_length == 2 else dictionary_bits
+            entry = distances[bit_buffer & mask]
+            if entry is None:
+                raise ValueError("Erro: código de distância inválido no fluxo PKWARE DCL.")
+            symbol, length = entry
+            bit_buffer >>= length
+            distance = ((symbol << low_bits) | (bit_buffer & ((1 << low_bits) - 1))) + 1
+            bit_buffer >>= low_bits
+            bit_count -= length + low_bits
+
+            if bit_count < 0:
+                raise ValueError("Erro: fluxo PKWARE DCL termina antes do código de fim.")
+            if distance > len(output):
+                raise ValueError("Erro: distância inválida no fluxo PKWARE DCL.")
+
+            start = len(output) - distance
+            if distance >= copy_length:
+                output += output[start:start + copy_length]
+            else:
+                # Cópia sobreposta: repete o padrão dos últimos ``distance`` bytes
+                pattern = output[start:]
+                output += (pattern * (copy_length // distance + 1))[:copy_length]
+        else:
+            if coded_literals:
+                entry = literals[bit_buffer & mask]
+                if entry is None:
+                    raise ValueError("Erro: código de literal inválido no fluxo PKWARE DCL.")
+                symbol, length = entry
+            else:
+                symbol, length = bit_buffer & 0xFF, 8
+            bit_buffer >>= length
+            bit_count -= length
+
+            if bit_count < 0:
+                raise ValueError("Erro: fluxo PKWARE DCL termina antes do código de fim.")
+            output.append(symbol)
+
+        # Entrega o resultado, mantendo a janela usada pelas próximas cópias
+        if len(output) >= limit:
+            yield bytes(output[:-window_size])
+            del output[:-window_size]
+
+    if output:
+        yield bytes(output)
+
+
+def decompress(data: bytes) -> bytes:
+    """Descompacta um bloco de bytes inteiro no formato PKWARE DCL.
+
+    Parameters
+    ----------
+    data : bytes
+        Dados compactados
+
+    Returns
+    -------
+    bytes
+        Dados descompactados
+
+    Examples
+    --------
+    >>> decompress(bytes([0x00, 0x04, 0x82, 0x24, 0x25, 0x8f, 0x80, 0x7f]))
+    b'AIAIAIAIAIAIA'
+    """
+    return b''.join(decompress_iter(io.BytesIO(data)))
+
+
+class IterReader(io.RawIOBase):
+    """Arquivo somente leitura, sem posicionamento, cujo conteúdo são as partes de
+    um iterador de bytes, como o de ``decompress_iter``.
+
+    Parameters
+    ----------
+    parts : Iterator[bytes]
+        Partes do conteúdo
+    on_close : Callable, optional
+        Função chamada quando o arquivo é fechado, por exemplo para fechar o arquivo
+        compactado
+
+    Examples
+    --------
+    >>> file = io.BufferedReader(IterReader(iter([b'ab', b'', b'cde'])))
+    >>> file.read(4), file.read()
+    (b'abcd', b'e')
+    """
+    def __init__(self, parts, on_close=None):
+        self.parts = parts
+        self.pending = memoryview(b'')
+        self.on_close = on_close
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            part = next(self.parts, None)
+            if part is None:
+                return 0
+            self.pending = memoryview(part)
+
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed and self.on_close is not None:
+            self.on_close()
+        super().close()
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,251 @@
+"""
+Módulo de Checkpoints da Limpeza
+
+Este módulo contém funções para registrar o progresso da limpeza dos dados em um manifesto (arquivo JSON ao lado dos dados tratados), permitindo que uma execução interrompida seja retomada a partir do último bloco gravado e que dados tratados incompletos não sejam usados como se estivessem completos.
+
+Funcionalidades:
+- Calcula uma assinatura da execução a partir do arquivo de entrada (tamanho, data de modificação e hash de amostras do conteúdo) e das configurações normalizadas.
+- Lê, grava de forma atômica e remove o manifesto.
+- Verifica se o conjunto de dados tratados está completo.
+
+"""
+
+import doctest
+import hashlib
+import json
+import os
+
+import raw_data
+
+
+# Opções da configuração que não alteram os dados tratados
+runtime_keys = ('input_pattern', 'jobs', 'trace_memory', 'memory_budget_mb', 'compression_threads', 'dry_run_rows')
+
+# Quantidade e tamanho, em bytes, das amostras do arquivo de entrada usadas no hash
+sample_count = 3
+sample_size = 65536
+
+
+def manifest_path(path_output: str) -> str:
+    """Retorna o endereço do manifesto de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    str
+        Endereço do manifesto
+
+    Examples
+    --------
+    >>> manifest_path('data/dados.csv')
+    'data/dados.csv.manifest.json'
+    >>> manifest_path('data/dados/')
+    'data/dados.manifest.json'
+    """
+    return path_output.rstrip('/\\') + '.manifest.json'
+
+
+def normalize_config(config_data: dict) -> dict:
+    """Normaliza as configurações para o cálculo do hash: remove as opções que não
+    alteram os dados tratados (``runtime_keys``) e ordena as listas de valores, que
+    são usadas como conjuntos na limpeza.
+
+    Parameters
+    ----------
+    config_data : dict
+        Configurações da limpeza
+
+    Returns
+    -------
+    dict
+        Configurações normalizadas
+
+    Examples
+    --------
+    >>> normalize_config({'jobs': 4, 'restrictions': {'A': [3, 1, 1]}})
+    {'restrictions': {'A': [1, 3]}}
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return {key: normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            items = [normalize(item) for item in value]
+            if all(isinstance(item, (str, int, float, bool)) for item in items):
+                return sorted(set(items), key=repr)
+            return items
+        return value
+
+    return {key: normalize(value) for key, value in config_data.items() if key not in runtime_keys}
+
+
+def config_hash(config_data: dict) -> str:
+    """Calcula o hash SHA-256 das configurações normalizadas por ``normalize_config``,
+    independente da ordem das chaves e dos valores das listas.
+
+    Parameters
+    ----------
+    config_data : dict
+        Configurações da limpeza
+
+    Returns
+    -------
+    str
+        Hash das configurações em hexadecimal
+
+    Examples
+    --------
+    >>> config_hash({'a': 1, 'b': [2]}) == config_hash({'b': [2], 'a': 1})
+    True
+    >>> config_hash({'b': [2, 1], 'jobs': 1}) == config_hash({'b': [1, 2], 'jobs': 4})
+    True
+    """
+    normalized = json.dumps(normalize_config(config_data), sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def sample_hash(path: str) -> str:
+    """Calcula o hash SHA-256 de ``sample_count`` amostras de ``sample_size`` bytes do
+    arquivo, igualmente espaçadas do início ao fim, e do seu tamanho. Detecta
+    alterações no conteúdo que mantêm o tamanho e a data de modificação lendo somente
+    uma pequena parte do arquivo.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo
+
+    Returns
+    -------
+    str
+        Hash das amostras em hexadecimal
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode('utf-8'))
+
+    with open(path, 'rb') as file:
+        step = max(size - sample_size, 0) // max(sample_count - 1, 1)
+        for sample in range(sample_count):
+            file.seek(sample * step)
+            digest.update(file.read(sample_size))
+
+    return digest.hexdigest()
+
+
+def run_signature(path_input: str, config_data: dict, chunksize: int) -> dict:
+    """Monta a assinatura de uma execução da limpeza. Uma execução só pode ser
+    retomada se a assinatura registrada no manifesto for igual à atual.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    config_data : dict
+        Configurações da limpeza
+    chunksize : int
+        Quantidade de linhas de cada bloco
+
+    Returns
+    -------
+    dict
+        Assinatura com o arquivo de entrada, seu tamanho, data de modificação e hash
+        de amostras, o hash das configurações normalizadas e o tamanho dos blocos
+    """
+    # Em um arquivo dentro de um zip, a assinatura usa o próprio zip
+    path_file = raw_data.split_archive_path(path_input)[0]
+    status = os.stat(path_file)
+
+    return {
+        'input': os.path.abspath(path_input),
+        'input_size': status.st_size,
+        'input_mtime': status.st_mtime,
+        'input_sample': sample_hash(path_file),
+        'config_hash': config_hash(config_data),
+        'chunksize': chunksize
+    }
+
+
+def load_manifest(path_output: str) -> dict:
+    """Lê o manifesto de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    dict
+        Manifesto, ou None se ele não existir ou estiver corrompido
+    """
+    try:
+        with open(manifest_path(path_output), 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_manifest(path_output: str, manifest: dict):
+    """Grava o manifesto de um conjunto de dados tratados. O manifesto é escrito em
+    um arquivo temporário e depois renomeado, de forma que uma interrupção nunca
+    deixa um manifesto parcialmente gravado.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+    manifest : dict
+        Manifesto a ser gravado
+    """
+    path = manifest_path(path_output)
+    temporary_path = path + '.tmp'
+
+    with open(temporary_path, 'w') as file:
+        json.dump(manifest, file, indent=1)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary_path, path)
+
+
+def remove_manifest(path_output: str):
+    """Remove o manifesto de um conjunto de dados tratados, se ele existir.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+    """
+    if os.path.exists(manifest_path(path_output)):
+        os.remove(manifest_path(path_output))
+
+
+def is_complete(path_output: str) -> bool:
+    """Verifica se um conjunto de dados tratados existe e está completo. Conjuntos
+    gerados antes da existência dos manifestos são considerados completos.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    bool
+        True se o conjunto de dados existe e a limpeza terminou
+    """
+    if not os.path.exists(path_output):
+        return False
+
+    manifest = load_manifest(path_output)
+    if manifest is None:
+        return not os.path.exists(manifest_path(path_output))
+
+    return manifest.get('complete', False)
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,77 @@
+import unittest
+import os
+
+import checkpoint
+
+
+class TestCheckpoint(unittest.TestCase):
+    def tearDown(self):
+        for path in ['output.csv', checkpoint.manifest_path('output.csv')]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Teste 1: conjunto de dados inexistente não está completo
+    def test_is_complete_output_not_exists(self):
+        self.assertFalse(checkpoint.is_complete('output.csv'))
+
+    # Teste 2: conjunto de dados sem manifesto (gerado por versões anteriores) está completo
+    def test_is_complete_without_manifest(self):
+        open('output.csv', 'w').close()
+
+        self.assertTrue(checkpoint.is_complete('output.csv'))
+
+    # Teste 3: conjunto de dados com manifesto de execução interrompida não está completo
+    def test_is_complete_interrupted_run(self):
+        open('output.csv', 'w').close()
+        checkpoint.save_manifest('output.csv', {'chunks': [], 'complete': False})
+
+        self.assertFalse(checkpoint.is_complete('output.csv'))
+
+        checkpoint.save_manifest('output.csv', {'chunks': [], 'complete': True})
+
+        self.assertTrue(checkpoint.is_complete('output.csv'))
+
+    # Teste 4: manifesto corrompido não deve ser lido e o conjunto não está completo
+    def test_corrupted_manifest(self):
+        open('output.csv', 'w').close()
+        with open(checkpoint.manifest_path('output.csv'), 'w') as file:
+            file.write('{"chunks": [')
+
+        self.assertIsNone(checkpoint.load_manifest('output.csv'))
+        self.assertFalse(checkpoint.is_complete('output.csv'))
+
+    # Teste 5: assinatura deve mudar quando as configurações mudam
+    def test_run_signature_config_change(self):
+        open('output.csv', 'w').close()
+
+        signature_1 = checkpoint.run_signature('output.csv', {'z_score_limit': 4}, 100)
+        signature_2 = checkpoint.run_signature('output.csv', {'z_score_limit': 3}, 100)
+
+        self.assertNotEqual(signature_1, signature_2)
+
+    # Teste 6: assinatura deve mudar com o conteúdo, mesmo com tamanho e data de modificação iguais
+    def test_run_signature_content_change(self):
+        with open('output.csv', 'w') as file:
+            file.write('A;B\n1;2\n')
+        signature_1 = checkpoint.run_signature('output.csv', {}, 100)
+
+        status = os.stat('output.csv')
+        with open('output.csv', 'w') as file:
+            file.write('A;B\n3;4\n')
+        os.utime('output.csv', ns=(status.st_atime_ns, status.st_mtime_ns))
+        signature_2 = checkpoint.run_signature('output.csv', {}, 100)
+
+        self.assertEqual(signature_1['input_mtime'], signature_2['input_mtime'])
+        self.assertNotEqual(signature_1, signature_2)
+
+    # Teste 7: opções que não alteram os dados tratados e a ordem das listas não mudam o hash
+    def test_config_hash_normalized(self):
+        config_1 = {'restrictions': {'A': [1, 2]}, 'columns_to_remove': ['B', 'C'], 'jobs': 1}
+        config_2 = {'columns_to_remove': ['C', 'B'], 'restrictions': {'A': [2, 1]}, 'jobs': 4, 'trace_memory': True}
+
+        self.assertEqual(checkpoint.config_hash(config_1), checkpoint.config_hash(config_2))
+        self.assertNotEqual(checkpoint.config_hash(config_1), checkpoint.config_hash({**config_1, 'restrictions': {'A': [1]}}))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
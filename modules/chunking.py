@@ -0,0 +1,295 @@
+"""
+Módulo de Divisão em Blocos
+
+Este módulo contém as funções que definem a quantidade de linhas de cada bloco lido na limpeza e nas análises a partir de um orçamento de memória, em vez de um tamanho fixo. O tamanho inicial é estimado a partir da quantidade e dos tipos das colunas lidas, e os blocos seguintes são reduzidos quando a memória residente do processo se aproxima do limite.
+
+Funcionalidades:
+- Lê o orçamento de memória informado, da variável de ambiente ``SINASC_MEMORY_BUDGET_MB`` ou o padrão.
+- Estima a memória ocupada por uma linha a partir dos tipos das colunas.
+- Calcula a quantidade de linhas de cada bloco que cabe no orçamento.
+- Mede a memória residente atual do processo.
+- Ajusta o tamanho de cada novo bloco à memória ainda disponível.
+- Lê os próximos blocos em uma thread em segundo plano, com uma fila limitada, enquanto o bloco atual é processado.
+
+"""
+
+import doctest
+import os
+import queue
+import threading
+
+import numpy as np
+
+# Variável de ambiente com o orçamento de memória, em megabytes, usada pelas análises
+budget_variable = 'SINASC_MEMORY_BUDGET_MB'
+default_budget_mb = 1024
+
+# Cópias de cada bloco feitas durante o processamento (conversões de tipo, máscaras dos
+# filtros e o DataFrame resultante de cada etapa)
+working_copies = 4
+
+# Limites da quantidade de linhas de cada bloco
+min_rows = 10000
+max_rows = 2000000
+
+# Tamanho estimado, em bytes, de um valor de uma coluna de texto ou objeto
+object_bytes = 64
+
+# Quantidade de blocos lidos antecipadamente por ``prefetch``
+prefetch_depth = 2
+
+# Blocos mantidos por ``prefetch`` além do bloco em processamento: os blocos da fila e
+# o bloco em leitura na thread, considerados no tamanho dos blocos lidos antecipadamente
+prefetch_blocks = prefetch_depth + 1
+
+
+def memory_budget(budget_mb: float = None) -> int:
+    """Retorna o orçamento de memória, em bytes: o valor informado ou, se não for
+    informado, o da variável de ambiente ``budget_variable`` ou ``default_budget_mb``.
+
+    Parameters
+    ----------
+    budget_mb : float, optional
+        Orçamento de memória em megabytes
+
+    Returns
+    -------
+    int
+        Orçamento de memória em bytes
+
+    Raises
+    ------
+    ValueError
+        O orçamento não é um número positivo
+
+    Examples
+    --------
+    >>> memory_budget(2)
+    2097152
+    """
+    if budget_mb is None:
+        budget_mb = os.environ.get(budget_variable, default_budget_mb)
+
+    try:
+        budget_mb = float(budget_mb)
+    except ValueError:
+        raise ValueError(f"Erro: orçamento de memória {budget_mb} inválido.")
+    if budget_mb <= 0:
+        raise ValueError(f"Erro: orçamento de memória {budget_mb} inválido.")
+
+    return int(budget_mb * 2 ** 20)
+
+
+def row_bytes(dtypes) -> int:
+    """Estima a memória, em bytes, ocupada por uma linha com colunas dos tipos
+    informados. Colunas de texto ou de objetos usam ``object_bytes``.
+
+    Parameters
+    ----------
+    dtypes : dict | Iterable
+        Tipos das colunas, como um dicionário de coluna para tipo ou uma sequência
+
+    Returns
+    -------
+    int
+        Memória estimada de uma linha
+
+    Examples
+    --------
+    >>> row_bytes({'A': 'int8', 'B': 'float64', 'C': 'object'})
+    73
+    """
+    if isinstance(dtypes, dict):
+        dtypes = dtypes.values()
+
+    total = 0
+    for dtype in dtypes:
+        try:
+            dtype = np.dtype(dtype)
+        except TypeError:
+            # Tipos do pandas, como 'category' ou 'string'
+            total += object_bytes
+            continue
+        total += object_bytes if dtype.kind in 'OSUV' else dtype.itemsize
+
+    return max(total, 1)
+
+
+def chunk_rows(dtypes, budget: int = None, blocks: int = 1, extra_bytes: int = 0) -> int:
+    """Calcula a quantidade de linhas de cada bloco que cabe no orçamento de memória,
+    considerando ``working_copies`` cópias de cada bloco e ``blocks`` blocos em
+    processamento ao mesmo tempo, entre ``min_rows`` e ``max_rows``.
+
+    Parameters
+    ----------
+    dtypes : dict | Iterable
+        Tipos das colunas lidas
+    budget : int, optional
+        Orçamento de memória em bytes. Se não for informado, usa ``memory_budget``
+    blocks : int, optional
+        Quantidade de blocos em processamento ao mesmo tempo
+    extra_bytes : int, optional
+        Memória adicional de cada linha, como o texto da linha antes da conversão
+
+    Returns
+    -------
+    int
+        Quantidade de linhas de cada bloco
+
+    Examples
+    --------
+    >>> chunk_rows({'A': 'float64'}, budget=64 * 2 ** 20)
+    2000000
+    >>> chunk_rows(['float64'] * 60, budget=256 * 2 ** 20, blocks=2, extra_bytes=480)
+    34952
+    """
+    if budget is None:
+        budget = memory_budget()
+
+    per_row = (row_bytes(dtypes) + extra_bytes) * working_copies * max(blocks, 1)
+    return int(min(max(budget // per_row, min_rows), max_rows))
+
+
+def resident_memory() -> int:
+    """Retorna a memória residente atual do processo, em bytes, lida de
+    ``/proc/self/statm``.
+
+    Returns
+    -------
+    int
+        Memória residente em bytes, ou None se não puder ser medida (fora do Linux)
+    """
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class ChunkSizer:
+    """Define a quantidade de linhas de cada novo bloco. Cada chamada retorna o tamanho
+    inicial (ver ``chunk_rows``) limitado pela memória ainda disponível no orçamento,
+    medida pela memória residente do processo: os blocos diminuem quando a memória se
+    aproxima do limite e voltam ao tamanho inicial quando ela é liberada. Sem a medida
+    da memória residente, o tamanho inicial é sempre usado.
+
+    Parameters
+    ----------
+    dtypes : dict | Iterable
+        Tipos das colunas lidas
+    budget : int, optional
+        Orçamento de memória em bytes. Se não for informado, usa ``memory_budget``
+    blocks : int, optional
+        Quantidade de blocos em processamento ao mesmo tempo
+    extra_bytes : int, optional
+        Memória adicional de cada linha
+
+    Examples
+    --------
+    >>> sizer = ChunkSizer(['float64'] * 10, budget=10 ** 12)
+    >>> sizer.rows, sizer() == sizer.rows
+    (2000000, True)
+    """
+    def __init__(self, dtypes, budget: int = None, blocks: int = 1, extra_bytes: int = 0):
+        self.budget = memory_budget() if budget is None else budget
+        self.per_row = (row_bytes(dtypes) + extra_bytes) * working_copies * max(blocks, 1)
+        self.rows = chunk_rows(dtypes, self.budget, blocks, extra_bytes)
+        self.smallest = self.rows
+
+    def __call__(self) -> int:
+        """Retorna a quantidade de linhas do próximo bloco."""
+        resident = resident_memory()
+        if resident is None:
+            return self.rows
+
+        rows = int(min(max((self.budget - resident) // self.per_row, min_rows), self.rows))
+        self.smallest = min(self.smallest, rows)
+        return rows
+
+
+
+def prefetch(chunks, depth: int = None):
+    """Percorre os blocos de um iterador em uma thread em segundo plano, mantendo até
+    ``depth`` blocos prontos em uma fila, de forma que a leitura e a conversão do
+    próximo bloco acontecem enquanto o bloco atual é processado. Os blocos são
+    entregues na mesma ordem, e um erro na leitura é levantado no ponto em que o bloco
+    seria entregue. Se o consumo for interrompido, a leitura também é interrompida.
+
+    Parameters
+    ----------
+    chunks : Iterable
+        Blocos a serem lidos antecipadamente
+    depth : int, optional
+        Quantidade máxima de blocos prontos na fila (``prefetch_depth`` se não for
+        informado). Com zero, os blocos são lidos sem antecipação
+
+    Returns
+    -------
+    Iterator
+        Iterador sobre os mesmos blocos, na mesma ordem
+
+    Examples
+    --------
+    >>> list(prefetch(iter(range(5)), depth=2))
+    [0, 1, 2, 3, 4]
+    >>> def failing():
+    ...     yield 1
+    ...     raise ValueError("Erro: bloco inválido.")
+    >>> list(prefetch(failing()))
+    Traceback (most recent call last):
+    ...
+    ValueError: Erro: bloco inválido.
+    """
+    if depth is None:
+        depth = prefetch_depth
+    if depth <= 0:
+        yield from chunks
+        return
+
+    chunks = iter(chunks)
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        # Aguarda espaço na fila enquanto o consumo não for interrompido
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        error = None
+        try:
+            for chunk in chunks:
+                if not put((chunk, None)):
+                    break
+        except BaseException as exception:
+            error = exception
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        put((done, error))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk, error = items.get()
+            if chunk is done:
+                if error is not None:
+                    raise error
+                return
+            yield chunk
+    finally:
+        stop.set()
+        thread.join()
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,104 @@
+import unittest
+import os
+import pandas as pd
+
+import chunking
+import raw_data
+
+
+class TestChunking(unittest.TestCase):
+    # Teste 1: o tamanho dos blocos deve diminuir com colunas maiores e mais blocos em andamento
+    def test_chunk_rows_from_dtypes(self):
+        budget = 64 * 2 ** 20
+        small = chunking.chunk_rows({'A': 'int8', 'B': 'int16'}, budget)
+        large = chunking.chunk_rows(['float64'] * 50, budget)
+
+        self.assertGreater(small, large)
+        self.assertEqual(large, budget // (400 * chunking.working_copies))
+        self.assertEqual(chunking.chunk_rows(['float64'] * 50, budget, blocks=2), large // 2)
+
+        # O tamanho fica entre os limites
+        self.assertEqual(chunking.chunk_rows(['object'] * 1000, 2 ** 20), chunking.min_rows)
+        self.assertEqual(chunking.chunk_rows(['int8'], 2 ** 40), chunking.max_rows)
+
+    # Teste 2: os blocos devem diminuir quando a memória residente se aproxima do limite
+    def test_chunk_sizer_shrinks_near_ceiling(self):
+        resident = chunking.resident_memory()
+        if resident is None:
+            self.skipTest("memória residente não disponível")
+
+        sizer = chunking.ChunkSizer(['float64'] * 10, budget=resident + 2 ** 30)
+        self.assertEqual(sizer(), sizer.rows)
+
+        sizer.budget = resident + 2 ** 20
+        self.assertEqual(sizer(), chunking.min_rows)
+        self.assertEqual(sizer.smallest, chunking.min_rows)
+
+    # Teste 3: o orçamento deve vir do valor informado ou da variável de ambiente
+    def test_memory_budget(self):
+        previous = os.environ.get(chunking.budget_variable)
+        try:
+            os.environ[chunking.budget_variable] = '256'
+            self.assertEqual(chunking.memory_budget(), 256 * 2 ** 20)
+            self.assertEqual(chunking.memory_budget(8), 8 * 2 ** 20)
+
+            for invalid in ['abc', '-1']:
+                os.environ[chunking.budget_variable] = invalid
+                with self.assertRaises(ValueError):
+                    chunking.memory_budget()
+        finally:
+            if previous is None:
+                del os.environ[chunking.budget_variable]
+            else:
+                os.environ[chunking.budget_variable] = previous
+
+    # Teste 4: blocos de tamanho variável devem cobrir o arquivo sem repetir linhas
+    def test_read_raw_blocks_variable_size(self):
+        pd.DataFrame({'A': range(10)}).to_csv('input.csv', sep=';', index=False)
+        sizes = iter([3, 1, 4, 100, 100])
+
+        try:
+            blocks = list(raw_data.read_raw_blocks('input.csv', lambda: next(sizes)))
+        finally:
+            os.remove('input.csv')
+
+        self.assertEqual([rows for _, rows, _ in blocks], [3, 1, 4, 2])
+        self.assertEqual(b''.join(block for _, _, block in blocks), b''.join(f'{i}\n'.encode() for i in range(10)))
+
+    # Teste 5: a leitura antecipada deve manter a ordem, limitar a fila e parar quando o consumo é interrompido
+    def test_prefetch_bounded_and_closed(self):
+        produced = []
+        closed = []
+
+        def chunks():
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield i
+            finally:
+                closed.append(True)
+
+        self.assertEqual(list(chunking.prefetch(chunks(), depth=3)), list(range(100)))
+
+        produced.clear()
+        closed.clear()
+        iterator = chunking.prefetch(chunks(), depth=3)
+        self.assertEqual(next(iterator), 0)
+        iterator.close()
+
+        # No máximo o bloco entregue, os blocos da fila e o bloco aguardando espaço
+        self.assertLessEqual(len(produced), 5)
+        self.assertEqual(closed, [True])
+
+    # Teste 6: os blocos lidos antecipadamente devem caber no orçamento junto com o bloco em processamento
+    def test_prefetch_blocks_in_budget(self):
+        budget = 64 * 2 ** 20
+        sizer = chunking.ChunkSizer(['float64'] * 50, budget, blocks=1 + chunking.prefetch_blocks)
+
+        self.assertEqual(chunking.prefetch_blocks, chunking.prefetch_depth + 1)
+        self.assertEqual(sizer.rows, budget // (400 * chunking.working_copies * (chunking.prefetch_depth + 2)))
+        self.assertLessEqual(sizer.rows * 400 * chunking.working_copies * (chunking.prefetch_depth + 2), budget)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
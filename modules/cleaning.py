@@ -4,29 +4,74 @@ Módulo de Análise e Tratamento de Dados
 Este módulo contém funções para análise e tratamento de dados de um conjunto de dados brutos, resultando em um conjunto de dados tratados e um arquivo de configuração. Ele inclui funções para filtrar linhas com base em restrições, calcular Z-Scores, preencher valores ausentes e carregar dados brutos em um arquivo de saída.
 
 Funcionalidades:
-- Filtra linhas de um DataFrame com base em restrições.
-- Filtra linhas de um DataFrame com base no Z-Score.
+- Filtra linhas de um DataFrame com base em restrições e regras de consistência entre colunas, com um plano de filtros compilado.
+- Filtra linhas de um DataFrame com base no Z-Score, calculado no DataFrame ou informado.
+- Filtra linhas com base no Z-Score em relação ao estrato da linha (como a UF ou a região), com uma consulta vetorizada às estatísticas de cada estrato.
+- Filtra linhas com base na mediana e no desvio absoluto mediano (MAD), mais robustos em colunas assimétricas de valores inteiros pequenos.
 - Preenche as linhas vazias de um DataFrame com valores específicos.
-- Carrega dados brutos de um arquivo de entrada, aplica várias transformações e salva os dados tratados em um arquivo de saída.
+- Preenche as linhas vazias de uma coluna com a média do grupo da linha (como a classe de GESTACAO ou a UF), com uma consulta vetorizada.
+- Aplica uma função a cada bloco de dados, em paralelo e preservando a ordem dos blocos.
+- Converte e trata blocos de linhas do arquivo de dados brutos, removendo as linhas repetidas em todo o arquivo.
+- Calcula as estatísticas exatas do arquivo inteiro usadas no preenchimento e no Z-Score.
+- Carrega dados brutos de um arquivo de entrada, aplica várias transformações e salva os dados tratados em um arquivo de saída, retomando execuções interrompidas.
+- Grava o índice de linhas dos dados tratados em CSV, com as posições calculadas na gravação de cada bloco.
+- Mede cada etapa da limpeza (tempo, linhas e memória) e grava um relatório por execução.
+- Estima, a partir de uma amostra uniforme do arquivo de dados brutos, as linhas mantidas e removidas por cada etapa, restrição e regra, com intervalos de confiança, sem gravar os dados tratados.
+- Verifica se os dados tratados correspondem ao arquivo de entrada e às configurações atuais.
+- Limpa os arquivos de vários anos em um conjunto de dados particionado por ano, com um esquema comum, tratando os anos em paralelo e pulando os anos já limpos.
 
 """
 
 import pandas as pd
 import numpy as np
 import doctest
-import yaml
 import os
+import re
+import time
+import glob
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 import sys
 sys.path.append('modules/')
 
 import config
+import dataset
+import raw_data
+import streaming
+import checkpoint
+import schema
+import filters
+import dedup
+import profiling
+import chunking
+import row_index
+import sampling
+
+
+# Quantidade de linhas de cada bloco lido do arquivo de dados brutos quando o resultado
+# depende da divisão em blocos (estatísticas ou deduplicação por bloco)
+raw_chunksize = 100000
+
+# Tamanho estimado, em bytes, do texto de cada campo de uma linha do arquivo bruto
+raw_field_bytes = 8
+
+# Etapas da limpeza que removem linhas, na ordem em que são aplicadas
+dropping_stages = ('dedup', 'dropna', 'dropna_any', 'filter_rows', 'filter_by_z_score', 'filter_by_mad')
+
+# Grupos calculados a partir do código do município de nascimento e o divisor do
+# código que os define
+derived_groups = {
+    'UF': 10000,
+    'REGIAO': 100000
+}
 
 
 def filter_rows(df: pd.DataFrame, restrictions: dict[str, list]) -> pd.DataFrame:
     """Filtra as linhas de um DataFrame com base em um conjunto de restrições
     para cada campo a ser verificado. Retorna um DataFrame somente com as linhas
-    que satisfazem todas as restrições.
+    que satisfazem todas as restrições. As restrições são compiladas em um
+    ``filters.FilterPlan`` e aplicadas com uma única máscara.
 
     Parameters
     ----------
@@ -73,25 +118,15 @@ def filter_rows(df: pd.DataFrame, restrictions: dict[str, list]) -> pd.DataFrame
     Columns: [Column_1, Column_2]
     Index: []
     """
-    for restriction in restrictions:
-        # Nome da coluna e valores aceitos para a coluna
-        column = restriction
-        subset = restrictions[column]
-
-        try:
-            # Encontra as linhas válidas e filtra o DataFrame
-            valid_rows = df[column].isin(subset)
-            df = df[valid_rows]
-        except KeyError:
-            raise KeyError(f"Erro: Coluna {column} não encontrada.")
-    
-    return df
+    return filters.FilterPlan(restrictions).apply(df)
 
 
-def filter_by_z_score(df: pd.DataFrame, columns: list[str], limit: float) -> pd.DataFrame:
+def filter_by_z_score(df: pd.DataFrame, columns: list[str], limit: float,
+                      mean: pd.Series = None, std_dev: pd.Series = None) -> pd.DataFrame:
     """Filtra as linhas de um DataFrame com base no Z-Score de cada elemento. Retorna um
     DataFrame somente com as linhas em que o Z-Score de cada elemento é menor do que o
-    limite, em módulo.
+    limite, em módulo. A média e o desvio padrão podem ser informados, por exemplo quando
+    calculados sobre o arquivo inteiro; caso contrário, são calculados sobre o DataFrame.
 
     Parameters
     ----------
@@ -101,6 +136,10 @@ def filter_by_z_score(df: pd.DataFrame, columns: list[str], limit: float) -> pd.
         Lista com as colunas a serem consideradas no filtro
     limit : float
         Z-Score máximo para que um elemento seja considerado válido
+    mean : pd.Series, optional
+        Média de cada coluna
+    std_dev : pd.Series, optional
+        Desvio padrão de cada coluna
 
     Returns
     -------
@@ -122,11 +161,21 @@ def filter_by_z_score(df: pd.DataFrame, columns: list[str], limit: float) -> pd.
     1      20
     2      30
     3      40
+
+    Teste 2: Média e desvio padrão informados
+
+    >>> mean = pd.Series({'Column': 30.0})
+    >>> std_dev = pd.Series({'Column': 5.0})
+    >>> filter_by_z_score(df, columns, limit, mean, std_dev)
+       Column
+    2      30
     """
     try:
         # Média e desvio padrão das colunas
-        mean = df.mean()
-        std_dev = df.std()
+        if mean is None:
+            mean = df.mean()
+        if std_dev is None:
+            std_dev = df.std()
     except TypeError:
         raise TypeError("Erro: todos os valores devem ser numéricos.")
 
@@ -146,6 +195,183 @@ def filter_by_z_score(df: pd.DataFrame, columns: list[str], limit: float) -> pd.
     return df
 
 
+def filter_by_strata_z_score(df: pd.DataFrame, columns: list[str], limit: float, strata: str,
+                             mean: pd.DataFrame = None, std_dev: pd.DataFrame = None) -> pd.DataFrame:
+    """Filtra as linhas de um DataFrame com base no Z-Score de cada elemento em relação
+    ao estrato da linha, como a UF ou a região (ver ``group_keys``), em vez de todo o
+    DataFrame. A média e o desvio padrão de cada linha são obtidos com uma única
+    consulta vetorizada às estatísticas dos estratos. Elementos ausentes ou de estratos
+    sem estatísticas têm Z-Score zero, como em ``filter_by_z_score``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame a ser filtrado
+    columns : list[str]
+        Lista com as colunas a serem consideradas no filtro
+    limit : float
+        Z-Score máximo para que um elemento seja considerado válido
+    strata : str
+        Coluna ou grupo calculado que define os estratos
+    mean : pd.DataFrame, optional
+        Média de cada coluna, com as chaves dos estratos como índice
+    std_dev : pd.DataFrame, optional
+        Desvio padrão de cada coluna, com as chaves dos estratos como índice
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame somente com as linhas em que o Z-Score de cada elemento em relação
+        ao seu estrato está abaixo do limite estabelecido
+
+    Raises
+    ------
+    KeyError
+        Alguma coluna não existe no DataFrame
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({'UF': [1, 1, 1, 2, 2, 2], 'A': [10, 12, 30, 30, 32, 10]})
+    >>> mean = pd.DataFrame({'A': [11.0, 31.0]}, index=[1.0, 2.0])
+    >>> std_dev = pd.DataFrame({'A': [2.0, 2.0]}, index=[1.0, 2.0])
+    >>> filter_by_strata_z_score(df, ['A'], 2.0, 'UF', mean, std_dev)
+       UF   A
+    0   1  10
+    1   1  12
+    3   2  30
+    4   2  32
+    """
+    keys = group_keys(df, strata)
+
+    if mean is None or std_dev is None:
+        statistics = streaming.GroupedStats(columns)
+        statistics.update(df, keys)
+        mean, std_dev = statistics.means(), statistics.stds()
+
+    try:
+        values = df[columns].to_numpy(dtype=np.float64)
+    except KeyError:
+        raise KeyError(f"Erro: conjunto de colunas {columns} inválido")
+    except (TypeError, ValueError):
+        raise TypeError("Erro: todos os valores devem ser numéricos.")
+
+    # Estatísticas do estrato de cada linha
+    row_mean = mean.reindex(index=keys, columns=columns).to_numpy(dtype=np.float64)
+    row_std = std_dev.reindex(index=keys, columns=columns).to_numpy(dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_scores = np.nan_to_num((row_mean - values) / row_std, nan=0.0)
+
+    return df.loc[(np.abs(z_scores) < limit).all(axis=1)]
+
+
+def outlier_columns(config_data: dict) -> tuple[list[str], list[str]]:
+    """Divide as colunas em ``columns_to_filter_by_z_score`` entre as filtradas pelo
+    Z-Score e as filtradas pela mediana e pelo MAD, conforme a opção
+    ``outlier_methods`` da configuração ('z_score', o padrão, ou 'mad').
+
+    Parameters
+    ----------
+    config_data : dict
+        Configurações da limpeza
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        Colunas filtradas pelo Z-Score e colunas filtradas pelo MAD
+
+    Raises
+    ------
+    ValueError
+        Algum método não é 'z_score' nem 'mad'
+
+    Examples
+    --------
+    >>> outlier_columns({'columns_to_filter_by_z_score': ['A', 'B', 'C'], 'outlier_methods': {'B': 'mad'}})
+    (['A', 'C'], ['B'])
+    """
+    # Arquivos de configuração antigos não possuem a opção
+    methods = config_data.get('outlier_methods') or {}
+
+    for column, method in methods.items():
+        if method not in ('z_score', 'mad'):
+            raise ValueError(f"Erro: método {method} inválido para a coluna {column}.")
+
+    columns = config_data['columns_to_filter_by_z_score']
+    return ([column for column in columns if methods.get(column, 'z_score') == 'z_score'],
+            [column for column in columns if methods.get(column) == 'mad'])
+
+
+def filter_by_mad(df: pd.DataFrame, columns: list[str], limit: float,
+                  median: pd.Series = None, scale: pd.Series = None) -> pd.DataFrame:
+    """Filtra as linhas de um DataFrame com base no Z-Score robusto de cada elemento,
+    a distância à mediana dividida pela escala robusta da coluna (o MAD multiplicado
+    por 1,4826 ou, se o MAD for zero, o desvio absoluto médio multiplicado por
+    1,253314; ver ``streaming.QuantileSketch.scales``). A mediana e a escala podem ser
+    informadas, por exemplo quando calculadas sobre o arquivo inteiro; caso contrário,
+    são calculadas sobre o DataFrame. Elementos ausentes e colunas com escala zero
+    não removem linhas.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame a ser filtrado
+    columns : list[str]
+        Lista com as colunas a serem consideradas no filtro
+    limit : float
+        Z-Score robusto máximo para que um elemento seja considerado válido
+    median : pd.Series, optional
+        Mediana de cada coluna
+    scale : pd.Series, optional
+        Escala robusta de cada coluna
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame somente com as linhas em que o Z-Score robusto de cada elemento está
+        abaixo do limite estabelecido
+
+    Raises
+    ------
+    KeyError
+        Alguma coluna não existe no DataFrame
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({'A': [0, 0, 0, 1, 0, 2, 0, 14]})
+    >>> filter_by_mad(df, ['A'], 3.5)
+       A
+    0  0
+    1  0
+    2  0
+    3  1
+    4  0
+    5  2
+    6  0
+    """
+    if not columns:
+        return df
+
+    if median is None or scale is None:
+        sketch = streaming.QuantileSketch(columns)
+        sketch.update(df)
+        median, scale = sketch.medians(), sketch.scales()
+
+    try:
+        values = df[columns].to_numpy(dtype=np.float64)
+    except KeyError:
+        raise KeyError(f"Erro: conjunto de colunas {columns} inválido")
+    except (TypeError, ValueError):
+        raise TypeError("Erro: todos os valores devem ser numéricos.")
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_scores = (values - median[columns].to_numpy(dtype=np.float64)) / scale[columns].to_numpy(dtype=np.float64)
+    # Elementos ausentes e colunas com escala zero (todos os valores iguais) têm Z-Score zero
+    z_scores[~np.isfinite(z_scores)] = 0
+
+    return df.loc[(np.abs(z_scores) < limit).all(axis=1)]
+
+
 def fill_columns(df: pd.DataFrame, columns_values: dict[str, int]) -> pd.DataFrame:
     """Preenche as linhas vazias de um DataFrame usando valores específicos para cada coluna.
 
@@ -188,90 +414,1122 @@ def fill_columns(df: pd.DataFrame, columns_values: dict[str, int]) -> pd.DataFra
     return df
 
 
-def load_data(path_input: str, path_output: str):
+def group_keys(df: pd.DataFrame, group: str) -> np.ndarray:
+    """Retorna a chave do grupo de cada linha: o valor da coluna ``group`` ou, para
+    os grupos de ``derived_groups`` ('UF' e 'REGIAO'), o código calculado a partir do
+    código do município de nascimento.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame com a coluna do grupo ou com a coluna CODMUNNASC
+    group : str
+        Coluna ou grupo calculado
+
+    Returns
+    -------
+    np.ndarray
+        Chave do grupo de cada linha, do tipo np.float64 (NaN se ausente)
+
+    Raises
+    ------
+    KeyError
+        A coluna do grupo não existe no DataFrame
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({'CODMUNNASC': [120001, 355030, np.nan]})
+    >>> group_keys(df, 'UF'), group_keys(df, 'REGIAO')
+    (array([12., 35., nan]), array([ 1.,  3., nan]))
+    """
+    if group in df.columns:
+        return df[group].to_numpy(dtype=np.float64)
+
+    if group not in derived_groups:
+        raise KeyError(f"Erro: coluna {group} não encontrada.")
+
+    try:
+        codes = df['CODMUNNASC'].to_numpy(dtype=np.float64)
+    except KeyError:
+        raise KeyError("Erro: coluna CODMUNNASC não encontrada.")
+
+    return np.floor(codes / derived_groups[group])
+
+
+def group_statistics(df: pd.DataFrame, groups: dict[str, str]) -> dict[str, streaming.GroupedStats]:
+    """Acumula as estatísticas de cada coluna em ``groups`` por grupo da linha.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame com as colunas e os grupos
+    groups : dict[str, str]
+        Dicionário em que cada chave é uma coluna e o valor é o seu grupo
+
+    Returns
+    -------
+    dict[str, streaming.GroupedStats]
+        Acumulador de cada coluna
+    """
+    statistics = {}
+    for column, group in groups.items():
+        statistics[column] = streaming.GroupedStats([column])
+        statistics[column].update(df, group_keys(df, group))
+
+    return statistics
+
+
+def fill_group_means(df: pd.DataFrame, groups: dict[str, str], group_means: dict[str, pd.Series],
+                     fill_means: pd.Series = None) -> pd.DataFrame:
+    """Preenche as linhas vazias de cada coluna em ``groups`` com a média da coluna no
+    grupo da linha. A média de cada linha é obtida com uma única consulta vetorizada
+    às médias dos grupos. Linhas sem grupo, ou de um grupo sem valores, são preenchidas
+    com ``fill_means``, se informado.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame a ser preenchido
+    groups : dict[str, str]
+        Dicionário em que cada chave é uma coluna e o valor é o seu grupo (ver
+        ``group_keys``)
+    group_means : dict[str, pd.Series]
+        Média de cada coluna, indexada pela chave do grupo
+    fill_means : pd.Series, optional
+        Média de cada coluna usada quando não há média do grupo
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com as linhas preenchidas
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({'G': [1, 2, 1, 3, np.nan], 'A': [np.nan, np.nan, 5.0, np.nan, np.nan]})
+    >>> means = {'A': pd.Series({1.0: 5.0, 2.0: 8.0})}
+    >>> fill_group_means(df, {'A': 'G'}, means, pd.Series({'A': 6.0}))['A'].tolist()
+    [5.0, 8.0, 5.0, 6.0, 6.0]
+    """
+    for column, group in groups.items():
+        try:
+            missing = df[column].isna().to_numpy()
+        except KeyError:
+            raise KeyError(f"Erro: coluna {column} não encontrada.")
+        if not missing.any():
+            continue
+
+        values = group_means[column].reindex(group_keys(df, group)[missing]).to_numpy(dtype=np.float64)
+        if fill_means is not None and column in fill_means:
+            values = np.where(np.isnan(values), fill_means[column], values)
+
+        df.loc[missing, column] = values
+
+    return df
+
+
+def prepare_chunk(chunk: pd.DataFrame, config_data: dict, profile: profiling.StageProfile = None) -> pd.DataFrame:
+    """Primeira etapa da limpeza de um bloco de dados brutos: define o índice,
+    remove as linhas duplicadas, remove as colunas que não serão utilizadas e as
+    linhas sem valor nas colunas obrigatórias. Com a opção ``deduplication`` igual a
+    'global', as linhas duplicadas já foram removidas dos blocos brutos por
+    ``dedup.deduplicate_block`` e não são procuradas novamente.
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        Bloco de dados brutos
+    config_data : dict
+        Configurações da limpeza
+    profile : profiling.StageProfile, optional
+        Medidas das etapas 'dedup' e 'dropna'
+
+    Returns
+    -------
+    pd.DataFrame
+        Bloco parcialmente tratado
+    """
+    df_index = config_data['df_index']
+    columns_to_dropna = config_data['columns_to_dropna']
+    if profile is None:
+        profile = profiling.StageProfile()
+
+    try:
+        chunk.set_index(df_index, inplace=True)
+    except KeyError:
+        raise KeyError(f"Erro: coluna {df_index} não encontrada.")
+
+    # Blocos lidos por raw_data não possuem as colunas removidas, então as linhas
+    # repetidas são identificadas pelo hash da linha inteira
+    started, rows_in = profile.start(), len(chunk)
+    if raw_data.row_hash_column in chunk.columns:
+        chunk.drop_duplicates(subset=[raw_data.row_hash_column], inplace=True)
+        chunk.drop(columns=[raw_data.row_hash_column], inplace=True)
+        profile.stop('dedup', started, rows_in, len(chunk))
+    elif config_data.get('deduplication', 'chunk') != 'global':
+        chunk.drop_duplicates(inplace=True)
+        profile.stop('dedup', started, rows_in, len(chunk))
+
+    # Remove as colunas que não serão utilizadas
+    chunk.drop(columns=config_data['columns_to_remove'], inplace=True, errors="ignore")
+
+    started, rows_in = profile.start(), len(chunk)
+    try:
+        chunk.dropna(subset=columns_to_dropna, inplace=True)
+    except KeyError:
+        raise KeyError(f"Erro: conjunto de colunas {columns_to_dropna} inválido")
+    profile.stop('dropna', started, rows_in, len(chunk))
+
+    return chunk
+
+
+def clean_chunk(chunk: pd.DataFrame, config_data: dict, fill_means: pd.Series = None,
+                z_mean: pd.Series = None, z_std: pd.Series = None,
+                plan: filters.FilterPlan = None, profile: profiling.StageProfile = None,
+                group_means: dict[str, pd.Series] = None, median: pd.Series = None,
+                scale: pd.Series = None) -> pd.DataFrame:
+    """Aplica todas as etapas da limpeza a um bloco de dados brutos. As médias usadas
+    no preenchimento e as estatísticas do Z-Score podem ser informadas (por exemplo,
+    calculadas sobre o arquivo inteiro por ``collect_statistics``); caso contrário, são
+    calculadas sobre o próprio bloco. As colunas em ``fill_mean_groups`` são preenchidas
+    com a média do grupo da linha e, se não houver, com a média da coluna. Com a opção
+    ``z_score_strata``, as estatísticas do Z-Score são as de cada estrato, e as colunas
+    com o método 'mad' em ``outlier_methods`` são filtradas pela mediana e pelo MAD. A
+    quantidade de linhas rejeitadas por cada restrição é registrada em
+    ``attrs['rejections']`` do bloco tratado, a quantidade de linhas que violam cada
+    regra de consistência em ``attrs['violations']`` e as medidas de cada etapa em
+    ``attrs['stages']`` (ver ``profiling.StageProfile``).
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        Bloco de dados brutos
+    config_data : dict
+        Configurações da limpeza
+    fill_means : pd.Series, optional
+        Valores usados no preenchimento das colunas em ``columns_to_fill_mean``
+    z_mean : pd.Series | pd.DataFrame, optional
+        Média das colunas filtradas pelo Z-Score ou, com ``z_score_strata``, a média de
+        cada estrato
+    z_std : pd.Series | pd.DataFrame, optional
+        Desvio padrão das colunas filtradas pelo Z-Score ou de cada estrato
+    plan : filters.FilterPlan, optional
+        Plano de filtros compilado a partir de ``restrictions`` e ``consistency_rules``.
+        Se não for informado, é compilado a partir da configuração
+    profile : profiling.StageProfile, optional
+        Medidas das etapas, às quais são somadas as medidas deste bloco
+    group_means : dict[str, pd.Series], optional
+        Média de cada coluna em ``fill_mean_groups`` por grupo
+    median : pd.Series, optional
+        Mediana das colunas filtradas pelo MAD
+    scale : pd.Series, optional
+        Escala robusta das colunas filtradas pelo MAD
+
+    Returns
+    -------
+    pd.DataFrame
+        Bloco tratado, com os tipos definidos por ``schema.infer_schema``
+    """
+    columns_to_fill_mean = config_data['columns_to_fill_mean']
+    # Arquivos de configuração antigos não possuem o preenchimento por grupo
+    fill_mean_groups = config_data.get('fill_mean_groups') or {}
+    if plan is None:
+        plan = filters.FilterPlan.from_config(config_data)
+    if profile is None:
+        profile = profiling.StageProfile(config_data.get('trace_memory', False))
+
+    chunk = prepare_chunk(chunk, config_data, profile)
+
+    started, rows_in = profile.start(), len(chunk)
+    try:
+        # Preenche as linhas vazias, trocando pela média do grupo ou pela média dos valores
+        if fill_means is None:
+            fill_means = chunk[columns_to_fill_mean].mean()
+        if group_means is None:
+            group_means = {column: statistics.means()[column] for column, statistics in group_statistics(chunk, fill_mean_groups).items()}
+        chunk = fill_group_means(chunk, fill_mean_groups, group_means, fill_means)
+        chunk[columns_to_fill_mean] = chunk[columns_to_fill_mean].fillna(fill_means)
+    except KeyError:
+        raise KeyError(f"Erro: conjunto de colunas {columns_to_fill_mean} inválido")
+    profile.stop('fill_mean', started, rows_in, len(chunk))
+
+    started, rows_in = profile.start(), len(chunk)
+    chunk.dropna(inplace=True)
+    profile.stop('dropna_any', started, rows_in, len(chunk))
+
+    try:
+        # Converte o tipo de dados do DataFrame
+        chunk = profile.run('astype', pd.DataFrame.astype, chunk, np.int32)
+    except TypeError:
+        raise TypeError("Erro: todos os valores devem ser inteiros")
+
+    # Remove as linhas em que as colunas categóricas estão com algum valor não aceito
+    # ou que violam alguma regra de consistência entre colunas
+    rejections = {}
+    violations = {}
+    chunk = profile.run('filter_rows', plan.apply, chunk, rejections, violations)
+
+    # Preenche as colunas com valores padrão especificados
+    chunk = profile.run('fill_columns', fill_columns, chunk, config_data['columns_to_fill_values'])
+
+    # Remove as linhas que possuem possíveis outliers em alguma coluna, em relação a todo
+    # o arquivo ou ao estrato da linha
+    z_score_strata = config_data.get('z_score_strata')
+    z_columns, mad_columns = outlier_columns(config_data)
+
+    # A mediana e a escala do bloco são calculadas antes do filtro por Z-Score, como as
+    # do arquivo inteiro
+    if mad_columns and (median is None or scale is None):
+        sketch = streaming.QuantileSketch(mad_columns)
+        sketch.update(chunk)
+        median, scale = sketch.medians(), sketch.scales()
+
+    if z_score_strata is None:
+        chunk = profile.run('filter_by_z_score', filter_by_z_score, chunk, z_columns,
+                            config_data['z_score_limit'], z_mean, z_std)
+    else:
+        chunk = profile.run('filter_by_z_score', filter_by_strata_z_score, chunk, z_columns,
+                            config_data['z_score_limit'], z_score_strata, z_mean, z_std)
+
+    if mad_columns:
+        chunk = profile.run('filter_by_mad', filter_by_mad, chunk, mad_columns,
+                            config_data.get('mad_limit', 3.5), median, scale)
+
+    # Converte as colunas para os menores tipos que representam seus valores. A conversão
+    # é feita após os filtros, que garantem que os valores cabem nos tipos
+    chunk = profile.run('apply_schema', schema.apply_schema, chunk, schema.infer_schema(config_data, chunk.columns))
+
+    chunk.attrs['rejections'] = rejections
+    chunk.attrs['violations'] = violations
+    chunk.attrs['stages'] = profile.stages
+    return chunk
+
+
+def chunk_statistics(chunk: pd.DataFrame, config_data: dict, plan: filters.FilterPlan = None) -> tuple:
+    """Calcula, para um bloco de dados brutos, os acumuladores usados por
+    ``collect_statistics``. O bloco passa pelas mesmas etapas de ``clean_chunk``
+    até o filtro por Z-Score, exceto que as colunas preenchidas pela média ficam
+    vazias, pois a média do arquivo inteiro ainda não é conhecida.
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        Bloco de dados brutos
+    config_data : dict
+        Configurações da limpeza
+    plan : filters.FilterPlan, optional
+        Plano de filtros compilado a partir de ``restrictions`` e ``consistency_rules``
+
+    Returns
+    -------
+    tuple[streaming.RunningStats, streaming.RunningStats | streaming.GroupedStats, dict, dict, streaming.QuantileSketch]
+        Acumulador das colunas preenchidas pela média, acumulador das colunas
+        filtradas pelo Z-Score (por estrato, com ``z_score_strata``), o acumulador por
+        grupo de cada coluna em ``fill_mean_groups``, para cada coluna preenchida pela
+        média, a quantidade de valores ausentes que chegam ao filtro por Z-Score,
+        indexada pelo grupo do preenchimento (NaN sem ``fill_mean_groups``) e pelo
+        estrato (NaN sem ``z_score_strata``), e o histograma das colunas filtradas
+        pelo MAD
+    """
+    columns_to_fill_mean = config_data['columns_to_fill_mean']
+    fill_mean_groups = config_data.get('fill_mean_groups') or {}
+    z_score_strata = config_data.get('z_score_strata')
+
+    chunk = prepare_chunk(chunk, config_data)
+
+    fill_stats = streaming.RunningStats(columns_to_fill_mean)
+    fill_stats.update(chunk)
+    group_stats = group_statistics(chunk, fill_mean_groups)
+
+    # As colunas preenchidas pela média mantêm os valores ausentes e são truncadas
+    # como na conversão para np.int32
+    other_columns = [column for column in chunk.columns if column not in columns_to_fill_mean]
+    chunk.dropna(subset=other_columns, inplace=True)
+    try:
+        chunk[other_columns] = chunk[other_columns].astype(np.int32)
+    except TypeError:
+        raise TypeError("Erro: todos os valores devem ser inteiros")
+    chunk[columns_to_fill_mean] = np.trunc(chunk[columns_to_fill_mean])
+
+    if plan is None:
+        plan = filters.FilterPlan.from_config(config_data)
+
+    chunk = plan.apply(chunk)
+    chunk = fill_columns(chunk, config_data['columns_to_fill_values'])
+
+    if z_score_strata is None:
+        strata = np.full(len(chunk), np.nan)
+        z_stats = streaming.RunningStats(config_data['columns_to_filter_by_z_score'])
+        z_stats.update(chunk)
+    else:
+        strata = group_keys(chunk, z_score_strata)
+        z_stats = streaming.GroupedStats(config_data['columns_to_filter_by_z_score'])
+        z_stats.update(chunk, strata)
+
+    sketch = streaming.QuantileSketch(outlier_columns(config_data)[1])
+    sketch.update(chunk)
+
+    # Valores ausentes de cada grupo do preenchimento e de cada estrato, que serão
+    # preenchidos com a média do grupo ou da coluna
+    missing = {}
+    for column in columns_to_fill_mean:
+        rows = chunk[column].isna().to_numpy()
+        if column in fill_mean_groups:
+            groups = group_keys(chunk, fill_mean_groups[column])[rows]
+        else:
+            groups = np.full(rows.sum(), np.nan)
+        missing[column] = pd.DataFrame({'group': groups, 'stratum': strata[rows]}).value_counts(dropna=False)
+
+    return fill_stats, z_stats, group_stats, missing, sketch
+
+
+def clean_block(block: bytes, options: dict, config_data: dict, fill_means: pd.Series = None,
+                z_mean: pd.Series = None, z_std: pd.Series = None,
+                plan: filters.FilterPlan = None, group_means: dict[str, pd.Series] = None,
+                median: pd.Series = None, scale: pd.Series = None) -> pd.DataFrame:
+    """Converte um bloco de linhas do arquivo de dados brutos em DataFrame, com
+    ``raw_data.parse_raw_block``, e aplica ``clean_chunk``. Permite que a conversão
+    também seja feita nos processos que tratam os blocos. A conversão é medida como a
+    etapa 'parse', junto com as etapas de ``clean_chunk``.
+
+    Parameters
+    ----------
+    block : bytes
+        Linhas do bloco, sem o cabeçalho
+    options : dict
+        Opções de leitura geradas por ``raw_data.reader_options``
+    config_data : dict
+        Configurações da limpeza
+    fill_means, z_mean, z_std : pd.Series, optional
+        Estatísticas repassadas para ``clean_chunk``
+    plan : filters.FilterPlan, optional
+        Plano de filtros repassado para ``clean_chunk``
+    group_means : dict[str, pd.Series], optional
+        Médias por grupo repassadas para ``clean_chunk``
+    median, scale : pd.Series, optional
+        Mediana e escala robusta repassadas para ``clean_chunk``
+
+    Returns
+    -------
+    pd.DataFrame
+        Bloco tratado
+    """
+    profile = profiling.StageProfile(config_data.get('trace_memory', False))
+
+    started = profile.start()
+    chunk = raw_data.parse_raw_block(block, options)
+    profile.stop('parse', started, block.count(b'\n'), len(chunk))
+
+    return clean_chunk(chunk, config_data, fill_means, z_mean, z_std, plan, profile, group_means, median, scale)
+
+
+def block_statistics(block: bytes, options: dict, config_data: dict, plan: filters.FilterPlan = None) -> tuple:
+    """Converte um bloco de linhas do arquivo de dados brutos em DataFrame e aplica
+    ``chunk_statistics``.
+    """
+    return chunk_statistics(raw_data.parse_raw_block(block, options), config_data, plan)
+
+
+def map_chunks(function, chunks, jobs: int = 1, *args):
+    """Aplica ``function(chunk, *args)`` a cada bloco e devolve os resultados na
+    mesma ordem dos blocos. Com ``jobs`` maior que 1, os blocos são distribuídos
+    entre ``jobs`` processos, com no máximo ``2 * jobs`` blocos em andamento, de
+    forma que a memória usada continua limitada.
+
+    Parameters
+    ----------
+    function : Callable
+        Função aplicada a cada bloco. Deve ser definida no nível do módulo
+    chunks : Iterator[pd.DataFrame]
+        Blocos de dados
+    jobs : int, optional
+        Quantidade de processos
+    *args
+        Argumentos adicionais passados para ``function``
+
+    Returns
+    -------
+    Iterator
+        Iterador sobre os resultados, na ordem dos blocos
+
+    Examples
+    --------
+    >>> chunks = [pd.DataFrame({'A': [1, 2]}), pd.DataFrame({'A': [3]})]
+    >>> list(map_chunks(len, chunks, 1))
+    [2, 1]
+    """
+    if jobs <= 1:
+        for chunk in chunks:
+            yield function(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk, *args))
+
+            # Aguarda o bloco mais antigo antes de ler novos blocos
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def collect_statistics(chunks, config_data: dict, jobs: int = 1, options: dict = None,
+                       group_means: dict = None, robust: dict = None) -> tuple[pd.Series, pd.Series, pd.Series]:
+    """Percorre todos os blocos de dados brutos e calcula as estatísticas exatas do
+    arquivo inteiro usadas na limpeza: as médias de preenchimento e a média e o desvio
+    padrão das colunas filtradas pelo Z-Score. Somente os acumuladores ficam na memória.
+    As médias por grupo das colunas em ``fill_mean_groups`` são calculadas na mesma
+    passagem e gravadas em ``group_means``. Com a opção ``z_score_strata``, a média e
+    o desvio padrão são calculados para cada estrato e retornados como DataFrames
+    indexados pela chave do estrato. A mediana e a escala robusta das colunas filtradas
+    pelo MAD são calculadas a partir de histogramas combinados e gravadas em ``robust``.
+
+    Parameters
+    ----------
+    chunks : Iterator[pd.DataFrame] | Iterator[bytes]
+        Blocos de dados brutos, já convertidos em DataFrame ou, se ``options`` for
+        informado, como linhas do arquivo
+    config_data : dict
+        Configurações da limpeza
+    jobs : int, optional
+        Quantidade de processos usados no cálculo dos acumuladores de cada bloco
+    options : dict, optional
+        Opções de leitura geradas por ``raw_data.reader_options``
+    group_means : dict, optional
+        Dicionário em que é gravada a média por grupo de cada coluna em
+        ``fill_mean_groups``, indexada pela chave do grupo
+    robust : dict, optional
+        Dicionário em que são gravadas a mediana ('median') e a escala robusta
+        ('scale') das colunas filtradas pelo MAD
+
+    Returns
+    -------
+    tuple[pd.Series, pd.Series | pd.DataFrame, pd.Series | pd.DataFrame]
+        Médias de preenchimento, médias e desvios padrões para o Z-Score
+    """
+    columns_to_fill_mean = config_data['columns_to_fill_mean']
+    columns_to_filter_by_z_score = config_data['columns_to_filter_by_z_score']
+    fill_mean_groups = config_data.get('fill_mean_groups') or {}
+    z_score_strata = config_data.get('z_score_strata')
+
+    fill_stats = streaming.RunningStats(columns_to_fill_mean)
+    if z_score_strata is None:
+        z_stats = streaming.RunningStats(columns_to_filter_by_z_score)
+    else:
+        z_stats = streaming.GroupedStats(columns_to_filter_by_z_score)
+    group_stats = {column: streaming.GroupedStats([column]) for column in fill_mean_groups}
+    missing = {column: [] for column in columns_to_fill_mean}
+    mad_columns = outlier_columns(config_data)[1]
+    sketch = streaming.QuantileSketch(mad_columns)
+    plan = filters.FilterPlan.from_config(config_data)
+
+    # Os acumuladores são combinados na ordem dos blocos, como na execução serial
+    if options is None:
+        results = map_chunks(chunk_statistics, chunks, jobs, config_data, plan)
+    else:
+        results = map_chunks(block_statistics, chunks, jobs, options, config_data, plan)
+
+    for chunk_fill_stats, chunk_z_stats, chunk_group_stats, chunk_missing, chunk_sketch in results:
+        fill_stats.merge(chunk_fill_stats)
+        z_stats.merge(chunk_z_stats)
+        sketch.merge(chunk_sketch)
+        for column in fill_mean_groups:
+            group_stats[column].merge(chunk_group_stats[column])
+        for column in columns_to_fill_mean:
+            missing[column].append(chunk_missing[column])
+
+    fill_means = fill_stats.means()
+    means = {column: statistics.means()[column] for column, statistics in group_stats.items()}
+    if group_means is not None:
+        group_means.update(means)
+
+    # Os valores ausentes serão preenchidos com a média truncada, do grupo ou da coluna,
+    # então entram no Z-Score do seu estrato e no histograma
+    for column in columns_to_fill_mean:
+        if column not in columns_to_filter_by_z_score or np.isnan(fill_means[column]) or not missing[column]:
+            continue
+
+        counts = pd.concat(missing[column]).groupby(level=[0, 1], dropna=False).sum()
+        values = np.full(len(counts), fill_means[column])
+        if column in fill_mean_groups:
+            values = means[column].reindex(counts.index.get_level_values('group')).fillna(fill_means[column]).to_numpy()
+
+        strata = counts.index.get_level_values('stratum')
+        for stratum, value, count in zip(strata, np.trunc(values), counts.to_numpy()):
+            if z_score_strata is None:
+                z_stats.add_constant(column, value, count)
+            else:
+                z_stats.add_constant(stratum, column, value, count)
+            if column in mad_columns:
+                sketch.add_constant(column, value, count)
+
+    if robust is not None:
+        robust.update({'median': sketch.medians(), 'scale': sketch.scales()})
+
+    return fill_means, z_stats.means(), z_stats.stds()
+
+
+def sum_rejections(chunk_records: list[dict], restrictions: dict[str, list], key: str = 'rejections') -> dict[str, int]:
+    """Soma as linhas rejeitadas por cada restrição nos blocos registrados no manifesto.
+    Com ``key`` igual a 'violations', soma as linhas que violam cada regra de consistência.
+
+    Parameters
+    ----------
+    chunk_records : list[dict]
+        Registros dos blocos gravados
+    restrictions : dict[str, list]
+        Restrições de valores (ou regras de consistência) da configuração
+    key : str, optional
+        Chave dos registros com as contagens de cada bloco
+
+    Returns
+    -------
+    dict[str, int]
+        Quantidade de linhas rejeitadas por coluna (ou por regra)
+
+    Examples
+    --------
+    >>> sum_rejections([{'rejections': {'A': 1}}, {'rejections': {'A': 2, 'B': 1}}], {'A': [1], 'B': [1]})
+    {'A': 3, 'B': 1}
+    """
+    rejections = {column: 0 for column in restrictions}
+    for chunk_record in chunk_records:
+        for column, count in chunk_record.get(key, {}).items():
+            rejections[column] = rejections.get(column, 0) + count
+
+    return rejections
+
+
+def load_data(path_input: str, path_output: str, config_file_path: str = 'data/config.yaml', jobs: int = None):
     """Função que recebe o arquivo com o conjunto de dados brutos e gera
-    um arquivo com os dados tratados. Todos os dados no arquivo de saída
-    são do tipo np.int32
+    um arquivo com os dados tratados. Todos os dados no arquivo de saída são
+    inteiros, com o tipo de cada coluna definido por ``schema.infer_schema`` e
+    gravado ao lado dos dados tratados para ser usado pelos leitores
+
+    Se a opção ``statistics_scope`` da configuração for 'global', o arquivo é lido
+    duas vezes: a primeira calcula as médias de preenchimento e as estatísticas do
+    Z-Score do arquivo inteiro e a segunda aplica a limpeza com esses valores. Com
+    'chunk', as estatísticas são calculadas em cada bloco, e o resultado depende do
+    tamanho dos blocos.
+
+    Com a opção ``deduplication`` igual a 'global', as linhas repetidas são removidas
+    de todo o arquivo, mantendo a primeira ocorrência, antes das duas leituras; com
+    'chunk', somente dentro de cada bloco. Os hashes das linhas já vistas ocupam cerca
+    de 8 bytes por linha distinta (ver ``dedup``).
+
+    A opção ``jobs`` define a quantidade de processos que tratam os blocos em paralelo.
+    A leitura e a gravação continuam em um único processo, na ordem do arquivo, então
+    o resultado é idêntico ao da execução serial.
+
+    O progresso é registrado em um manifesto (ver ``checkpoint``) a cada bloco gravado,
+    junto com a quantidade de linhas rejeitadas por cada restrição e por cada regra de
+    consistência (``consistency_rules``). Ao final, é gravado
+    um relatório da execução (ver ``profiling``) com o tempo, as linhas de entrada e de
+    saída e o pico de memória de cada etapa, somados entre os blocos e os processos.
+    Se a execução for interrompida, a próxima chamada com o mesmo arquivo de entrada e
+    as mesmas configurações retoma a limpeza a partir do último bloco gravado; caso
+    contrário, os dados tratados anteriores são removidos e a limpeza recomeça.
 
     Parameters
     ----------
     path_input : str
         Endereço do arquivo com os dados brutos
     path_output : str
-        Endereço em que será criado o arquivo com os dados tratados
+        Endereço em que será criado o arquivo com os dados tratados. Se o formato
+        de saída configurado for 'parquet', é o diretório do conjunto particionado
+    config_file_path : str, optional
+        Endereço do arquivo de configuração da limpeza
+    jobs : int, optional
+        Quantidade de processos da limpeza. Se não for informada, é usada a opção
+        ``jobs`` da configuração
     
     Returns
     -------
     None
     """
-    # Verifica se o arquivo de configuração existe, caso contrário gera o arquivo
-    config_file_path = 'data/config.yaml'
-    if not os.path.exists(config_file_path):
-        config.generate_config_file(config_file_path)
-
     # Carrega os dados do arquivo de configuração
-    with open(config_file_path, 'r') as file:
-        config_data = yaml.safe_load(file)
+    config_data = config.load_config(config_file_path)
 
     df_index = config_data['df_index']
     columns_to_remove = config_data['columns_to_remove']
-    restrictions = config_data['restrictions']
-    columns_to_dropna = config_data['columns_to_dropna']
-    columns_to_fill_mean = config_data['columns_to_fill_mean']
-    columns_to_fill_values = config_data['columns_to_fill_values']
-    columns_to_filter_by_z_score = config_data['columns_to_filter_by_z_score']
-    z_score_limit = config_data['z_score_limit']
-    
-    try:
-        df = pd.read_csv(path_input, encoding="unicode_escape", engine="python", sep=";", iterator=True, chunksize=100000)
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Erro: Arquivo {path_input} não encontrado.")
+    # Arquivos de configuração antigos não possuem as opções de leitura e de estatísticas
+    csv_engine = config_data.get('csv_engine', 'python')
+    csv_encoding = config_data.get('csv_encoding', 'unicode_escape')
+    output_format = config_data.get('output_format', 'csv')
+    statistics_scope = config_data.get('statistics_scope', 'chunk')
+    deduplication = config_data.get('deduplication', 'chunk')
+    if jobs is None:
+        jobs = config_data.get('jobs', 1)
 
-    for chunk in df:
-        try:
-            chunk.set_index(df_index, inplace=True)
-        except KeyError:
-            raise KeyError(f"Erro: coluna {df_index} não encontrada.")
+    if statistics_scope not in ('chunk', 'global'):
+        raise ValueError(f"Erro: escopo de estatísticas {statistics_scope} não suportado.")
+    if deduplication not in ('chunk', 'global'):
+        raise ValueError(f"Erro: deduplicação {deduplication} não suportada.")
 
-        chunk.drop_duplicates(inplace=True)
+    options = raw_data.reader_options(path_input, df_index, columns_to_remove, csv_engine, csv_encoding)
+    # Na deduplicação global, os blocos chegam aos processos sem linhas repetidas
+    options['row_hashes'] = deduplication != 'global'
 
-        # Remove as colunas que não serão utilizadas
-        chunk.drop(columns=columns_to_remove, inplace=True, errors="ignore")
+    # Com estatísticas e deduplicação globais, o resultado não depende da divisão em
+    # blocos, então cada bloco tem o tamanho que cabe no orçamento de memória, com os
+    # blocos em andamento em todos os processos e os blocos lidos antecipadamente
+    chunksize = raw_chunksize
+    if statistics_scope == 'global' and deduplication == 'global':
+        chunksize = chunking.ChunkSizer(options['dtypes'], chunking.memory_budget(config_data.get('memory_budget_mb')),
+                                        (1 if jobs <= 1 else 2 * jobs) + chunking.prefetch_blocks, raw_field_bytes * len(options['columns']))
 
-        try:
-            chunk.dropna(subset=columns_to_dropna, inplace=True)
-        except KeyError:
-            raise KeyError(f"Erro: conjunto de colunas {columns_to_dropna} inválido")
+    run_started = time.perf_counter()
+    statistics_seconds = 0.0
+    profile = profiling.StageProfile(config_data.get('trace_memory', False))
 
-        try:
-            # Preenche as linhas vazias, trocando pela média dos valores
-            columns_mean = chunk[columns_to_fill_mean].mean()
-            chunk[columns_to_fill_mean] = chunk[columns_to_fill_mean].fillna(columns_mean)
-        except KeyError:
-            raise KeyError(f"Erro: conjunto de colunas {columns_to_fill_mean} inválido")
+    def raw_blocks(offset: int = None, fingerprints: dedup.FingerprintSet = None, profile: profiling.StageProfile = None,
+                   stop: int = None):
+        """Lê os blocos brutos a partir de ``offset`` e até ``stop``, removendo as
+        linhas repetidas na deduplicação global."""
+        for start, rows, block in raw_data.read_raw_blocks(path_input, chunksize, offset):
+            if stop is not None and start >= stop:
+                break
+            # Com blocos de tamanho variável, o bloco que passa de ``stop`` é cortado
+            if stop is not None and start + len(block) > stop:
+                block = block[:stop - start]
+                rows = len(raw_data.split_records(block, options))
+            end = start + len(block)
+            duplicates = 0
+            if fingerprints is not None:
+                started = time.perf_counter()
+                block, duplicates = dedup.deduplicate_block(block, fingerprints, options)
+                if profile is not None:
+                    profile.add('dedup', time.perf_counter() - started, rows, rows - duplicates, profiling.peak_memory())
+            yield start, end, rows, duplicates, block
 
-        chunk.dropna(inplace=True)
+    index_rows = config_data.get('index_rows') if output_format != 'parquet' else None
+    writer = dataset.DatasetWriter(path_output, output_format, threads=config_data.get('compression_threads'),
+                                   index_rows=index_rows)
 
-        try:
-            # Converte o tipo de dados do DataFrame
-            chunk = chunk.astype(np.int32)
-        except TypeError:
-            raise TypeError("Erro: todos os valores devem ser inteiros")
-        
-        # Remove as linhas em que as colunas categóricas estão com algum valor não aceito
-        chunk = filter_rows(chunk, restrictions)
+    # Retoma a execução anterior somente se ela usou a mesma entrada e as mesmas configurações
+    signature = checkpoint.run_signature(path_input, config_data, raw_chunksize)
+    manifest = checkpoint.load_manifest(path_output)
 
-        # Preenche as colunas com valores padrão especificados
-        chunk = fill_columns(chunk, columns_to_fill_values)
+    if manifest is not None and manifest['signature'] == signature:
+        if manifest['complete']:
+            return
 
-        # Remove as linhas que possuem possíveis outliers em alguma coluna
-        chunk = filter_by_z_score(chunk, columns_to_filter_by_z_score, z_score_limit)
+        committed = manifest['chunks']
+        output_size = committed[-1]['output_size'] if committed else 0
 
-        # Salva o DataFrame no arquivo de saída
-        if not os.path.exists(path_output):
-            chunk.to_csv(path_output, mode='w', sep=';')
+        # Um arquivo menor do que o registrado não pode ser retomado
+        if output_size is not None and (writer.size() or 0) < output_size:
+            manifest = None
         else:
-            chunk.to_csv(path_output, mode='a', header=False, sep=';')
+            writer.truncate(len(committed), output_size, sum(chunk_record['rows_written'] for chunk_record in committed))
+    else:
+        manifest = None
+
+    if manifest is None:
+        checkpoint.remove_manifest(path_output)
+        dataset.remove_dataset(path_output)
+        manifest = {'signature': signature, 'statistics': None, 'chunks': [], 'complete': False}
+
+    if statistics_scope == 'global' and manifest['statistics'] is None:
+        fingerprints = dedup.FingerprintSet() if deduplication == 'global' else None
+        # Os blocos são lidos e deduplicados em segundo plano enquanto os anteriores são processados
+        blocks = chunking.prefetch(block for _, _, _, _, block in raw_blocks(fingerprints=fingerprints))
+        started = time.perf_counter()
+        group_means = {}
+        robust = {}
+        fill_means, z_mean, z_std = collect_statistics(blocks, config_data, jobs, options, group_means, robust)
+        statistics_seconds = time.perf_counter() - started
+
+        manifest['statistics'] = {
+            'fill_means': fill_means.to_dict(),
+            'z_mean': z_mean.to_dict(),
+            'z_std': z_std.to_dict(),
+            # As chaves dos grupos são gravadas como texto no JSON
+            'group_means': {column: {str(key): value for key, value in means.items()} for column, means in group_means.items()},
+            'median': robust['median'].to_dict(),
+            'scale': robust['scale'].to_dict()
+        }
+        checkpoint.save_manifest(path_output, manifest)
+
+    statistics = (None, None, None)
+    group_means = None
+    robust = (None, None)
+    if manifest['statistics'] is not None:
+        if config_data.get('z_score_strata') is None:
+            statistics = tuple(pd.Series(manifest['statistics'][key], dtype=np.float64) for key in ('fill_means', 'z_mean', 'z_std'))
+        else:
+            # Estatísticas de cada estrato, cujas chaves são gravadas como texto no JSON
+            z_mean, z_std = (pd.DataFrame(manifest['statistics'][key], dtype=np.float64) for key in ('z_mean', 'z_std'))
+            z_mean.index, z_std.index = z_mean.index.astype(np.float64), z_std.index.astype(np.float64)
+            statistics = (pd.Series(manifest['statistics']['fill_means'], dtype=np.float64), z_mean, z_std)
+        group_means = {column: pd.Series({float(key): value for key, value in means.items()}, dtype=np.float64)
+                       for column, means in manifest['statistics'].get('group_means', {}).items()}
+        robust = tuple(pd.Series(manifest['statistics'].get(key, {}), dtype=np.float64) for key in ('median', 'scale'))
+
+    # Esquema dos dados tratados, usado pelos leitores do conjunto de dados
+    schema.save_schema(path_output, schema.infer_schema(config_data, list(options['dtypes'])))
+
+    committed = manifest['chunks']
+    offset = committed[-1]['end'] if committed else None
+
+    fingerprints = None
+    if deduplication == 'global':
+        fingerprints = dedup.FingerprintSet()
+        # Ao retomar, os hashes das linhas dos blocos já gravados são recalculados
+        if offset is not None:
+            for _ in raw_blocks(fingerprints=fingerprints, stop=offset):
+                pass
+
+    # Posição e quantidade de linhas dos blocos lidos e ainda não gravados. A fila é
+    # preenchida pela leitura antecipada antes de cada bloco ser entregue
+    pending = deque()
+
+    def blocks():
+        for start, end, rows, duplicates, block in raw_blocks(offset, fingerprints, profile):
+            pending.append((start, end, rows, duplicates))
+            yield block
+
+    # As restrições e as regras são compiladas uma única vez e enviadas junto com cada bloco
+    plan = filters.FilterPlan.from_config(config_data)
+    rules = config_data.get('consistency_rules') or {}
+
+    # Os blocos tratados são gravados na ordem em que foram lidos; o próximo bloco é lido
+    # e deduplicado em segundo plano enquanto os anteriores são tratados e gravados
+    chunks_written = 0
+    for chunk in map_chunks(clean_block, chunking.prefetch(blocks()), jobs, options, config_data, *statistics, plan, group_means, *robust):
+        start, end, rows, duplicates = pending.popleft()
+        profile.merge(chunk.attrs.get('stages', {}))
+
+        # Salva o DataFrame no arquivo de saída
+        started = time.perf_counter()
+        row_offsets = writer.write(chunk)
+        profile.add('write', time.perf_counter() - started, len(chunk), len(chunk), profiling.peak_memory())
+
+        # Registra o bloco gravado
+        committed.append({
+            'offset': start,
+            'end': end,
+            'rows_read': rows,
+            'duplicates': duplicates,
+            'rows_written': len(chunk),
+            'rejections': chunk.attrs.get('rejections', {}),
+            'violations': chunk.attrs.get('violations', {}),
+            'output_size': writer.size(),
+            'row_offsets': row_offsets
+        })
+        checkpoint.save_manifest(path_output, manifest)
+        chunks_written += 1
+
+    writer.close()
+
+    # Índice de linhas do arquivo completo, com as posições gravadas em cada bloco
+    if index_rows is not None:
+        row_index.save_index(path_output, index_rows,
+                             [offset for chunk_record in committed for offset in chunk_record['row_offsets']],
+                             sum(chunk_record['rows_written'] for chunk_record in committed))
+
+    # Total de linhas rejeitadas por cada restrição
+    manifest['rejections'] = sum_rejections(committed, config_data['restrictions'])
+    manifest['violations'] = sum_rejections(committed, rules, 'violations')
+
+    manifest['complete'] = True
+    checkpoint.save_manifest(path_output, manifest)
+
+    # Relatório desta execução; os blocos gravados em execuções anteriores não entram
+    chunks_run = committed[len(committed) - chunks_written:]
+
+    profiling.save_report(path_output, {
+        'input': os.path.abspath(path_input),
+        'config_hash': signature['config_hash'],
+        'jobs': jobs,
+        'seconds': time.perf_counter() - run_started,
+        'statistics_seconds': statistics_seconds,
+        'chunks': chunks_written,
+        # Tamanho inicial e menor tamanho dos blocos ajustados ao orçamento de memória
+        'chunk_rows': getattr(chunksize, 'rows', chunksize),
+        'smallest_chunk_rows': getattr(chunksize, 'smallest', chunksize),
+        'rows_read': sum(chunk_record['rows_read'] for chunk_record in chunks_run),
+        'duplicates': sum(chunk_record['duplicates'] for chunk_record in chunks_run),
+        'rows_written': sum(chunk_record['rows_written'] for chunk_record in chunks_run),
+        'rejections': sum_rejections(chunks_run, config_data['restrictions']),
+        'violations': sum_rejections(chunks_run, rules, 'violations'),
+        'stages': profile.report()
+    })
+
+
+def dry_run(path_input: str, config_file_path: str = 'data/config.yaml', sample_rows: int = None,
+            seed: int = None) -> dict:
+    """Estima o efeito das configurações da limpeza sem tratar o arquivo inteiro. Uma
+    amostra aleatória uniforme das linhas do arquivo de dados brutos (ver ``sampling``)
+    passa por ``clean_chunk``, com as médias e as estatísticas dos filtros calculadas
+    na própria amostra, e a quantidade de linhas mantidas e removidas por cada etapa
+    (``dropping_stages``), por cada restrição e por cada regra de consistência é
+    projetada para o arquivo inteiro, com intervalos de confiança de 95% (ver
+    ``sampling.wilson_interval``). Nenhum arquivo é gravado.
+
+    Um par de linhas repetidas só aparece na amostra de ``n`` das ``N`` linhas quando as
+    duas são sorteadas, com probabilidade próxima de ``(n / N) ** 2``, então as linhas
+    repetidas da amostra (etapa 'dedup') são projetadas por esse fator, com o intervalo
+    de ``sampling.poisson_interval``, como na deduplicação 'global'. As demais
+    quantidades são proporções das linhas distintas da amostra, projetadas para as
+    linhas distintas estimadas do arquivo.
+
+    Em um CSV sem compactação, somente as linhas sorteadas são lidas, e a quantidade de
+    linhas do arquivo é estimada; os intervalos não consideram a incerteza dessa
+    estimativa. Nos demais arquivos, a amostra é sorteada durante uma leitura do
+    arquivo, sem conversão.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    config_file_path : str, optional
+        Endereço do arquivo de configuração da limpeza
+    sample_rows : int, optional
+        Quantidade de linhas da amostra. Se não for informada, é usada a opção
+        ``dry_run_rows`` da configuração
+    seed : int, optional
+        Semente do sorteio da amostra
+
+    Returns
+    -------
+    dict
+        Relatório com o tamanho da amostra, a quantidade de linhas do arquivo, se ela
+        foi estimada, o tempo gasto e, para as linhas mantidas ('kept') e para cada
+        etapa ('stages'), restrição ('rejections') e regra ('violations'), a quantidade
+        na amostra ('sample'), a proporção ('proportion') e a quantidade projetada
+        para o arquivo ('rows'), com os limites do intervalo ('low' e 'high')
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada não existe
+    ValueError
+        Nenhuma linha foi sorteada
+    """
+    started = time.perf_counter()
+    config_data = config.load_config(config_file_path)
+    if sample_rows is None:
+        sample_rows = config_data.get('dry_run_rows', 20000)
+
+    options = raw_data.reader_options(path_input, config_data['df_index'], config_data['columns_to_remove'],
+                                      config_data.get('csv_engine', 'python'), config_data.get('csv_encoding', 'unicode_escape'))
+
+    total_estimated = sampling.is_seekable(path_input)
+    if total_estimated:
+        # Uma linha possui ao menos os separadores das colunas e a quebra de linha
+        records, total_rows = sampling.sample_lines(path_input, sample_rows, len(options['columns']), seed)
+
+        # Sem linhas aceitas nos sorteios, a amostra é sorteada durante a leitura do arquivo
+        total_estimated = len(records) > 0
+    if not total_estimated:
+        records, total_rows = sampling.sample_records(path_input, options, sample_rows, seed)
+
+    sample_size = len(records)
+    if sample_size == 0:
+        raise ValueError(f"Erro: nenhuma linha sorteada do arquivo {path_input}.")
+
+    profile = profiling.StageProfile()
+    chunk = raw_data.parse_raw_block(raw_data.join_records(records, options), options)
+    chunk = clean_chunk(chunk, config_data, profile=profile)
+
+    stages = {name: profile.stages[name]['rows_in'] - profile.stages[name]['rows_out']
+              for name in dropping_stages if name in profile.stages}
+
+    # Linhas repetidas, projetadas pela probabilidade de as duas linhas de um par
+    # serem sorteadas
+    duplicates = stages.get('dedup', 0)
+    factor = (total_rows / sample_size) ** 2
+    low, high = sampling.poisson_interval(duplicates)
+    stages_report = {'dedup': {
+        'sample': int(duplicates),
+        'proportion': min(duplicates * factor, total_rows) / total_rows,
+        'rows': round(min(duplicates * factor, total_rows)),
+        'low': round(min(low * factor, total_rows)),
+        'high': round(min(high * factor, total_rows))
+    }}
+
+    # As demais etapas são aplicadas às linhas distintas
+    distinct_sample = sample_size - duplicates
+    distinct_rows = total_rows - stages_report['dedup']['rows']
+
+    def projection(count: int) -> dict:
+        low, high = sampling.wilson_interval(count, distinct_sample)
+        return {
+            'sample': int(count),
+            'proportion': count / distinct_sample if distinct_sample else 0.0,
+            'rows': round(count / distinct_sample * distinct_rows) if distinct_sample else 0,
+            'low': round(low * distinct_rows),
+            'high': round(high * distinct_rows)
+        }
+
+    stages_report.update({name: projection(count) for name, count in stages.items() if name != 'dedup'})
+
+    return {
+        'input': os.path.abspath(path_input),
+        'sample_rows': sample_size,
+        'total_rows': round(total_rows),
+        'total_rows_estimated': total_estimated,
+        'seconds': time.perf_counter() - started,
+        'kept': projection(len(chunk)),
+        'stages': stages_report,
+        'rejections': {column: projection(count) for column, count in chunk.attrs['rejections'].items()},
+        'violations': {name: projection(count) for name, count in chunk.attrs['violations'].items()}
+    }
+
+
+def is_cleaned(path_input: str, path_output: str, config_data: dict) -> bool:
+    """Verifica se os dados tratados estão completos e foram gerados a partir do
+    arquivo de entrada atual e das configurações atuais, comparando a assinatura
+    gravada no manifesto (ver ``checkpoint.run_signature``) com a atual. A verificação
+    lê somente algumas amostras do arquivo de entrada.
+
+    Se o arquivo de entrada não existir, os dados tratados completos são considerados
+    atuais, pois não há como limpá-los novamente.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+    config_data : dict
+        Configurações da limpeza
+
+    Returns
+    -------
+    bool
+        True se a limpeza não precisa ser refeita
+    """
+    if not checkpoint.is_complete(path_output):
+        return False
+
+    if not os.path.exists(raw_data.split_archive_path(path_input)[0]):
+        return True
+
+    manifest = checkpoint.load_manifest(path_output)
+    if manifest is None:
+        # Dados tratados por versões anteriores, sem manifesto, não têm assinatura
+        return False
+
+    return manifest['signature'] == checkpoint.run_signature(path_input, config_data, raw_chunksize)
+
+
+def input_year(path_input: str) -> int:
+    """Retorna o ano de um arquivo de dados brutos, dado pelo último grupo de quatro
+    dígitos do nome do arquivo. Em um arquivo dentro de um zip sem o ano no nome, é
+    usado o nome do zip.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+
+    Returns
+    -------
+    int
+        Ano do arquivo
+
+    Raises
+    ------
+    ValueError
+        O nome do arquivo não contém o ano
+
+    Examples
+    --------
+    >>> input_year('data/SINASC_2021.csv')
+    2021
+    >>> input_year('data/SINASC_2020.zip/DNOPEN.csv')
+    2020
+    """
+    path_file, member = raw_data.split_archive_path(path_input)
+
+    for name in (member, path_file):
+        if name is None:
+            continue
+        years = re.findall(r'(?<!\d)\d{4}(?!\d)', os.path.basename(name))
+        if years:
+            return int(years[-1])
+
+    raise ValueError(f"Erro: ano não encontrado no nome do arquivo {path_input}.")
+
+
+def load_batch(input_pattern: str, path_output: str, config_file_path: str = 'data/config.yaml'):
+    """Limpa todos os arquivos de dados brutos que correspondem a ``input_pattern``,
+    um por ano, gerando um conjunto de dados particionado por ano em ``path_output``
+    (ver ``dataset.partition_path``). Cada partição é limpa por ``load_data``, com seu
+    próprio manifesto, então os anos já limpos com as mesmas configurações são pulados
+    e os anos interrompidos são retomados.
+
+    Todos os anos devem ter as mesmas colunas depois da remoção das colunas da
+    configuração, de forma que as partições compartilham o mesmo esquema. Havendo mais
+    de um ano para limpar, os anos são tratados em paralelo, cada um em um processo,
+    com até ``jobs`` processos; caso contrário, os blocos de cada ano são tratados em
+    paralelo, como em ``load_data``.
+
+    Parameters
+    ----------
+    input_pattern : str
+        Padrão (glob) dos arquivos com os dados brutos, como 'data/SINASC_*.csv'
+    path_output : str
+        Endereço do diretório com as partições por ano
+    config_file_path : str, optional
+        Endereço do arquivo de configuração da limpeza
+
+    Returns
+    -------
+    list[int]
+        Anos do conjunto de dados
+
+    Raises
+    ------
+    FileNotFoundError
+        Nenhum arquivo corresponde ao padrão
+    ValueError
+        Dois arquivos são do mesmo ano ou possuem colunas diferentes
+    """
+    config_data = config.load_config(config_file_path)
+    output_format = config_data.get('output_format', 'csv')
+    jobs = config_data.get('jobs', 1)
+
+    inputs = {}
+    for path_input in sorted(glob.glob(input_pattern)):
+        year = input_year(path_input)
+        if year in inputs:
+            raise ValueError(f"Erro: os arquivos {inputs[year]} e {path_input} são do mesmo ano.")
+        inputs[year] = path_input
+
+    if not inputs:
+        raise FileNotFoundError(f"Erro: nenhum arquivo encontrado em {input_pattern}.")
+
+    # O esquema comum exige as mesmas colunas em todos os anos
+    columns = None
+    for year, path_input in inputs.items():
+        options = raw_data.reader_options(path_input, config_data['df_index'], config_data['columns_to_remove'],
+                                          config_data.get('csv_engine', 'python'), config_data.get('csv_encoding', 'unicode_escape'))
+        if columns is None:
+            columns = list(options['dtypes'])
+        elif list(options['dtypes']) != columns:
+            raise ValueError(f"Erro: as colunas do arquivo {path_input} são diferentes das dos outros anos.")
+
+    os.makedirs(path_output, exist_ok=True)
+
+    # Somente os anos ainda não limpos com a mesma entrada e as mesmas configurações são tratados
+    partitions = {year: dataset.partition_path(path_output, year, output_format) for year in inputs}
+    pending = [year for year in inputs if not is_cleaned(inputs[year], partitions[year], config_data)]
+
+    if len(pending) > 1 and jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            futures = [executor.submit(load_data, inputs[year], partitions[year], config_file_path, 1) for year in pending]
+            for future in futures:
+                future.result()
+    else:
+        for year in pending:
+            load_data(inputs[year], partitions[year], config_file_path)
+
+    return list(inputs)
 
 
 if __name__ == "__main__":
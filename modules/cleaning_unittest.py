@@ -4,9 +4,11 @@ import pandas.testing as pd_testing
 import numpy as np
 import io
 import sys
+import yaml
 import os
 
 import cleaning
+import dataset
 
 class TestCleaning(unittest.TestCase):
     def assertDataFrameEqual(self, a, b, msg):
@@ -193,5 +195,227 @@ class TestCleaning(unittest.TestCase):
         os.remove(path_input)
 
 
+    # Teste 11: estatísticas globais devem ser iguais para qualquer divisão em blocos
+    def test_collect_statistics_chunk_independent(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': ['A'],
+            'columns_to_fill_mean': ['B'],
+            'columns_to_fill_values': {},
+            'restrictions': {'A': [1, 2]},
+            'columns_to_filter_by_z_score': ['B']
+        }
+        data = pd.DataFrame({
+            'CONTADOR': range(8),
+            'A': [1, 2, 1, 3, np.NaN, 2, 1, 2],
+            'B': [10, np.NaN, 30, 40, 50, 60, np.NaN, 80]
+        })
+
+        def statistics(chunksize):
+            chunks = [data.iloc[i:i + chunksize].copy() for i in range(0, len(data), chunksize)]
+            return cleaning.collect_statistics(chunks, config_data)
+
+        fill_means, z_mean, z_std = statistics(3)
+
+        # Média de preenchimento sobre as linhas com 'A' válido e desvio padrão com a média truncada
+        self.assertAlmostEqual(fill_means['B'], 44.0)
+        self.assertAlmostEqual(z_mean['B'], np.mean([10, 44, 30, 60, 44, 80]))
+        self.assertAlmostEqual(z_std['B'], np.std([10, 44, 30, 60, 44, 80], ddof=1))
+
+        for result, expected in zip(statistics(8), (fill_means, z_mean, z_std)):
+            pd_testing.assert_series_equal(result, expected)
+
+    # Teste 12: função map_chunks em paralelo deve devolver os resultados na ordem dos blocos
+    def test_map_chunks_parallel_keeps_order(self):
+        chunks = [pd.DataFrame({'A': range(size)}) for size in [5, 1, 4, 2, 3]]
+
+        result = list(cleaning.map_chunks(len, iter(chunks), 2))
+
+        self.assertEqual(result, [5, 1, 4, 2, 3])
+
+    # Teste 13: função input_year deve ler o ano do nome do arquivo e levantar erro se não houver
+    def test_input_year(self):
+        self.assertEqual(cleaning.input_year('data/SINASC_2021.csv'), 2021)
+        self.assertEqual(cleaning.input_year('SINASC_2019_v2.csv.gz'), 2019)
+
+        with self.assertRaises(ValueError):
+            cleaning.input_year('data/SINASC.csv')
+
+    # Teste 14: função is_cleaned deve pedir nova limpeza somente quando a entrada ou as configurações mudam
+    def test_is_cleaned(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': ['A'],
+            'columns_to_fill_mean': [],
+            'columns_to_fill_values': {},
+            'restrictions': {'A': [1, 2]},
+            'columns_to_filter_by_z_score': [],
+            'z_score_limit': 4,
+            'jobs': 1
+        }
+        with open('config_test.yaml', 'w') as file:
+            yaml.dump(config_data, file)
+        pd.DataFrame({'CONTADOR': [1, 2, 3], 'A': [1, 2, 3]}).to_csv('input.csv', sep=';', index=False)
+
+        try:
+            self.assertFalse(cleaning.is_cleaned('input.csv', 'output.csv', config_data))
+            cleaning.load_data('input.csv', 'output.csv', 'config_test.yaml')
+
+            self.assertTrue(cleaning.is_cleaned('input.csv', 'output.csv', config_data))
+            self.assertTrue(cleaning.is_cleaned('input.csv', 'output.csv', {**config_data, 'jobs': 2}))
+            self.assertFalse(cleaning.is_cleaned('input.csv', 'output.csv', {**config_data, 'restrictions': {'A': [1]}}))
+
+            pd.DataFrame({'CONTADOR': [1, 2, 3, 4], 'A': [1, 2, 3, 1]}).to_csv('input.csv', sep=';', index=False)
+            self.assertFalse(cleaning.is_cleaned('input.csv', 'output.csv', config_data))
+        finally:
+            dataset.remove_dataset('output.csv')
+            for path in ['input.csv', 'config_test.yaml', 'output.csv.manifest.json', 'output.csv.schema.json', 'output.csv.report.json']:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    # Teste 15: colunas em fill_mean_groups devem ser preenchidas com a média do grupo, independente dos blocos
+    def test_fill_mean_groups(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': [],
+            'columns_to_fill_mean': ['B'],
+            'columns_to_fill_values': {},
+            'restrictions': {},
+            'columns_to_filter_by_z_score': ['B'],
+            'fill_mean_groups': {'B': 'A'}
+        }
+        data = pd.DataFrame({
+            'CONTADOR': range(8),
+            'A': [1, 1, 2, 2, 1, 2, 3, 2],
+            'B': [10, np.NaN, 30, np.NaN, 20, 50, np.NaN, 40]
+        })
+        # Grupo 1: média 15; grupo 2: média 40; grupo 3, sem valores: média geral 30
+        filled = [10, 15, 30, 40, 20, 50, 30, 40]
+
+        for chunksize in [3, 8]:
+            chunks = [data.iloc[i:i + chunksize].copy() for i in range(0, len(data), chunksize)]
+            group_means = {}
+            fill_means, z_mean, z_std = cleaning.collect_statistics(chunks, config_data, group_means=group_means)
+
+            self.assertEqual(group_means['B'].dropna().to_dict(), {1.0: 15.0, 2.0: 40.0})
+            self.assertAlmostEqual(z_mean['B'], np.mean(filled))
+            self.assertAlmostEqual(z_std['B'], np.std(filled, ddof=1))
+
+        result = cleaning.fill_group_means(data.copy(), config_data['fill_mean_groups'], group_means, fill_means)
+        self.assertEqual(result['B'].tolist(), filled)
+
+        with self.assertRaises(KeyError):
+            cleaning.fill_group_means(data.copy(), {'B': 'C'}, group_means)
+
+
+    # Teste 16: com z_score_strata, o Z-Score deve usar as estatísticas do estrato de cada linha
+    def test_z_score_strata(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': [],
+            'columns_to_fill_mean': ['B'],
+            'columns_to_fill_values': {},
+            'restrictions': {},
+            'columns_to_filter_by_z_score': ['B'],
+            'z_score_strata': 'S'
+        }
+        data = pd.DataFrame({
+            'CONTADOR': range(14),
+            'S': [1] * 7 + [2] * 7,
+            'B': [10, 11, 12, 13, 9, 14, 30, 100, 101, 102, 103, 99, 104, np.NaN]
+        })
+        # O valor ausente é preenchido com a média truncada do arquivo e entra no estrato 2
+        filled = data.assign(B=data['B'].fillna(np.trunc(data['B'].mean())))
+
+        for chunksize in [4, 14]:
+            chunks = [data.iloc[i:i + chunksize].copy() for i in range(0, len(data), chunksize)]
+            fill_means, z_mean, z_std = cleaning.collect_statistics(chunks, config_data)
+
+            np.testing.assert_allclose(z_mean['B'], filled.groupby('S')['B'].mean())
+            np.testing.assert_allclose(z_std['B'], filled.groupby('S')['B'].std())
+
+        # O valor 30 e o valor preenchido são outliers somente em relação ao seu estrato
+        result = cleaning.filter_by_strata_z_score(filled, ['B'], 1.5, 'S', z_mean, z_std)
+        self.assertEqual(result, filled.drop(index=[6, 13]))
+        self.assertEqual(cleaning.filter_by_z_score(filled, ['B'], 1.5), filled)
+
+
+    # Teste 17: colunas com o método 'mad' devem ser filtradas pela mediana e pelo MAD do arquivo inteiro
+    def test_outlier_methods_mad(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': [],
+            'columns_to_fill_mean': ['B'],
+            'columns_to_fill_values': {},
+            'restrictions': {},
+            'columns_to_filter_by_z_score': ['A', 'B'],
+            'outlier_methods': {'B': 'mad'}
+        }
+        data = pd.DataFrame({
+            'CONTADOR': range(10),
+            'A': range(10),
+            'B': [0, 0, 1, 0, 2, np.NaN, 0, 0, 0, 12]
+        })
+        # O valor ausente é preenchido com a média truncada (1) antes do filtro
+        filled = data['B'].fillna(1)
+
+        for chunksize in [3, 10]:
+            chunks = [data.iloc[i:i + chunksize].copy() for i in range(0, len(data), chunksize)]
+            robust = {}
+            cleaning.collect_statistics(chunks, config_data, robust=robust)
+
+            self.assertEqual(robust['median']['B'], filled.median())
+            # O MAD é zero, então a escala é o desvio absoluto médio em relação à mediana
+            self.assertAlmostEqual(robust['scale']['B'], 1.253314 * (filled - filled.median()).abs().mean())
+
+        result = cleaning.filter_by_mad(data.assign(B=filled), ['B'], 3.5, robust['median'], robust['scale'])
+        self.assertEqual(result['CONTADOR'].tolist(), list(range(9)))
+
+        with self.assertRaises(ValueError):
+            cleaning.outlier_columns({**config_data, 'outlier_methods': {'B': 'iqr'}})
+
+    # Teste 18: a execução simulada deve projetar as linhas mantidas e rejeitadas sem gravar arquivos
+    def test_dry_run(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': ['A'],
+            'columns_to_fill_mean': [],
+            'columns_to_fill_values': {},
+            'restrictions': {'A': [1, 2]},
+            'columns_to_filter_by_z_score': [],
+            'z_score_limit': 4,
+            'csv_engine': 'c',
+            'csv_encoding': 'latin-1'
+        }
+        with open('config_test.yaml', 'w') as file:
+            yaml.dump(config_data, file)
+        # Metade das linhas é rejeitada pela restrição, e as colunas B e C variam o tamanho das linhas
+        pd.DataFrame({'CONTADOR': range(4000), 'A': [i % 4 + 1 for i in range(4000)], 'B': range(4000),
+                      'C': [10 ** (i % 7) for i in range(4000)]}).to_csv('input.csv', sep=';', index=False)
+
+        try:
+            report = cleaning.dry_run('input.csv', 'config_test.yaml', sample_rows=400, seed=0)
+        finally:
+            files = set(os.listdir('.'))
+            for path in ['input.csv', 'config_test.yaml']:
+                os.remove(path)
+
+        self.assertEqual(report['sample_rows'], 400)
+        self.assertTrue(report['total_rows_estimated'])
+        self.assertLessEqual(report['kept']['low'], 2000)
+        self.assertGreaterEqual(report['kept']['high'], 2000)
+        self.assertLessEqual(report['rejections']['A']['low'], 2000)
+        self.assertGreaterEqual(report['rejections']['A']['high'], 2000)
+        self.assertEqual(report['stages']['dedup']['rows'], 0)
+        self.assertFalse(any(name.startswith('output') for name in files))
+
+
+
 if __name__ == "__main__":
     unittest.main(buffer=True)
\ No newline at end of file
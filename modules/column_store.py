@@ -0,0 +1,283 @@
+"""
+Módulo do Armazenamento em Colunas dos Dados Tratados
+
+Este módulo contém funções para converter o conjunto de dados tratados, uma única vez, em um diretório com um arquivo binário do numpy (``.npy``) por coluna, e para ler esses arquivos mapeados em memória. As análises leem somente as colunas de que precisam, sem converter texto, e os processos que leem as mesmas colunas compartilham as páginas do arquivo no cache do sistema operacional.
+
+Funcionalidades:
+- Calcula a assinatura dos arquivos de um conjunto de dados tratados.
+- Grava os blocos de um conjunto de dados em um arquivo ``.npy`` por coluna, de forma atômica.
+- Verifica se o armazenamento em colunas corresponde ao conjunto de dados atual.
+- Lê as colunas mapeadas em memória, como arrays do numpy ou DataFrame, sem cópias.
+- Remove o armazenamento em colunas.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+import shutil
+import json
+import os
+
+
+# Sufixo do diretório com o armazenamento em colunas de um conjunto de dados
+store_suffix = '.columns'
+
+# Arquivo com as colunas, os tipos e a assinatura do conjunto de dados de origem
+metadata_file = 'columns.json'
+
+
+def store_path(path: str) -> str:
+    """Retorna o endereço do armazenamento em colunas de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    str
+        Endereço do diretório com as colunas
+
+    Examples
+    --------
+    >>> store_path('data/dados.csv')
+    'data/dados.csv.columns'
+    """
+    return path.rstrip('/\\') + store_suffix
+
+
+def source_signature(path: str) -> dict[str, list[int]]:
+    """Calcula a assinatura dos arquivos de dados de um conjunto de dados tratados: o
+    tamanho e a data de modificação de cada arquivo. Os arquivos JSON auxiliares
+    (manifesto, esquema e relatório) não fazem parte da assinatura.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    dict[str, list[int]]
+        Tamanho e data de modificação (em nanossegundos) de cada arquivo, pelo
+        endereço relativo a ``path``
+    """
+    if not os.path.isdir(path):
+        status = os.stat(path)
+        return {os.path.basename(path): [status.st_size, status.st_mtime_ns]}
+
+    signature = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            if name.endswith('.json'):
+                continue
+            file_path = os.path.join(root, name)
+            status = os.stat(file_path)
+            signature[os.path.relpath(file_path, path).replace(os.sep, '/')] = [status.st_size, status.st_mtime_ns]
+
+    return dict(sorted(signature.items()))
+
+
+def write_store(chunks, path: str, signature: dict = None) -> dict:
+    """Grava os blocos de um conjunto de dados em um arquivo ``.npy`` por coluna. Os
+    valores de cada coluna são escritos bloco a bloco em um arquivo temporário e o
+    cabeçalho do ``.npy`` é escrito ao final, quando a quantidade de linhas é conhecida,
+    então somente um bloco fica na memória. Colunas que não são numéricas não são
+    gravadas. O diretório só substitui o anterior depois de completo.
+
+    Parameters
+    ----------
+    chunks : Iterator[pd.DataFrame]
+        Blocos do conjunto de dados, todos com as mesmas colunas e tipos
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+    signature : dict, optional
+        Assinatura do conjunto de dados de origem. Se não for informada, é calculada
+        por ``source_signature``
+
+    Returns
+    -------
+    dict
+        Metadados do armazenamento: quantidade de linhas, tipo de cada coluna e
+        assinatura do conjunto de dados de origem
+
+    Examples
+    --------
+    >>> pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv('exemplo.csv', sep=';', index=False)
+    >>> chunks = [pd.DataFrame({'A': [1, 2], 'B': [4, 5]}), pd.DataFrame({'A': [3], 'B': [6]})]
+    >>> write_store(chunks, 'exemplo.csv')['rows']
+    3
+    >>> read_store('exemplo.csv', ['B'])['B'].tolist()
+    [4, 5, 6]
+    >>> remove_store('exemplo.csv'); os.remove('exemplo.csv')
+    """
+    if signature is None:
+        signature = source_signature(path)
+
+    final_path = store_path(path)
+    temporary_path = final_path + '.tmp'
+    if os.path.exists(temporary_path):
+        shutil.rmtree(temporary_path)
+    os.makedirs(temporary_path)
+
+    dtypes = None
+    files = {}
+    rows = 0
+    try:
+        for chunk in chunks:
+            if dtypes is None:
+                dtypes = {column: chunk[column].dtype for column in chunk.columns if chunk[column].dtype.kind in 'biuf'}
+                files = {column: open(os.path.join(temporary_path, column + '.raw'), 'wb') for column in dtypes}
+
+            for column, dtype in dtypes.items():
+                np.ascontiguousarray(chunk[column].to_numpy(dtype=dtype)).tofile(files[column])
+            rows += len(chunk)
+    finally:
+        for file in files.values():
+            file.close()
+
+    # Escreve o cabeçalho de cada coluna e em seguida os valores gravados
+    for column, dtype in (dtypes or {}).items():
+        raw_path = os.path.join(temporary_path, column + '.raw')
+        with open(os.path.join(temporary_path, column + '.npy'), 'wb') as file, open(raw_path, 'rb') as raw:
+            header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)}
+            np.lib.format.write_array_header_1_0(file, header)
+            shutil.copyfileobj(raw, file)
+        os.remove(raw_path)
+
+    metadata = {
+        'rows': rows,
+        'columns': {column: dtype.str for column, dtype in (dtypes or {}).items()},
+        'source': signature
+    }
+    with open(os.path.join(temporary_path, metadata_file), 'w') as file:
+        json.dump(metadata, file, indent=1)
+
+    remove_store(path)
+    os.replace(temporary_path, final_path)
+
+    return metadata
+
+
+def load_metadata(path: str) -> dict:
+    """Lê os metadados do armazenamento em colunas de um conjunto de dados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    dict
+        Metadados do armazenamento, ou None se não existir
+    """
+    try:
+        with open(os.path.join(store_path(path), metadata_file), 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def is_fresh(path: str, columns: list[str] = None) -> bool:
+    """Verifica se o armazenamento em colunas existe, corresponde aos arquivos atuais
+    do conjunto de dados e contém as colunas pedidas.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+    columns : list[str], optional
+        Colunas que devem estar no armazenamento
+
+    Returns
+    -------
+    bool
+        True se as colunas podem ser lidas do armazenamento
+    """
+    metadata = load_metadata(path)
+    if metadata is None or not os.path.exists(path):
+        return False
+
+    if columns is not None and not all(column in metadata['columns'] for column in columns):
+        return False
+
+    return metadata['source'] == source_signature(path)
+
+
+def load_columns(path: str, columns: list[str] = None) -> dict[str, np.ndarray]:
+    """Lê as colunas do armazenamento mapeadas em memória, somente para leitura.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+    columns : list[str], optional
+        Colunas a serem lidas. Se não for informado, todas as colunas são lidas
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Array mapeado em memória de cada coluna, na ordem pedida
+
+    Raises
+    ------
+    FileNotFoundError
+        O armazenamento em colunas não existe
+    KeyError
+        Alguma coluna pedida não existe no armazenamento
+    """
+    metadata = load_metadata(path)
+    if metadata is None:
+        raise FileNotFoundError(f"Erro: armazenamento em colunas de {path} não encontrado.")
+
+    if columns is None:
+        columns = list(metadata['columns'])
+
+    arrays = {}
+    for column in columns:
+        if column not in metadata['columns']:
+            raise KeyError(f"Erro: Coluna {column} não encontrada.")
+
+        file_path = os.path.join(store_path(path), column + '.npy')
+        # Arquivos sem linhas não podem ser mapeados em memória
+        arrays[column] = np.load(file_path, mmap_mode='r' if metadata['rows'] > 0 else None)
+
+    return arrays
+
+
+def read_store(path: str, columns: list[str] = None) -> pd.DataFrame:
+    """Lê as colunas do armazenamento em um DataFrame cujas colunas são os próprios
+    arrays mapeados em memória, sem cópias. O DataFrame é somente para leitura.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+    columns : list[str], optional
+        Colunas a serem lidas. Se não for informado, todas as colunas são lidas
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com as colunas pedidas
+    """
+    return pd.DataFrame(load_columns(path, columns), copy=False)
+
+
+def remove_store(path: str):
+    """Remove o armazenamento em colunas de um conjunto de dados, se existir.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+    """
+    if os.path.isdir(store_path(path)):
+        shutil.rmtree(store_path(path))
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
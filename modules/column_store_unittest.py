@@ -0,0 +1,59 @@
+import unittest
+import pandas as pd
+import pandas.testing as pd_testing
+import numpy as np
+
+import column_store
+import dataset
+
+
+class TestColumnStore(unittest.TestCase):
+    def setUp(self):
+        # Conjunto de dados tratados usado nos testes
+        self.df = pd.DataFrame({
+            'CONTADOR': [1, 2, 3, 4],
+            'CODMUNNASC': [120001, 355030, 355031, 530010],
+            'PESO': np.array([3000, 3100, 3200, 3300], dtype=np.int16)
+        })
+        self.df.to_csv('output.csv', sep=';', index=False)
+
+    def tearDown(self):
+        dataset.remove_dataset('output.csv')
+
+    # Teste 1: leitura do armazenamento deve ser igual à leitura do CSV, sem copiar os arrays
+    def test_read_equals_csv(self):
+        expected = dataset.read_dataset('output.csv', ['PESO', 'CONTADOR'])
+        dataset.build_column_store('output.csv')
+        result = dataset.read_dataset('output.csv', ['PESO', 'CONTADOR'])
+
+        pd_testing.assert_frame_equal(result, expected)
+        # Uma cópia dos arrays mapeados em memória seria gravável
+        self.assertFalse(result['PESO'].to_numpy().flags.writeable)
+
+        # Filtro de UFs e leitura em blocos
+        pd_testing.assert_frame_equal(dataset.read_dataset('output.csv', ['PESO'], ufs=[35]),
+                                      pd.DataFrame({'PESO': [3100, 3200]}, index=[1, 2]).astype(np.int64))
+        self.assertEqual([len(chunk) for chunk in dataset.iter_dataset('output.csv', ['PESO'], chunksize=3)], [3, 1])
+
+    # Teste 2: armazenamento deve deixar de ser usado quando o conjunto de dados muda
+    def test_stale_store_is_ignored(self):
+        self.assertTrue(dataset.build_column_store('output.csv'))
+        self.assertFalse(dataset.build_column_store('output.csv'))
+
+        self.df.iloc[:2].to_csv('output.csv', sep=';', index=False)
+
+        self.assertFalse(column_store.is_fresh('output.csv'))
+        self.assertEqual(len(dataset.read_dataset('output.csv')), 2)
+        self.assertTrue(dataset.build_column_store('output.csv'))
+        self.assertEqual(column_store.load_metadata('output.csv')['rows'], 2)
+
+    # Teste 3: coluna inexistente no armazenamento deve levantar erro
+    def test_load_columns_invalid_column(self):
+        dataset.build_column_store('output.csv')
+
+        with self.assertRaises(KeyError):
+            column_store.load_columns('output.csv', ['APGAR5'])
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -6,12 +6,20 @@ Este módulo contém as configurações para a limpeza dos dados brutos
 Funcionalidades:
 - Contém as colunas a serem removidas.
 - Contém as colunas com restrições de valores.
+- Contém as regras de consistência entre colunas.
 - Contém as colunas a serem filtradas por média, z-score e alguns valores especificos.
+- Contém os tipos das colunas sem restrições de valores.
+- Contém as opções de leitura do arquivo de dados brutos.
+- Contém o escopo da remoção de linhas repetidas.
+- Contém o padrão dos arquivos de dados brutos de vários anos.
+- Contém a opção de medir a memória de cada etapa da limpeza.
 - Gera arquivo yaml.
+- Carrega o arquivo yaml, gerando-o caso não exista.
 
 """
 
 import yaml
+import os
 
 data = {
     'df_index' : 'CONTADOR',
@@ -68,6 +76,13 @@ data = {
         'PARIDADE' : [1, 0],
         'TPROBSON': [1,2,3,4,5,6,7,8,9,10]
     },
+    # Regras de consistência entre colunas, desativadas por padrão para não alterar os
+    # dados tratados. Exemplo:
+    #     'partos_gestacoes' : 'QTDPARTNOR + QTDPARTCES <= QTDGESTANT',
+    #     'consultas_prenatal' : 'CONSULTAS == 9 or CONSPRENAT == 99 or (CONSULTAS == 1 and CONSPRENAT == 0)'
+    #                            ' or (CONSULTAS == 2 and 1 <= CONSPRENAT <= 3) or (CONSULTAS == 3 and 4 <= CONSPRENAT <= 6)'
+    #                            ' or (CONSULTAS == 4 and CONSPRENAT >= 7)'
+    'consistency_rules' : {},
     'columns_to_dropna' : [
         "LOCNASC",
         "RACACOR",
@@ -79,6 +94,9 @@ data = {
     'columns_to_fill_mean' : [
         'SEMAGESTAC'
     ],
+    # Colunas preenchidas com a média do seu grupo, desativadas por padrão para não
+    # alterar os dados tratados. Exemplo: {'SEMAGESTAC' : 'GESTACAO'}
+    'fill_mean_groups' : {},
     'columns_to_fill_zero' : [
         'QTDFILVIVO',
         'QTDFILMORT',
@@ -105,7 +123,38 @@ data = {
         'CONSPRENAT',
         'MESPRENAT'
     ],
-    'z_score_limit' : 4
+    'z_score_limit' : 4,
+    'z_score_strata' : None,
+    'outlier_methods' : {},
+    'mad_limit' : 3.5,
+    'column_dtypes' : {
+        'IDADEMAE' : 'int8',
+        'QTDFILVIVO' : 'int8',
+        'QTDFILMORT' : 'int8',
+        'GRAVIDEZ' : 'int8',
+        'SEXO' : 'int8',
+        'APGAR5' : 'int8',
+        'PESO' : 'int16',
+        'QTDGESTANT' : 'int8',
+        'QTDPARTNOR' : 'int8',
+        'QTDPARTCES' : 'int8',
+        'SEMAGESTAC' : 'int8',
+        'CONSPRENAT' : 'int8',
+        'MESPRENAT' : 'int8',
+        'KOTELCHUCK' : 'int8'
+    },
+    'csv_engine' : 'c',
+    'csv_encoding' : 'latin-1',
+    'output_format' : 'csv',
+    'compression_threads' : None,
+    'index_rows' : 100000,
+    'dry_run_rows' : 20000,
+    'statistics_scope' : 'global',
+    'deduplication' : 'global',
+    'input_pattern' : None,
+    'jobs' : 1,
+    'memory_budget_mb' : 1024,
+    'trace_memory' : False
 }
 
 def generate_config_file(path: str):
@@ -123,3 +172,26 @@ def generate_config_file(path: str):
 
     with open(path, 'w') as file:
         yaml.dump(data, file, default_flow_style=False)
+
+
+
+def load_config(path: str = 'data/config.yaml') -> dict:
+    """Carrega o arquivo de configuração para a limpeza dos dados. Caso o arquivo
+    não exista, ele é gerado com as configurações padrão.
+
+    Parameters
+    ----------
+    path : str, optional
+        Endereço do arquivo de configuração
+
+    Returns
+    -------
+    dict
+        Dicionário com as configurações
+    """
+    # Verifica se o arquivo de configuração existe, caso contrário gera o arquivo
+    if not os.path.exists(path):
+        generate_config_file(path)
+
+    with open(path, 'r') as file:
+        return yaml.safe_load(file)
@@ -0,0 +1,911 @@
+"""
+Módulo de Leitura e Escrita do Conjunto de Dados Tratados
+
+Este módulo contém funções para gravar e ler o conjunto de dados tratados, seja em um único arquivo CSV, compactado ou não, ou em um conjunto de arquivos Parquet particionados por estado (UF), de forma que cada análise leia somente as colunas e os estados de que precisa.
+
+Funcionalidades:
+- Determina o endereço do conjunto de dados tratados a partir do arquivo de configuração.
+- Organiza os dados tratados de vários anos em partições por ano (``ANO=<ano>``), cada uma um conjunto de dados completo.
+- Calcula o código da UF a partir do código do município de nascimento.
+- Grava os blocos de dados tratados em CSV ou em partições Parquet por UF, podendo descartar os blocos gravados após um checkpoint.
+- Compacta o CSV em membros gzip independentes, compactados em paralelo por várias threads, que formam um único arquivo gzip lido normalmente.
+- Remove um conjunto de dados tratados.
+- Lê o conjunto de dados tratados, inteiro ou em blocos, selecionando colunas, estados e anos, com os tipos definidos no esquema.
+- Lê um intervalo de linhas do CSV pelo índice de linhas e distribui intervalos disjuntos entre vários processos.
+- Converte o conjunto de dados tratados para o armazenamento em colunas mapeadas em memória, usado pelas leituras seguintes enquanto estiver atualizado.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+import shutil
+import gzip
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import config
+import schema
+import column_store
+import row_index
+import chunking
+
+
+# Endereço padrão do conjunto de dados tratados para cada formato de saída
+dataset_paths = {
+    'csv': 'data/dados.csv',
+    'csv.gz': 'data/dados.csv.gz',
+    'parquet': 'data/dados'
+}
+
+# Endereço padrão do conjunto de dados tratados de vários anos, em qualquer formato
+batch_dataset_path = 'data/dados'
+
+# Nome da coluna de partição do conjunto Parquet
+partition_column = 'UF'
+
+# Nome da coluna de partição do conjunto de vários anos
+year_column = 'ANO'
+
+# Tamanho aproximado, em bytes, do texto de cada membro gzip do CSV compactado, e
+# nível de compactação
+gzip_member_bytes = 4 * 2 ** 20
+gzip_level = 6
+
+
+def dataset_path(config_file_path: str = 'data/config.yaml') -> str:
+    """Retorna o endereço do conjunto de dados tratados de acordo com o formato
+    de saída definido no arquivo de configuração. Se a configuração definir vários
+    arquivos de entrada (``input_pattern``), é o diretório com as partições por ano.
+
+    Parameters
+    ----------
+    config_file_path : str, optional
+        Endereço do arquivo de configuração
+
+    Returns
+    -------
+    str
+        Endereço do conjunto de dados tratados
+    """
+    config_data = config.load_config(config_file_path)
+    output_format = config_data.get('output_format', 'csv')
+
+    if output_format not in dataset_paths:
+        raise ValueError(f"Erro: formato de saída {output_format} não suportado.")
+
+    if config_data.get('input_pattern'):
+        return batch_dataset_path
+
+    return dataset_paths[output_format]
+
+
+def partition_path(path: str, year: int, output_format: str = 'csv') -> str:
+    """Retorna o endereço da partição de um ano no conjunto de dados de vários anos.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do diretório com as partições por ano
+    year : int
+        Ano da partição
+    output_format : str, optional
+        Formato de saída: 'csv' ou 'csv.gz' (um arquivo por ano) ou 'parquet' (um
+        diretório por ano)
+
+    Returns
+    -------
+    str
+        Endereço da partição
+
+    Examples
+    --------
+    >>> partition_path('dados', 2021).replace(os.sep, '/')
+    'dados/ANO=2021.csv'
+    >>> partition_path('dados', 2021, 'csv.gz').replace(os.sep, '/')
+    'dados/ANO=2021.csv.gz'
+    >>> partition_path('dados', 2021, 'parquet').replace(os.sep, '/')
+    'dados/ANO=2021'
+    """
+    partition = os.path.join(path, f'{year_column}={year}')
+    return partition if output_format == 'parquet' else f'{partition}.{output_format}'
+
+
+def year_partitions(path: str) -> dict[int, str]:
+    """Lista as partições por ano de um conjunto de dados de vários anos.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do conjunto de dados
+
+    Returns
+    -------
+    dict[int, str]
+        Endereço da partição de cada ano, em ordem crescente de ano. Vazio se o
+        conjunto de dados não for particionado por ano
+    """
+    if not os.path.isdir(path):
+        return {}
+
+    partitions = {}
+    for name in os.listdir(path):
+        partition = os.path.join(path, name)
+        if not name.startswith(f'{year_column}='):
+            continue
+        # Os arquivos e diretórios auxiliares das partições (como o armazenamento em
+        # colunas, 'ANO=2021.csv.columns') não são partições
+        if not (os.path.isdir(partition) and '.' not in name or name.endswith(('.csv', '.csv.gz'))):
+            continue
+
+        partitions[int(name[len(year_column) + 1:].split('.')[0])] = partition
+
+    return dict(sorted(partitions.items()))
+
+
+def uf_codes(codmunnasc: pd.Series) -> pd.Series:
+    """Calcula o código da UF (os dois primeiros dígitos) a partir do código
+    de seis dígitos do município, segundo o IBGE.
+
+    Parameters
+    ----------
+    codmunnasc : pd.Series
+        Série com os códigos dos municípios
+
+    Returns
+    -------
+    pd.Series
+        Série com os códigos das UFs
+
+    Examples
+    --------
+    >>> uf_codes(pd.Series([120001, 355030, 530010])).tolist()
+    [12, 35, 53]
+    """
+    return (codmunnasc // 10000).astype(np.int32)
+
+
+def gzip_members(data: bytes, executor: ThreadPoolExecutor = None, member_bytes: int = None,
+                 breaks=()) -> list[tuple[int, bytes]]:
+    """Compacta um texto em membros gzip independentes de aproximadamente
+    ``member_bytes`` bytes cada, sempre terminados no fim de uma linha, e com um novo
+    membro começando em cada posição de ``breaks``. Os membros são compactados em
+    paralelo pelas threads de ``executor`` (o zlib libera o GIL durante a compactação).
+    A concatenação dos membros, na ordem do texto, é um arquivo gzip válido,
+    descompactado por qualquer leitor como um texto único.
+
+    Parameters
+    ----------
+    data : bytes
+        Texto a ser compactado
+    executor : ThreadPoolExecutor, optional
+        Threads usadas na compactação. Se não for informado, os membros são
+        compactados na thread atual
+    member_bytes : int, optional
+        Tamanho aproximado do texto de cada membro (``gzip_member_bytes`` se não for
+        informado)
+    breaks : Iterable[int], optional
+        Posições do texto, no início de uma linha, em que um membro deve começar
+
+    Returns
+    -------
+    list[tuple[int, bytes]]
+        Posição, no texto, do início de cada membro e o membro compactado
+
+    Examples
+    --------
+    >>> members = gzip_members(b'ID;A\\n1;2\\n3;4\\n', member_bytes=4)
+    >>> [start for start, _ in members]
+    [0, 5, 9]
+    >>> gzip.decompress(b''.join(member for _, member in members))
+    b'ID;A\\n1;2\\n3;4\\n'
+    >>> [start for start, _ in gzip_members(b'ID;A\\n1;2\\n3;4\\n', breaks=[9])]
+    [0, 9]
+    """
+    if member_bytes is None:
+        member_bytes = gzip_member_bytes
+    breaks = sorted(set(breaks))
+
+    # Divide o texto em partes terminadas no fim de uma linha
+    starts = []
+    start = 0
+    while start < len(data):
+        starts.append(start)
+        end = data.find(b'\n', start + member_bytes - 1)
+        end = len(data) if end == -1 else end + 1
+        # Um membro termina antes da próxima posição em que outro deve começar
+        following = [position for position in breaks if start < position < end]
+        start = following[0] if following else end
+    parts = [data[start:end] for start, end in zip(starts, starts[1:] + [len(data)])]
+
+    def compress(part: bytes) -> bytes:
+        # Sem data de modificação, o mesmo texto gera sempre os mesmos bytes
+        return gzip.compress(part, compresslevel=gzip_level, mtime=0)
+
+    if executor is None or len(parts) <= 1:
+        return list(zip(starts, map(compress, parts)))
+
+    return list(zip(starts, executor.map(compress, parts)))
+
+
+def _import_parquet():
+    """Importa o módulo de Parquet do pyarrow, que é uma dependência opcional."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Erro: o formato 'parquet' requer o pacote pyarrow instalado.")
+
+    return pa, pq
+
+
+class DatasetWriter:
+    """Grava os blocos de dados tratados em um arquivo CSV separado por ';' ou
+    em um diretório Parquet particionado por UF, com um arquivo por bloco em cada
+    UF (``UF=<código>/part-<bloco>.parquet``). O índice de cada bloco é gravado
+    como uma coluna comum. No formato 'csv.gz', o texto de cada bloco é compactado
+    em membros gzip por várias threads (ver ``gzip_members``) e acrescentado ao
+    arquivo, que continua terminando no fim de um bloco. Nos formatos CSV, cada
+    gravação retorna as posições do índice de linhas (ver ``row_index``) do bloco; no
+    formato 'csv.gz', cada uma delas é o início de um membro.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV ou do diretório Parquet
+    output_format : str, optional
+        Formato de saída: 'csv', 'csv.gz' ou 'parquet'
+    chunk_index : int, optional
+        Número do próximo bloco a ser gravado, usado ao retomar uma gravação
+    threads : int, optional
+        Quantidade de threads da compactação no formato 'csv.gz'. Se não for
+        informado, usa a quantidade de CPUs
+    index_rows : int, optional
+        Quantidade de linhas entre duas posições do índice de linhas. Se não for
+        informado, as posições não são calculadas
+
+    Examples
+    --------
+    >>> writer = DatasetWriter('exemplo.csv', index_rows=2)
+    >>> writer.write(pd.DataFrame({'A': [1, 2]}, index=pd.Index([10, 11], name='ID')))
+    [5]
+    >>> writer.write(pd.DataFrame({'A': [3]}, index=pd.Index([12], name='ID')))
+    [15]
+    >>> writer.close()
+    >>> print(open('exemplo.csv').read())
+    ID;A
+    10;1
+    11;2
+    12;3
+    <BLANKLINE>
+    >>> os.remove('exemplo.csv')
+    """
+    def __init__(self, path: str, output_format: str = 'csv', chunk_index: int = 0, threads: int = None,
+                 index_rows: int = None):
+        if output_format not in dataset_paths:
+            raise ValueError(f"Erro: formato de saída {output_format} não suportado.")
+
+        self.path = path
+        self.output_format = output_format
+        self.chunk_index = chunk_index
+        self.index_rows = index_rows
+        # Quantidade de linhas de dados gravadas, usada para numerar as linhas do índice
+        self.rows = 0
+        self.executor = None
+        if output_format == 'csv.gz':
+            self.executor = ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 1)
+
+    def write(self, chunk: pd.DataFrame) -> list[int]:
+        """Grava um bloco de dados tratados no final do conjunto de dados.
+
+        Parameters
+        ----------
+        chunk : pd.DataFrame
+            Bloco de dados tratados
+
+        Returns
+        -------
+        list[int]
+            Posição, em bytes, no arquivo, do início de cada linha do bloco cujo número
+            é múltiplo de ``index_rows``. Vazia no formato Parquet ou sem ``index_rows``
+        """
+        offsets = []
+        if self.output_format == 'parquet':
+            self._write_parquet(chunk)
+        else:
+            header = not os.path.exists(self.path)
+            start = self.size()
+            text = chunk.to_csv(sep=';', header=header).encode('utf-8')
+
+            positions = []
+            if self.index_rows is not None:
+                positions = row_index.entry_positions(text, self.rows, self.index_rows, header).tolist()
+
+            if self.output_format == 'csv':
+                offsets = [start + position for position in positions]
+            else:
+                # Cada posição do índice é o início de um membro
+                members = gzip_members(text, self.executor, breaks=positions)
+                member_offsets = {}
+                for position, member in members:
+                    member_offsets[position] = start
+                    start += len(member)
+                offsets = [member_offsets[position] for position in positions]
+                text = b''.join(member for _, member in members)
+
+            with open(self.path, 'ab') as file:
+                file.write(text)
+
+        self.rows += len(chunk)
+        self.chunk_index += 1
+        return offsets
+
+    def _write_parquet(self, chunk: pd.DataFrame):
+        """Grava um bloco de dados tratados em um arquivo Parquet por UF."""
+        pa, pq = _import_parquet()
+
+        chunk = chunk.reset_index()
+        try:
+            ufs = uf_codes(chunk['CODMUNNASC'])
+        except KeyError:
+            raise KeyError("Erro: coluna CODMUNNASC não encontrada.")
+
+        for uf, uf_chunk in chunk.groupby(ufs, sort=True):
+            directory = os.path.join(self.path, f'{partition_column}={uf}')
+            os.makedirs(directory, exist_ok=True)
+
+            table = pa.Table.from_pandas(uf_chunk, preserve_index=False)
+            pq.write_table(table, os.path.join(directory, f'part-{self.chunk_index:05d}.parquet'))
+
+    def size(self) -> int:
+        """Retorna o tamanho, em bytes, do arquivo CSV (compactado ou não) gravado até
+        o momento (None para o formato Parquet, em que cada bloco tem seus próprios arquivos).
+        """
+        if self.output_format == 'parquet':
+            return None
+
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate(self, chunks: int, size: int = None, rows: int = 0):
+        """Descarta tudo o que foi gravado depois dos primeiros ``chunks`` blocos,
+        deixando o conjunto de dados como estava quando ``size()`` retornou ``size``.
+
+        Parameters
+        ----------
+        chunks : int
+            Quantidade de blocos mantidos
+        size : int, optional
+            Tamanho do arquivo CSV após a gravação dos blocos mantidos
+        rows : int, optional
+            Quantidade de linhas de dados dos blocos mantidos
+        """
+        if self.output_format != 'parquet':
+            if os.path.exists(self.path):
+                if size:
+                    with open(self.path, 'r+b') as file:
+                        file.truncate(size)
+                else:
+                    os.remove(self.path)
+        elif os.path.isdir(self.path):
+            for directory in os.listdir(self.path):
+                directory = os.path.join(self.path, directory)
+                for file_name in os.listdir(directory):
+                    if int(file_name[len('part-'):-len('.parquet')]) >= chunks:
+                        os.remove(os.path.join(directory, file_name))
+
+        self.chunk_index = chunks
+        self.rows = rows
+
+    def close(self):
+        """Finaliza a gravação do conjunto de dados."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+def remove_dataset(path: str):
+    """Remove um conjunto de dados tratados, seja um arquivo CSV ou um diretório Parquet.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV ou do diretório Parquet
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+    column_store.remove_store(path)
+    row_index.remove_index(path)
+
+
+def _check_columns(path: str, columns: list[str]):
+    """Verifica se todas as colunas pedidas existem no arquivo CSV ou no conjunto Parquet."""
+    if os.path.isdir(path):
+        pa, pq = _import_parquet()
+        header = []
+        for directory, _, file_names in os.walk(path):
+            parquet_files = sorted(file_name for file_name in file_names if file_name.endswith('.parquet'))
+            if parquet_files:
+                header += pq.read_schema(os.path.join(directory, parquet_files[0])).names
+                break
+    else:
+        header = pd.read_csv(path, sep=";", nrows=0).columns
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise KeyError(f"Erro: colunas {missing} não encontradas.")
+
+
+def _schema_dtypes(path: str, columns: list[str]) -> dict[str, str]:
+    """Retorna os tipos do esquema gravado para as colunas lidas de um arquivo CSV."""
+    dtypes = schema.load_schema(path)
+    if columns is None:
+        return dtypes
+
+    return {column: dtype for column, dtype in dtypes.items() if column in columns}
+
+
+def read_dataset(path: str, columns: list[str] = None, ufs: list[int] = None, years: list[int] = None) -> pd.DataFrame:
+    """Lê o conjunto de dados tratados, carregando somente as colunas e as UFs pedidas.
+    Em um conjunto Parquet particionado, somente os arquivos das UFs pedidas são lidos.
+    Em um arquivo CSV, as colunas são lidas com os tipos do esquema gravado na limpeza
+    (ver ``schema``), se existir; um arquivo '.csv.gz' é descompactado durante a leitura. Em um conjunto particionado por ano, somente as
+    partições dos anos pedidos são lidas, e a coluna ``year_column`` pode ser pedida.
+    Se o armazenamento em colunas do conjunto estiver atualizado (ver
+    ``build_column_store``), as colunas são lidas dele, mapeadas em memória; sem
+    filtro de UFs, o DataFrame não copia os dados e é somente para leitura.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV ou do diretório Parquet
+    columns : list[str], optional
+        Colunas a serem lidas. Se não for informado, todas as colunas são lidas
+    ufs : list[int], optional
+        Códigos das UFs a serem lidas. Se não for informado, todas as UFs são lidas
+    years : list[int], optional
+        Anos a serem lidos em um conjunto particionado por ano. Se não for informado,
+        todos os anos são lidos
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com os dados lidos
+
+    Raises
+    ------
+    FileNotFoundError
+        O conjunto de dados não existe
+    KeyError
+        Alguma coluna pedida não existe no conjunto de dados
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({'CODMUNNASC': [120001, 355030, 355031], 'PESO': [3000, 3100, 3200]})
+    >>> df.to_csv('exemplo.csv', sep=';')
+    >>> read_dataset('exemplo.csv', ['PESO'], ufs=[35])
+       PESO
+    1  3100
+    2  3200
+    >>> os.remove('exemplo.csv')
+    """
+    partitions = _select_years(path, years)
+    if partitions:
+        partition_columns = _partition_columns(columns)
+
+        frames = []
+        for year, partition in partitions.items():
+            df = read_dataset(partition, partition_columns, ufs)
+            frames.append(_add_year(df, year, columns))
+
+        return pd.concat(frames, ignore_index=True)
+
+    # O código do município é necessário para o filtro de UFs
+    store_columns = columns
+    if columns is not None and ufs is not None and 'CODMUNNASC' not in columns:
+        store_columns = list(columns) + ['CODMUNNASC']
+
+    if column_store.is_fresh(path, store_columns):
+        return _select_rows(column_store.read_store(path, store_columns), columns, ufs)
+
+    if os.path.isdir(path):
+        pa, pq = _import_parquet()
+
+        filters = [(partition_column, 'in', list(ufs))] if ufs is not None else None
+        try:
+            table = pq.read_table(path, columns=columns, filters=filters, partitioning='hive')
+        except pa.ArrowInvalid as e:
+            raise KeyError(f"Erro: colunas {columns} não encontradas.") from e
+
+        df = table.to_pandas()
+        # A coluna de partição só é mantida quando pedida
+        if columns is None and partition_column in df.columns:
+            df = df.drop(columns=[partition_column])
+        return df
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Erro: Arquivo {path} não encontrado.")
+
+    usecols = None
+    if columns is not None:
+        _check_columns(path, columns)
+        usecols = list(columns)
+        if ufs is not None and 'CODMUNNASC' not in usecols:
+            usecols.append('CODMUNNASC')
+
+    df = pd.read_csv(path, sep=";", usecols=usecols, dtype=_schema_dtypes(path, usecols))
+
+    return _select_rows(df, columns, ufs)
+
+
+def _select_rows(df: pd.DataFrame, columns: list[str], ufs: list[int]) -> pd.DataFrame:
+    """Mantém somente as linhas das UFs pedidas e as colunas pedidas, na ordem pedida."""
+    if ufs is not None:
+        df = df[uf_codes(df['CODMUNNASC']).isin(ufs)]
+
+    if columns is not None and list(df.columns) != list(columns):
+        df = df[list(columns)]
+
+    return df
+
+
+def iter_dataset(path: str, columns: list[str] = None, chunksize: int = None, years: list[int] = None):
+    """Lê o conjunto de dados tratados em blocos de até ``chunksize`` linhas, com os
+    tipos do esquema gravado na limpeza, como em ``read_dataset``. Em um conjunto
+    particionado por ano, os blocos de cada ano são lidos em ordem crescente de ano.
+    Se ``chunksize`` não for informado, o tamanho de cada bloco é ajustado ao orçamento
+    de memória (ver ``chunking.ChunkSizer``) a partir dos tipos das colunas lidas. Os
+    blocos de arquivos CSV e Parquet são lidos antecipadamente em segundo plano (ver
+    ``chunking.prefetch``), enquanto o bloco atual é processado.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV ou do diretório Parquet
+    columns : list[str], optional
+        Colunas a serem lidas. Se não for informado, todas as colunas são lidas
+    chunksize : int | Callable[[], int], optional
+        Quantidade máxima de linhas de cada bloco, ou função que retorna a quantidade
+        de linhas do próximo bloco
+    years : list[int], optional
+        Anos a serem lidos em um conjunto particionado por ano
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        Iterador sobre os blocos do conjunto de dados
+
+    Raises
+    ------
+    FileNotFoundError
+        O conjunto de dados não existe
+    KeyError
+        Alguma coluna pedida não existe no conjunto de dados
+
+    Examples
+    --------
+    >>> pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv('exemplo.csv', sep=';')
+    >>> [chunk['B'].sum() for chunk in iter_dataset('exemplo.csv', ['B'], chunksize=2)]
+    [9, 6]
+    >>> os.remove('exemplo.csv')
+    """
+    partitions = _select_years(path, years)
+    if partitions:
+        partition_columns = _partition_columns(columns)
+
+        # Verifica as colunas antes de começar a leitura
+        if partition_columns is not None:
+            _check_columns(next(iter(partitions.values())), partition_columns)
+        return _iter_years(partitions, columns, partition_columns, chunksize)
+
+    if column_store.is_fresh(path, columns):
+        return _iter_store(path, columns, chunksize or _chunk_sizer(path, columns))
+
+    if os.path.isdir(path):
+        if columns is not None:
+            _check_columns(path, columns)
+        return chunking.prefetch(_iter_parquet(path, columns, chunksize or _chunk_sizer(path, columns, 1 + chunking.prefetch_blocks)))
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Erro: Arquivo {path} não encontrado.")
+
+    if columns is not None:
+        _check_columns(path, columns)
+
+    reader = pd.read_csv(path, sep=";", usecols=columns, dtype=_schema_dtypes(path, columns), iterator=True)
+    return chunking.prefetch(_iter_csv(reader, chunksize or _chunk_sizer(path, columns, 1 + chunking.prefetch_blocks)))
+
+
+def _chunk_sizer(path: str, columns: list[str], blocks: int = 1) -> chunking.ChunkSizer:
+    """Cria o ``chunking.ChunkSizer`` dos blocos lidos de um conjunto de dados, com os
+    tipos do esquema gravado na limpeza e ``blocks`` blocos lidos ao mesmo tempo.
+    Colunas sem tipo no esquema são estimadas como ``int64``."""
+    dtypes = schema.load_schema(path)
+    if columns is not None:
+        dtypes = {column: dtypes.get(column, 'int64') for column in columns}
+
+    # Sem esquema, a linha é estimada com a quantidade de colunas dos dados do SINASC
+    return chunking.ChunkSizer(dtypes or ['int64'] * 64, blocks=blocks)
+
+
+def _next_rows(chunksize) -> int:
+    """Retorna a quantidade de linhas do próximo bloco."""
+    return chunksize() if callable(chunksize) else chunksize
+
+
+def _iter_csv(reader, chunksize):
+    """Lê um arquivo CSV aberto com ``iterator=True`` em blocos de até ``chunksize``
+    linhas, com o tamanho de cada bloco definido antes da sua leitura."""
+    with reader:
+        while True:
+            try:
+                yield reader.get_chunk(_next_rows(chunksize))
+            except StopIteration:
+                return
+
+
+def _load_row_index(path: str, columns: list[str]) -> dict:
+    """Lê o índice de linhas de um arquivo CSV, levantando erro se ele não existir ou
+    estiver desatualizado, e verifica as colunas pedidas."""
+    index = row_index.load_index(path)
+    if index is None:
+        raise FileNotFoundError(f"Erro: índice de linhas de {path} não encontrado ou desatualizado.")
+
+    if columns is not None:
+        _check_columns(path, columns)
+
+    return index
+
+
+def read_rows(path: str, start: int = 0, stop: int = None, columns: list[str] = None) -> pd.DataFrame:
+    """Lê as linhas de ``start`` até ``stop`` (sem incluir ``stop``) de um conjunto de
+    dados tratados em CSV, compactado ou não, com os tipos do esquema gravado na
+    limpeza. Com o índice de linhas gravado na limpeza (ver ``row_index``), somente o
+    intervalo de bytes que contém as linhas é lido e descompactado. O índice do
+    DataFrame é o número de cada linha no arquivo, como em ``read_dataset``.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV
+    start : int, optional
+        Primeira linha lida
+    stop : int, optional
+        Linha seguinte à última linha lida. Se não for informado, as linhas são lidas
+        até o fim do arquivo
+    columns : list[str], optional
+        Colunas a serem lidas. Se não for informado, todas as colunas são lidas
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com as linhas lidas
+
+    Raises
+    ------
+    FileNotFoundError
+        O índice de linhas não existe ou está desatualizado
+    KeyError
+        Alguma coluna pedida não existe no conjunto de dados
+
+    Examples
+    --------
+    >>> writer = DatasetWriter('exemplo.csv', index_rows=2)
+    >>> offsets = writer.write(pd.DataFrame({'A': range(5), 'B': range(10, 15)}))
+    >>> row_index.save_index('exemplo.csv', 2, offsets, 5)
+    >>> read_rows('exemplo.csv', 1, 4, ['B'])
+        B
+    1  11
+    2  12
+    3  13
+    >>> remove_dataset('exemplo.csv')
+    """
+    index = _load_row_index(path, columns)
+    if stop is None or stop > index['rows']:
+        stop = index['rows']
+    stop = max(stop, start)
+
+    data = b''
+    first = start
+    if start < stop:
+        first, begin, end = row_index.byte_range(index, start, stop)
+        with open(path, 'rb') as file:
+            file.seek(begin)
+            data = file.read(end - begin)
+        # Cada posição do índice de um CSV compactado é o início de um membro gzip
+        if path.endswith('.gz'):
+            data = gzip.decompress(data)
+
+    names = list(pd.read_csv(path, sep=";", nrows=0).columns)
+    df = pd.read_csv(io.BytesIO(data), sep=";", header=None, names=names, usecols=columns,
+                     dtype=_schema_dtypes(path, columns))
+
+    df = df.iloc[start - first:stop - first]
+    df.index = pd.RangeIndex(start, start + len(df))
+    return _select_rows(df, columns, None)
+
+
+def map_rows(function, path: str, columns: list[str] = None, jobs: int = None, chunksize: int = None):
+    """Aplica ``function`` a intervalos disjuntos de linhas de um conjunto de dados
+    tratados em CSV, cada um lido por ``read_rows`` a partir do seu intervalo de bytes,
+    em até ``jobs`` processos ao mesmo tempo. Os resultados são entregues na ordem das
+    linhas. Com mais de um processo, ``function`` deve ser definida no nível de um
+    módulo, para ser enviada aos processos.
+
+    Parameters
+    ----------
+    function : Callable[[pd.DataFrame], Any]
+        Função aplicada a cada intervalo de linhas
+    path : str
+        Endereço do arquivo CSV
+    columns : list[str], optional
+        Colunas a serem lidas. Se não for informado, todas as colunas são lidas
+    jobs : int, optional
+        Quantidade de processos. Se não for informado, usa a quantidade de CPUs
+    chunksize : int, optional
+        Quantidade aproximada de linhas de cada intervalo, arredondada para um
+        múltiplo das linhas do índice. Se não for informado, é ajustada ao orçamento de
+        memória, com um intervalo em cada processo
+
+    Returns
+    -------
+    Iterator
+        Iterador sobre os resultados de ``function`` em cada intervalo
+
+    Raises
+    ------
+    FileNotFoundError
+        O índice de linhas não existe ou está desatualizado
+    KeyError
+        Alguma coluna pedida não existe no conjunto de dados
+
+    Examples
+    --------
+    >>> writer = DatasetWriter('exemplo.csv', index_rows=2)
+    >>> offsets = writer.write(pd.DataFrame({'A': range(5)}))
+    >>> row_index.save_index('exemplo.csv', 2, offsets, 5)
+    >>> list(map_rows(len, 'exemplo.csv', ['A'], jobs=1, chunksize=2))
+    [2, 2, 1]
+    >>> remove_dataset('exemplo.csv')
+    """
+    index = _load_row_index(path, columns)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = _chunk_sizer(path, columns, jobs).rows
+
+    return _map_ranges(function, path, columns, jobs, row_index.split_rows(index, chunksize))
+
+
+def _map_range(function, path: str, start: int, stop: int, columns: list[str]):
+    """Lê um intervalo de linhas e aplica ``function``, em um processo de ``map_rows``."""
+    return function(read_rows(path, start, stop, columns))
+
+
+def _map_ranges(function, path: str, columns: list[str], jobs: int, ranges: list[tuple[int, int]]):
+    """Aplica ``function`` a cada intervalo de linhas, em ordem."""
+    if jobs <= 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            yield _map_range(function, path, start, stop, columns)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as executor:
+        futures = [executor.submit(_map_range, function, path, start, stop, columns) for start, stop in ranges]
+        for future in futures:
+            yield future.result()
+
+
+def _select_years(path: str, years: list[int]) -> dict[int, str]:
+    """Retorna as partições dos anos pedidos, levantando erro se nenhuma existir."""
+    partitions = year_partitions(path)
+    if not partitions:
+        return {}
+
+    selected = {year: partition for year, partition in partitions.items() if years is None or year in years}
+    if not selected:
+        raise FileNotFoundError(f"Erro: nenhuma partição dos anos {years} encontrada em {path}.")
+
+    return selected
+
+
+def _partition_columns(columns: list[str]) -> list[str]:
+    """Retorna as colunas lidas de cada partição, sem a coluna do ano."""
+    if columns is None:
+        return None
+
+    return [column for column in columns if column != year_column]
+
+
+def _add_year(df: pd.DataFrame, year: int, columns: list[str]) -> pd.DataFrame:
+    """Adiciona a coluna do ano a um bloco lido de uma partição, quando pedida."""
+    if columns is None or year_column not in columns:
+        return df
+
+    df[year_column] = np.int16(year)
+    return df[list(columns)]
+
+
+def _iter_years(partitions: dict[int, str], columns: list[str], partition_columns: list[str], chunksize: int):
+    """Lê as partições de cada ano em blocos de até ``chunksize`` linhas."""
+    for year, partition in partitions.items():
+        for chunk in iter_dataset(partition, partition_columns, chunksize):
+            yield _add_year(chunk, year, columns)
+
+
+def _iter_store(path: str, columns: list[str], chunksize: int):
+    """Lê o armazenamento em colunas em blocos de até ``chunksize`` linhas, que são
+    fatias dos arrays mapeados em memória. As colunas ficam na ordem do arquivo, como
+    na leitura do CSV em blocos."""
+    if columns is not None:
+        columns = [column for column in column_store.load_metadata(path)['columns'] if column in columns]
+
+    df = column_store.read_store(path, columns)
+    start = 0
+    while start < len(df):
+        rows = _next_rows(chunksize)
+        yield df.iloc[start:start + rows]
+        start += rows
+
+
+def build_column_store(path: str) -> bool:
+    """Converte o conjunto de dados tratados para o armazenamento em colunas (ver
+    ``column_store``), com um arquivo ``.npy`` por coluna, se ainda não existir ou se o
+    conjunto de dados foi alterado depois da conversão. Em um conjunto particionado
+    por ano, cada partição é convertida separadamente.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do conjunto de dados tratados
+
+    Returns
+    -------
+    bool
+        True se alguma conversão foi feita
+
+    Examples
+    --------
+    >>> pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv('exemplo.csv', sep=';', index=False)
+    >>> build_column_store('exemplo.csv'), build_column_store('exemplo.csv')
+    (True, False)
+    >>> read_dataset('exemplo.csv', ['B'])['B'].to_numpy().flags.writeable
+    False
+    >>> remove_dataset('exemplo.csv')
+    """
+    partitions = year_partitions(path)
+    if partitions:
+        built = [build_column_store(partition) for partition in partitions.values()]
+        return any(built)
+
+    if column_store.is_fresh(path):
+        return False
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Erro: Arquivo {path} não encontrado.")
+
+    # A assinatura é calculada antes da leitura, de forma que uma alteração durante a
+    # conversão torna o armazenamento desatualizado
+    signature = column_store.source_signature(path)
+    column_store.write_store(iter_dataset(path), path, signature)
+
+    return True
+
+
+def _iter_parquet(path: str, columns: list[str], chunksize: int):
+    """Lê os arquivos Parquet de cada UF em blocos de até ``chunksize`` linhas."""
+    pa, pq = _import_parquet()
+
+    for directory in sorted(os.listdir(path)):
+        if not directory.startswith(f'{partition_column}='):
+            continue
+
+        for file_name in sorted(os.listdir(os.path.join(path, directory))):
+            parquet_file = pq.ParquetFile(os.path.join(path, directory, file_name))
+            for batch in parquet_file.iter_batches(batch_size=_next_rows(chunksize), columns=columns):
+                yield batch.to_pandas()
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
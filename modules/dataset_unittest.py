@@ -0,0 +1,160 @@
+import unittest
+import pandas as pd
+import pandas.testing as pd_testing
+import shutil
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import dataset
+import row_index
+
+try:
+    import pyarrow
+    has_pyarrow = True
+except ImportError:
+    has_pyarrow = False
+
+
+class TestDataset(unittest.TestCase):
+    def assertDataFrameEqual(self, a, b, msg):
+        try:
+            pd_testing.assert_frame_equal(a, b)
+        except AssertionError as e:
+            raise self.failureException(msg) from e
+
+    def setUp(self):
+        self.addTypeEqualityFunc(pd.DataFrame, self.assertDataFrameEqual)
+
+        # Blocos de dados tratados usados nos testes
+        self.chunks = [
+            pd.DataFrame({'CODMUNNASC': [120001, 355030], 'PESO': [3000, 3100]}, index=pd.Index([1, 2], name='CONTADOR')),
+            pd.DataFrame({'CODMUNNASC': [355031, 530010], 'PESO': [3200, 3300]}, index=pd.Index([3, 4], name='CONTADOR'))
+        ]
+
+    def tearDown(self):
+        for path in ['output.csv', 'output.csv.gz']:
+            dataset.remove_dataset(path)
+        if os.path.isdir('output'):
+            shutil.rmtree('output')
+
+    def write_chunks(self, path, output_format):
+        writer = dataset.DatasetWriter(path, output_format)
+        for chunk in self.chunks:
+            writer.write(chunk)
+        writer.close()
+
+    # Teste 1: conjunto gravado em CSV deve ser lido com todas as linhas e colunas
+    def test_csv_round_trip(self):
+        self.write_chunks('output.csv', 'csv')
+
+        result = dataset.read_dataset('output.csv')
+        expected = pd.concat(self.chunks).reset_index()
+
+        self.assertEqual(result, expected)
+
+    # Teste 2: função read_dataset deve ler somente as colunas e UFs pedidas
+    def test_read_dataset_columns_and_ufs(self):
+        self.write_chunks('output.csv', 'csv')
+
+        result = dataset.read_dataset('output.csv', ['PESO'], ufs=[35]).reset_index(drop=True)
+        expected = pd.DataFrame({'PESO': [3100, 3200]})
+
+        self.assertEqual(result, expected)
+
+    # Teste 3: função read_dataset com coluna inexistente deve levantar erro
+    def test_read_dataset_invalid_column(self):
+        self.write_chunks('output.csv', 'csv')
+
+        with self.assertRaises(KeyError):
+            dataset.read_dataset('output.csv', ['APGAR5'])
+
+    # Teste 4: função read_dataset com arquivo inexistente deve levantar erro
+    def test_read_dataset_file_not_exists(self):
+        with self.assertRaises(FileNotFoundError):
+            dataset.read_dataset('input.csv')
+
+    # Teste 5: conjunto Parquet deve ser particionado por UF e lido por UF
+    @unittest.skipUnless(has_pyarrow, 'pyarrow não instalado')
+    def test_parquet_partitions(self):
+        self.write_chunks('output', 'parquet')
+
+        self.assertEqual(sorted(os.listdir('output')), ['UF=12', 'UF=35', 'UF=53'])
+
+        result = dataset.read_dataset('output', ['CONTADOR', 'PESO'], ufs=[35])
+        expected = pd.DataFrame({'CONTADOR': [2, 3], 'PESO': [3100, 3200]})
+
+        self.assertEqual(result, expected)
+
+    # Teste 6: formato de saída inexistente deve levantar erro
+    def test_writer_invalid_format(self):
+        with self.assertRaises(ValueError):
+            dataset.DatasetWriter('output.json', 'json')
+
+    # Teste 7: conjunto particionado por ano deve ser lido por ano, com a coluna do ano quando pedida
+    def test_year_partitions(self):
+        os.makedirs('output')
+        for year, chunk in zip([2020, 2021], self.chunks):
+            writer = dataset.DatasetWriter(dataset.partition_path('output', year), 'csv')
+            writer.write(chunk)
+            writer.close()
+
+        self.assertEqual(list(dataset.year_partitions('output')), [2020, 2021])
+
+        result = dataset.read_dataset('output', ['ANO', 'PESO'], years=[2021])
+        expected = pd.DataFrame({'ANO': [2021, 2021], 'PESO': [3200, 3300]}).astype({'ANO': 'int16'})
+        self.assertEqual(result, expected)
+
+        result = pd.concat(dataset.iter_dataset('output', ['PESO'], chunksize=1), ignore_index=True)
+        self.assertEqual(result, pd.DataFrame({'PESO': [3000, 3100, 3200, 3300]}))
+
+        with self.assertRaises(FileNotFoundError):
+            dataset.read_dataset('output', years=[2019])
+
+    # Teste 8: conjunto gravado em CSV compactado deve ter os mesmos dados do CSV e ser retomado após um checkpoint
+    def test_csv_gz_round_trip(self):
+        self.write_chunks('output.csv', 'csv')
+        writer = dataset.DatasetWriter('output.csv.gz', 'csv.gz', threads=2)
+        writer.write(self.chunks[0])
+        size = writer.size()
+        writer.write(self.chunks[1])
+
+        # Descarta o segundo bloco e o grava novamente, como ao retomar a limpeza
+        writer.truncate(1, size)
+        writer.write(self.chunks[1])
+        writer.close()
+
+        self.assertEqual(dataset.read_dataset('output.csv.gz'), dataset.read_dataset('output.csv'))
+        result = pd.concat(dataset.iter_dataset('output.csv.gz', ['PESO'], chunksize=1), ignore_index=True)
+        self.assertEqual(result, pd.DataFrame({'PESO': [3000, 3100, 3200, 3300]}))
+
+        # Partes pequenas geram vários membros no mesmo arquivo
+        with open('output.csv', 'rb') as file:
+            text = file.read()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            members = dataset.gzip_members(text, executor, member_bytes=8)
+        self.assertGreater(len(members), 1)
+        self.assertEqual(gzip.decompress(b''.join(member for _, member in members)), text)
+
+    # Teste 9: o índice de linhas deve permitir ler intervalos de linhas e dividir a leitura entre processos
+    def test_row_index_reads(self):
+        for path, output_format in [('output.csv', 'csv'), ('output.csv.gz', 'csv.gz')]:
+            writer = dataset.DatasetWriter(path, output_format, index_rows=1)
+            offsets = [offset for chunk in self.chunks for offset in writer.write(chunk)]
+            writer.close()
+            row_index.save_index(path, 1, offsets, 4)
+
+            expected = dataset.read_dataset(path)
+            self.assertEqual(dataset.read_rows(path), expected)
+            self.assertEqual(dataset.read_rows(path, 1, 3, ['PESO', 'CONTADOR']), expected.loc[1:2, ['PESO', 'CONTADOR']])
+            self.assertEqual(list(dataset.map_rows(len, path, ['PESO'], jobs=2, chunksize=1)), [1, 1, 1, 1])
+
+            # Um arquivo alterado depois da gravação do índice não é lido pelo índice
+            with open(path, 'ab') as file:
+                file.write(gzip.compress(b'5;120001;3400\n') if output_format == 'csv.gz' else b'5;120001;3400\n')
+            with self.assertRaises(FileNotFoundError):
+                dataset.read_rows(path)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
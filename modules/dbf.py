@@ -0,0 +1,436 @@
+"""
+Módulo de Leitura dos Arquivos DBF e DBC do DATASUS
+
+Este módulo contém funções para ler os dados brutos do SINASC no formato em que são publicados pelo DATASUS: arquivos DBF (dBase) de registros de largura fixa, ou DBC, que são arquivos DBF com os registros compactados no formato PKWARE DCL (ver ``blast``). Os registros são lidos em blocos de bytes, como os blocos de linhas de ``raw_data``, e cada campo é convertido diretamente das colunas de bytes do bloco, sem passar por um CSV.
+
+Como os arquivos do DATASUS não possuem a coluna ``CONTADOR`` dos arquivos CSV, o número de cada registro (a partir de 1) é acrescentado ao final do registro durante a leitura e usado como índice quando a coluna do índice não é um campo do arquivo.
+
+Funcionalidades:
+- Abre um arquivo DBF ou DBC, descompactando os registros durante a leitura.
+- Lê o cabeçalho e a descrição dos campos de um arquivo DBF.
+- Divide o arquivo em blocos de registros, com a posição de cada bloco e o número de cada registro.
+- Converte os campos numéricos de um bloco em DataFrame, de forma vetorizada.
+- Separa os registros de um bloco e as chaves usadas para identificar registros repetidos.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+import struct
+import io
+import os
+from itertools import chain
+
+import blast
+
+
+# Extensões dos arquivos lidos por este módulo
+extensions = ('.dbf', '.dbc')
+
+# Quantidade de dígitos do número do registro acrescentado a cada registro
+counter_width = 10
+
+# Marcador de registro removido no DBF
+deleted_flag = ord('*')
+
+
+def is_dbf(path_input: str) -> bool:
+    """Verifica se um arquivo de dados brutos está no formato DBF ou DBC.
+
+    Examples
+    --------
+    >>> is_dbf('data/DNSP2021.DBC'), is_dbf('data/SINASC_2021.csv')
+    (True, False)
+    """
+    return os.path.splitext(path_input)[1].lower() in extensions
+
+
+def read_header(file) -> dict:
+    """Lê o cabeçalho de um arquivo DBF: a quantidade de registros, o tamanho do
+    cabeçalho e dos registros e a descrição de cada campo.
+
+    Parameters
+    ----------
+    file : io.BufferedIOBase
+        Arquivo aberto em bytes, posicionado no início
+
+    Returns
+    -------
+    dict
+        Cabeçalho com os bytes originais ('bytes'), a quantidade de registros
+        ('records'), o tamanho do cabeçalho ('header_length') e de cada registro
+        ('record_length') e os campos ('fields'), cada um com nome, tipo, posição no
+        registro, largura e casas decimais
+
+    Raises
+    ------
+    ValueError
+        O cabeçalho está incompleto ou é inválido
+    """
+    start = file.read(32)
+    if len(start) < 32:
+        raise ValueError("Erro: cabeçalho do arquivo DBF incompleto.")
+
+    records, header_length, record_length = struct.unpack('<IHH', start[4:12])
+    data = start + file.read(header_length - 32)
+    if len(data) < header_length:
+        raise ValueError("Erro: cabeçalho do arquivo DBF incompleto.")
+
+    fields = []
+    # O primeiro byte de cada registro indica se ele foi removido
+    position = 1
+    for descriptor in range(32, header_length - 31, 32):
+        if data[descriptor] == 0x0D:
+            break
+        name = data[descriptor:descriptor + 11].split(b'\x00')[0].decode('latin-1').strip()
+        width = data[descriptor + 16]
+        fields.append({
+            'name': name,
+            'type': chr(data[descriptor + 11]),
+            'offset': position,
+            'width': width,
+            'decimals': data[descriptor + 17]
+        })
+        position += width
+
+    if position != record_length:
+        raise ValueError("Erro: tamanho dos registros do arquivo DBF diferente da soma dos campos.")
+
+    return {
+        'bytes': data,
+        'records': records,
+        'header_length': header_length,
+        'record_length': record_length,
+        'fields': fields
+    }
+
+
+def open_dbf(path_input: str):
+    """Abre um arquivo DBF ou DBC para leitura em bytes. No DBC, o cabeçalho do DBF
+    é seguido de 4 bytes de verificação e dos registros compactados, que são
+    descompactados durante a leitura; o arquivo aberto tem o mesmo conteúdo do DBF
+    original, mas não permite posicionamento.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo DBF ou DBC
+
+    Returns
+    -------
+    io.BufferedIOBase
+        Arquivo aberto
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo não existe
+    """
+    if not os.path.isfile(path_input):
+        raise FileNotFoundError(f"Erro: Arquivo {path_input} não encontrado.")
+
+    file = open(path_input, 'rb')
+    if os.path.splitext(path_input)[1].lower() != '.dbc':
+        return file
+
+    start = file.read(12)
+    header = start + file.read(struct.unpack('<H', start[8:10])[0] - len(start))
+    # Bytes de verificação entre o cabeçalho e os dados compactados
+    file.read(4)
+
+    return io.BufferedReader(blast.IterReader(chain([header], blast.decompress_iter(file)), on_close=file.close))
+
+
+def _record_numbers(first: int, count: int) -> np.ndarray:
+    """Número de cada registro, a partir de ``first + 1``, em ``counter_width``
+    dígitos ASCII."""
+    numbers = np.arange(first + 1, first + count + 1, dtype=np.int64)
+    powers = 10 ** np.arange(counter_width - 1, -1, -1, dtype=np.int64)
+
+    return ((numbers[:, None] // powers) % 10 + ord('0')).astype(np.uint8)
+
+
+def read_blocks(path_input: str, chunksize: int = 100000, offset: int = None):
+    """Divide os registros de um arquivo DBF ou DBC em blocos de até ``chunksize``
+    registros. Ao final de cada registro é acrescentado o seu número, com
+    ``counter_width`` dígitos. As posições consideram os registros com o número
+    acrescentado, de forma que o fim de um bloco é a sua posição mais o seu tamanho,
+    como nos blocos de ``raw_data.read_raw_blocks``. Os registros removidos continuam
+    no bloco, mas não são contados.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo DBF ou DBC
+    chunksize : int | Callable[[], int], optional
+        Quantidade de registros de cada bloco, ou função que retorna a quantidade de
+        registros do próximo bloco
+    offset : int, optional
+        Posição a partir da qual a leitura começa, igual à posição ou ao fim de um
+        bloco já lido. Se não for informado, a leitura começa no primeiro registro
+
+    Returns
+    -------
+    Iterator[tuple[int, int, bytes]]
+        Iterador sobre a posição inicial, a quantidade de registros não removidos e o
+        conteúdo de cada bloco
+
+    Raises
+    ------
+    ValueError
+        O arquivo termina antes do último registro
+    """
+    with open_dbf(path_input) as file:
+        header = read_header(file)
+        record_length = header['record_length']
+        block_record_length = record_length + counter_width
+
+        first = 0
+        if offset is not None:
+            first = (offset - header['header_length']) // block_record_length
+
+        # Arquivos DBC não permitem posicionamento, então os registros anteriores são lidos
+        if file.seekable():
+            file.seek(header['header_length'] + first * record_length)
+        else:
+            remaining = first * record_length
+            while remaining > 0:
+                skipped = len(file.read(min(remaining, 1 << 24)))
+                if skipped == 0:
+                    break
+                remaining -= skipped
+
+        while first < header['records']:
+            count = min(chunksize() if callable(chunksize) else chunksize, header['records'] - first)
+            data = file.read(count * record_length)
+            if len(data) < count * record_length:
+                raise ValueError(f"Erro: arquivo {path_input} termina antes do último registro.")
+
+            records = np.frombuffer(data, dtype=np.uint8).reshape(count, record_length)
+            block = np.hstack([records, _record_numbers(first, count)]).tobytes()
+            rows = count - int((records[:, 0] == deleted_flag).sum())
+
+            yield header['header_length'] + first * block_record_length, rows, block
+            first += count
+
+
+def reader_options(path_input: str, df_index: str, columns_to_remove: list[str], encoding: str = 'latin-1') -> dict:
+    """Monta as opções usadas por ``parse_block`` para converter os blocos de um
+    arquivo DBF ou DBC, equivalentes às de ``raw_data.reader_options``. Somente o
+    índice e os campos mantidos na limpeza são convertidos, como ``np.float64``. Se a
+    coluna do índice não for um campo do arquivo, o índice é o número do registro.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo DBF ou DBC
+    df_index : str
+        Coluna usada como índice do DataFrame
+    columns_to_remove : list[str]
+        Colunas que serão removidas na limpeza e que, portanto, não são lidas
+    encoding : str, optional
+        Codificação dos campos de texto
+
+    Returns
+    -------
+    dict
+        Opções de leitura: formato, colunas do arquivo, colunas lidas, posição do
+        índice, tipos, posição e largura de cada campo, tamanho dos registros,
+        codificação e se o hash dos registros é calculado
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada não existe
+    """
+    with open_dbf(path_input) as file:
+        header = read_header(file)
+
+    fields = {field['name']: (field['offset'], field['width']) for field in header['fields']}
+    columns = list(fields)
+    # O número do registro fica logo após os campos
+    counter = (header['record_length'], counter_width)
+
+    if df_index not in fields:
+        columns = [df_index] + columns
+        fields[df_index] = counter
+
+    dtypes = {column: np.float64 for column in columns if column != df_index and column not in columns_to_remove}
+
+    return {
+        'format': 'dbf',
+        'columns': columns,
+        'usecols': [column for column in columns if column == df_index or column in dtypes],
+        'index_position': columns.index(df_index),
+        'df_index': df_index,
+        'dtypes': dtypes,
+        'fields': fields,
+        'counter': counter,
+        'record_length': header['record_length'] + counter_width,
+        'encoding': encoding,
+        'row_hashes': True
+    }
+
+
+def record_array(block: bytes, options: dict) -> np.ndarray:
+    """Retorna os registros não removidos de um bloco como um array de bytes com uma
+    linha por registro.
+
+    Parameters
+    ----------
+    block : bytes
+        Registros do bloco, gerados por ``read_blocks``
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    np.ndarray
+        Array do tipo np.uint8 com uma linha por registro
+    """
+    records = np.frombuffer(block, dtype=np.uint8).reshape(-1, options['record_length'])
+
+    return records[records[:, 0] != deleted_flag]
+
+
+def split_records(block: bytes, options: dict) -> list[bytes]:
+    """Divide um bloco nos seus registros não removidos.
+
+    Parameters
+    ----------
+    block : bytes
+        Registros do bloco, gerados por ``read_blocks``
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    list[bytes]
+        Registros do bloco
+    """
+    length = options['record_length']
+    return [record for record in (block[start:start + length] for start in range(0, len(block), length))
+            if record[0] != deleted_flag]
+
+
+def record_keys(records: np.ndarray, options: dict) -> np.ndarray:
+    """Retorna a chave de cada registro usada para identificar registros repetidos:
+    todos os campos, exceto o marcador de remoção, o número do registro e o índice.
+
+    Parameters
+    ----------
+    records : np.ndarray
+        Registros gerados por ``record_array``
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    np.ndarray
+        Chave de cada registro, como array de bytes
+    """
+    excluded = [(0, 1), options['counter'], options['fields'][options['df_index']]]
+
+    keep = np.ones(options['record_length'], dtype=bool)
+    for start, width in excluded:
+        keep[start:start + width] = False
+
+    keys = np.ascontiguousarray(records[:, keep])
+    return keys.view(f'S{keys.shape[1]}').ravel()
+
+
+def parse_field(values: np.ndarray, name: str = '') -> np.ndarray:
+    """Converte as colunas de bytes de um campo em números. Campos com somente dígitos
+    e espaços são convertidos de forma vetorizada; os demais (com sinal ou casas
+    decimais) são convertidos por ``float``. Campos em branco são valores ausentes.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Array do tipo np.uint8 com uma linha por registro e uma coluna por byte do campo
+    name : str, optional
+        Nome do campo, usado na mensagem de erro
+
+    Returns
+    -------
+    np.ndarray
+        Valor de cada registro, do tipo np.float64
+
+    Raises
+    ------
+    ValueError
+        Algum valor do campo não é numérico
+
+    Examples
+    --------
+    >>> values = np.frombuffer(b'  12   7    -2.5', dtype=np.uint8).reshape(-1, 4)
+    >>> parse_field(values)
+    array([12. ,  7. ,  nan, -2.5])
+    """
+    # Cada byte do campo em uma linha contígua, com um registro por coluna
+    values = np.ascontiguousarray(values.T)
+    digits = values - np.uint8(ord('0'))
+    is_digit = digits < 10
+    is_blank = (values == ord(' ')) | (values == 0)
+
+    number = np.zeros(values.shape[1], dtype=np.int64)
+    started = np.zeros(values.shape[1], dtype=bool)
+    ended = np.zeros(values.shape[1], dtype=bool)
+    # Registros com dígitos separados por espaços não são convertidos de forma vetorizada
+    invalid = ~(is_digit | is_blank).all(axis=0)
+
+    for digit, value in zip(is_digit, digits):
+        invalid |= ended & digit
+        ended |= started & ~digit
+        started |= digit
+        number = np.where(digit, number * 10 + value, number)
+
+    result = number.astype(np.float64)
+    result[~started & ~invalid] = np.nan
+
+    for row in np.flatnonzero(invalid):
+        text = values[:, row].tobytes().strip(b' \x00')
+        try:
+            result[row] = float(text)
+        except ValueError:
+            raise ValueError(f"Erro: valor {text!r} inválido no campo {name}.")
+
+    return result
+
+
+def parse_block(block: bytes, options: dict) -> pd.DataFrame:
+    """Converte um bloco de registros em DataFrame com o índice e os campos mantidos
+    na limpeza, na ordem do arquivo. O índice é do tipo np.int64, como nos leitores de
+    CSV, se não tiver valores ausentes.
+
+    Parameters
+    ----------
+    block : bytes
+        Registros do bloco, gerados por ``read_blocks``
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com os dados do bloco
+    """
+    records = record_array(block, options)
+
+    data = {}
+    for column in options['usecols']:
+        start, width = options['fields'][column]
+        data[column] = parse_field(records[:, start:start + width], column)
+
+    df = pd.DataFrame(data)
+
+    index = df[options['df_index']]
+    if not index.isna().any():
+        df[options['df_index']] = index.astype(np.int64)
+
+    return df
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
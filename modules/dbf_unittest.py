@@ -0,0 +1,124 @@
+import unittest
+import pandas as pd
+import pandas.testing as pd_testing
+import struct
+import os
+
+import blast
+import dbf
+import raw_data
+
+
+def write_dbf(df: pd.DataFrame, path: str, deleted: list[int] = ()) -> bytes:
+    """Grava um DataFrame como arquivo DBF, com todos os campos do tipo caractere
+    alinhados à direita, e retorna o conteúdo gravado."""
+    text = df.astype(str).replace(['nan', '<NA>'], '')
+    widths = [max(1, int(text[column].str.len().max())) for column in df.columns]
+
+    header = bytearray(struct.pack('<B3BIHH20x', 3, 121, 1, 1, len(df), 33 + 32 * len(widths), 1 + sum(widths)))
+    for column, width in zip(df.columns, widths):
+        header += struct.pack('<11sc4xBB14x', column.encode(), b'C', width, 0)
+    header += b'\r'
+
+    records = b''
+    for row in range(len(df)):
+        flag = b'*' if row in deleted else b' '
+        records += flag + b''.join(value.rjust(width).encode() for value, width in zip(text.iloc[row], widths))
+
+    content = bytes(header) + records + b'\x1a'
+    with open(path, 'wb') as file:
+        file.write(content)
+    return content
+
+
+def write_dbc(content: bytes, path: str):
+    """Grava o conteúdo de um DBF como arquivo DBC, compactando os registros somente
+    com literais não codificados do formato PKWARE DCL."""
+    header_length = struct.unpack('<H', content[8:10])[0]
+
+    bits = [0] * 8 + [0, 1, 1, 0, 0, 0, 0, 0]
+    for byte in content[header_length:]:
+        bits += [0] + [(byte >> position) & 1 for position in range(8)]
+
+    # Código de fim: comprimento 519, símbolo 15 com 255 nos bits extras
+    code, length = blast.canonical_codes(blast.code_lengths(blast.length_lengths))[15]
+    bits += [1] + [((code >> (length - 1 - position)) & 1) ^ 1 for position in range(length)] + [1] * 8
+    bits += [0] * (-len(bits) % 8)
+
+    data = bytes(sum(bit << position for position, bit in enumerate(bits[start:start + 8])) for start in range(0, len(bits), 8))
+    with open(path, 'wb') as file:
+        file.write(content[:header_length] + b'\x00' * 4 + data)
+
+
+class TestDbf(unittest.TestCase):
+    def setUp(self):
+        # Dados brutos usados nos testes, sem a coluna do índice
+        self.df = pd.DataFrame({
+            'IDADEMAE': [25, 31, None, 25, 40],
+            'PESO': [3200, 2950, 3100, 3200, 3600],
+            'CODANOMAL': ['', 'Q699', '', '', ''],
+            'SEXO': [1, 2, 1, 1, 2]
+        })
+        self.df['IDADEMAE'] = self.df['IDADEMAE'].astype('Int64')
+
+    def tearDown(self):
+        for path in ('input.dbf', 'input.dbc', 'input.csv'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Teste 1: arquivo DBF do repositório deve ser lido com os campos do cabeçalho e o número dos registros
+    def test_read_repository_dbf(self):
+        path_input = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis', 'saulo', 'data', 'shapefile', 'estados_2010.dbf')
+
+        options = raw_data.reader_options(path_input, 'CONTADOR', ['nome', 'sigla'])
+        df = pd.concat(raw_data.read_raw_data(path_input, 'CONTADOR', ['nome', 'sigla'], chunksize=10))
+
+        self.assertEqual(options['columns'], ['CONTADOR', 'id', 'nome', 'sigla', 'regiao_id', 'codigo_ibg'])
+        self.assertEqual(len(df), 27)
+        self.assertEqual(df['CONTADOR'].tolist(), list(range(1, 28)))
+        self.assertEqual(df.loc[df['id'] == 1, 'codigo_ibg'].tolist(), [12.0])
+
+    # Teste 2: leitura do DBF deve ser igual à leitura do mesmo conjunto em CSV
+    def test_dbf_equals_csv(self):
+        write_dbf(self.df, 'input.dbf')
+        csv = self.df.copy()
+        csv.insert(0, 'CONTADOR', range(1, len(csv) + 1))
+        csv.to_csv('input.csv', sep=';', index=False)
+
+        result = pd.concat(raw_data.read_raw_data('input.dbf', 'CONTADOR', ['CODANOMAL'], chunksize=2), ignore_index=True)
+        expected = pd.concat(raw_data.read_raw_data('input.csv', 'CONTADOR', ['CODANOMAL'], chunksize=2), ignore_index=True)
+
+        pd_testing.assert_frame_equal(result.drop(columns=raw_data.row_hash_column), expected.drop(columns=raw_data.row_hash_column))
+
+        # Registros repetidos, exceto pelo índice, devem ter o mesmo hash
+        hashes = result[raw_data.row_hash_column]
+        self.assertEqual(hashes[0], hashes[3])
+        self.assertEqual(hashes.nunique(), 4)
+
+    # Teste 3: DBC deve gerar os mesmos blocos do DBF, ignorando registros removidos, e permitir retomar a leitura
+    def test_dbc_blocks(self):
+        content = write_dbf(self.df, 'input.dbf', deleted=[1])
+        write_dbc(content, 'input.dbc')
+
+        with dbf.open_dbf('input.dbc') as file:
+            self.assertEqual(file.read(), content)
+
+        blocks = list(raw_data.read_raw_blocks('input.dbc', chunksize=2))
+        self.assertEqual(blocks, list(raw_data.read_raw_blocks('input.dbf', chunksize=2)))
+        self.assertEqual([rows for _, rows, _ in blocks], [1, 2, 1])
+        self.assertEqual(list(raw_data.read_raw_blocks('input.dbc', chunksize=2, offset=blocks[1][0])), blocks[1:])
+
+        options = raw_data.reader_options('input.dbc', 'CONTADOR', ['CODANOMAL'])
+        df = pd.concat(raw_data.parse_raw_block(block, options) for _, _, block in blocks)
+        self.assertEqual(df['CONTADOR'].tolist(), [1, 3, 4, 5])
+
+    # Teste 4: campo não numérico lido deve levantar erro
+    def test_invalid_value(self):
+        write_dbf(self.df, 'input.dbf')
+
+        with self.assertRaises(ValueError):
+            list(raw_data.read_raw_data('input.dbf', 'CONTADOR', []))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
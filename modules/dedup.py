@@ -0,0 +1,150 @@
+"""
+Módulo de Remoção Global de Linhas Repetidas
+
+Este módulo contém as estruturas usadas para remover as linhas repetidas de todo o arquivo de dados brutos, e não só de cada bloco. Cada linha é representada pelo hash de 64 bits calculado por ``raw_data``, e os hashes já vistos ficam em arrays ordenados do numpy, usando cerca de 8 bytes por linha distinta.
+
+Funcionalidades:
+- Mantém um conjunto de hashes de 64 bits em níveis ordenados, que são combinados à medida que crescem.
+- Identifica a primeira ocorrência de cada linha no fluxo de blocos.
+- Remove de um bloco de linhas brutas as linhas que já apareceram em blocos anteriores ou no próprio bloco.
+
+"""
+
+import numpy as np
+import doctest
+
+import raw_data
+
+
+class FingerprintSet:
+    """Conjunto de hashes de 64 bits armazenado em níveis, cada um um array ordenado e
+    sem repetições do tipo ``np.uint64``. Os hashes de cada lote formam um novo nível, e
+    os dois últimos níveis são combinados sempre que o anterior não for maior do que o
+    último, de forma que existem no máximo O(log n) níveis e cada hash é copiado
+    O(log n) vezes. A busca é feita com ``np.searchsorted`` em cada nível.
+
+    Examples
+    --------
+    >>> fingerprints = FingerprintSet()
+    >>> fingerprints.add(np.array([5, 3, 5], dtype=np.uint64))
+    array([ True,  True, False])
+    >>> fingerprints.add(np.array([3, 7], dtype=np.uint64))
+    array([False,  True])
+    >>> len(fingerprints), fingerprints.nbytes
+    (3, 24)
+    """
+    def __init__(self):
+        self.levels = []
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos hashes, em bytes."""
+        return sum(level.nbytes for level in self.levels)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Verifica quais hashes já estão no conjunto.
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            Hashes a serem verificados
+
+        Returns
+        -------
+        np.ndarray
+            Máscara booleana dos hashes presentes no conjunto
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+
+        for level in self.levels:
+            positions = np.searchsorted(level, hashes)
+            positions[positions == len(level)] = 0
+            found |= level[positions] == hashes
+
+        return found
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """Adiciona um lote de hashes ao conjunto e indica quais deles são novos, isto
+        é, não estavam no conjunto e não apareceram antes no próprio lote.
+
+        Parameters
+        ----------
+        hashes : np.ndarray
+            Hashes do lote, na ordem das linhas
+
+        Returns
+        -------
+        np.ndarray
+            Máscara booleana das primeiras ocorrências de cada hash
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+
+        # Primeira ocorrência de cada hash dentro do lote
+        unique, first = np.unique(hashes, return_index=True)
+        new = ~self.contains(unique)
+
+        mask = np.zeros(len(hashes), dtype=bool)
+        mask[first[new]] = True
+
+        self._insert(unique[new])
+        return mask
+
+    def _insert(self, values: np.ndarray):
+        """Insere um array ordenado de hashes novos como um nível, combinando os níveis
+        de tamanho parecido."""
+        if len(values) == 0:
+            return
+
+        self.levels.append(values)
+        while len(self.levels) > 1 and len(self.levels[-2]) <= len(self.levels[-1]):
+            last = self.levels.pop()
+            previous = self.levels.pop()
+            # A ordenação estável aproveita as duas sequências já ordenadas
+            self.levels.append(np.sort(np.concatenate([previous, last]), kind='stable'))
+
+
+def deduplicate_block(block: bytes, fingerprints: FingerprintSet, options: dict) -> tuple[bytes, int]:
+    """Remove de um bloco de linhas brutas as linhas repetidas, isto é, cujos campos,
+    exceto o índice, são iguais aos de uma linha anterior do mesmo bloco ou de um bloco
+    já processado com o mesmo ``fingerprints``.
+
+    Parameters
+    ----------
+    block : bytes
+        Linhas do bloco, sem o cabeçalho
+    fingerprints : FingerprintSet
+        Hashes das linhas já vistas, atualizado com as linhas do bloco
+    options : dict
+        Opções de leitura geradas por ``raw_data.reader_options``
+
+    Returns
+    -------
+    tuple[bytes, int]
+        Bloco sem as linhas repetidas e a quantidade de linhas removidas
+
+    Examples
+    --------
+    >>> options = {'index_position': 0, 'columns': ['ID', 'A']}
+    >>> fingerprints = FingerprintSet()
+    >>> deduplicate_block(b'1;x\\n2;y\\n3;x\\n', fingerprints, options)
+    (b'1;x\\n2;y\\n', 1)
+    >>> deduplicate_block(b'4;y\\n5;z\\n', fingerprints, options)
+    (b'5;z\\n', 1)
+    """
+    records = raw_data.split_records(block, options)
+    keep = fingerprints.add(raw_data.record_hashes(records, options))
+
+    removed = len(records) - int(keep.sum())
+    if removed == 0:
+        return block, 0
+
+    kept_records = [record for record, kept in zip(records, keep) if kept]
+    return raw_data.join_records(kept_records, options), removed
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
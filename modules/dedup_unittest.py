@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+
+import dedup
+
+
+class TestDedup(unittest.TestCase):
+    # Teste 1: FingerprintSet deve marcar as mesmas primeiras ocorrências que um set do Python
+    def test_fingerprint_set_equals_python_set(self):
+        rng = np.random.default_rng(0)
+        fingerprints = dedup.FingerprintSet()
+        seen = set()
+
+        for _ in range(20):
+            hashes = rng.integers(0, 500, size=100).astype(np.uint64)
+
+            expected = []
+            for value in hashes.tolist():
+                expected.append(value not in seen)
+                seen.add(value)
+
+            self.assertEqual(fingerprints.add(hashes).tolist(), expected)
+
+        # Verifica a quantidade de hashes e a memória usada (8 bytes por hash)
+        self.assertEqual(len(fingerprints), len(seen))
+        self.assertEqual(fingerprints.nbytes, 8 * len(seen))
+
+    # Teste 2: os níveis devem continuar ordenados, sem repetições e em quantidade logarítmica
+    def test_fingerprint_set_levels(self):
+        fingerprints = dedup.FingerprintSet()
+        for start in range(0, 1024, 8):
+            fingerprints.add(np.arange(start, start + 8, dtype=np.uint64)[::-1])
+
+        for level in fingerprints.levels:
+            self.assertTrue(np.all(np.diff(level.astype(np.int64)) > 0))
+        self.assertLessEqual(len(fingerprints.levels), 8)
+        self.assertTrue(np.all(fingerprints.contains(np.arange(1024, dtype=np.uint64))))
+        self.assertFalse(fingerprints.contains(np.array([1024], dtype=np.uint64))[0])
+
+    # Teste 3: linhas repetidas em blocos diferentes devem ser removidas, ignorando o índice
+    def test_deduplicate_block_across_blocks(self):
+        options = {'index_position': 1, 'columns': ['A', 'CONTADOR', 'B']}
+        fingerprints = dedup.FingerprintSet()
+
+        first, first_removed = dedup.deduplicate_block(b'1;1;x\n2;2;y\n', fingerprints, options)
+        second, second_removed = dedup.deduplicate_block(b'1;3;x\n1;4;z\n', fingerprints, options)
+
+        self.assertEqual((first, first_removed), (b'1;1;x\n2;2;y\n', 0))
+        self.assertEqual((second, second_removed), (b'1;4;z\n', 1))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,401 @@
+"""
+Módulo de Filtros Compilados
+
+Este módulo contém o plano de filtros usado na limpeza dos dados. As restrições de valores do arquivo de configuração são compiladas uma única vez em tabelas de consulta, e cada bloco é filtrado com uma única máscara, sem cópias intermediárias do DataFrame.
+
+As regras de consistência entre colunas são expressões escritas no arquivo de configuração, como ``QTDPARTNOR + QTDPARTCES <= QTDGESTANT``. Cada expressão é validada e compilada uma única vez em operações vetorizadas do numpy sobre as colunas inteiras, então não há custo por linha em Python.
+
+Funcionalidades:
+- Compila as restrições de valores em tabelas de consulta para códigos inteiros pequenos.
+- Compila as regras de consistência entre colunas em operações vetorizadas, aceitando somente colunas, números, operadores aritméticos, comparações, ``and``, ``or``, ``not``, ``in`` e as funções ``abs``, ``min`` e ``max``.
+- Calcula a máscara combinada de todas as restrições e regras de um DataFrame.
+- Conta as linhas rejeitadas por cada restrição e por cada regra.
+- Filtra um DataFrame com uma única máscara.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+import ast
+
+
+# Maior código aceito para o qual é criada uma tabela de consulta
+max_table_size = 1024
+
+# Funções aceitas nas regras de consistência e suas versões vetorizadas
+rule_functions = {
+    'abs': np.abs,
+    'min': np.minimum,
+    'max': np.maximum
+}
+
+# Nós da árvore sintática aceitos nas regras de consistência
+rule_nodes = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name,
+    ast.Constant, ast.Tuple, ast.List, ast.Load,
+    ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd, ast.Invert, ast.BitAnd, ast.BitOr,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn
+)
+
+
+class _Vectorize(ast.NodeTransformer):
+    """Reescreve uma regra em operações vetorizadas: ``and``, ``or`` e ``not`` viram
+    ``&``, ``|`` e ``~``, comparações encadeadas viram comparações combinadas com
+    ``&``, ``in`` vira ``np.isin`` e as funções viram as do numpy."""
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        operator = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = ast.BinOp(left=result, op=operator, right=value)
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+
+        comparisons = []
+        left = node.left
+        for operator, right in zip(node.ops, node.comparators):
+            if isinstance(operator, (ast.In, ast.NotIn)):
+                comparison = ast.Call(func=ast.Name(id='_isin', ctx=ast.Load()), args=[left, right], keywords=[])
+                if isinstance(operator, ast.NotIn):
+                    comparison = ast.UnaryOp(op=ast.Invert(), operand=comparison)
+            else:
+                comparison = ast.Compare(left=left, ops=[operator], comparators=[right])
+            comparisons.append(comparison)
+            left = right
+
+        result = comparisons[0]
+        for comparison in comparisons[1:]:
+            result = ast.BinOp(left=result, op=ast.BitAnd(), right=comparison)
+        return result
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        node.func = ast.Name(id='_' + node.func.id, ctx=ast.Load())
+        return node
+
+
+class ConsistencyRule:
+    """Regra de consistência entre colunas, compilada uma única vez a partir de uma
+    expressão. A expressão aceita nomes de colunas, números, ``+``, ``-``, ``*``, ``/``,
+    ``//``, ``%``, comparações (inclusive encadeadas, como ``1 <= A <= 3``), ``and``,
+    ``or``, ``not``, ``in`` e ``not in`` com uma lista de números e as funções ``abs``,
+    ``min`` e ``max``. Uma linha viola a regra quando a expressão é falsa; linhas com
+    algum valor ausente nas colunas da regra não a violam.
+
+    Parameters
+    ----------
+    name : str
+        Nome da regra, usado na contagem das violações
+    expression : str
+        Expressão da regra
+
+    Raises
+    ------
+    ValueError
+        A expressão é inválida ou usa elementos não aceitos
+
+    Examples
+    --------
+    >>> rule = ConsistencyRule('partos', 'A + B <= C and C in [0, 1, 2]')
+    >>> rule.columns
+    ['A', 'B', 'C']
+    >>> rule.mask(pd.DataFrame({'A': [1, 1, 2, None], 'B': [0, 1, 0, 5], 'C': [1, 1, 3, 0]}))
+    array([ True, False, False,  True])
+    """
+    def __init__(self, name: str, expression: str):
+        self.name = name
+        self.expression = expression
+
+        try:
+            tree = ast.parse(str(expression), mode='eval')
+        except SyntaxError:
+            raise ValueError(f"Erro: regra {name} inválida: {expression}")
+
+        # Listas só são aceitas depois de in, e somente com números
+        lists = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Compare):
+                for operator, right in zip(node.ops, node.comparators):
+                    if isinstance(operator, (ast.In, ast.NotIn)):
+                        if not isinstance(right, (ast.List, ast.Tuple)) or not all(isinstance(item, ast.Constant) for item in right.elts):
+                            raise ValueError(f"Erro: o operador in da regra {name} deve ser seguido de uma lista de números.")
+                        lists.add(id(right))
+
+        columns = []
+        for node in ast.walk(tree):
+            if not isinstance(node, rule_nodes):
+                raise ValueError(f"Erro: elemento {type(node).__name__} não aceito na regra {name}.")
+            if isinstance(node, ast.Constant) and type(node.value) not in (int, float, bool):
+                raise ValueError(f"Erro: constante {node.value!r} não aceita na regra {name}.")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in rule_functions or node.keywords:
+                    raise ValueError(f"Erro: função não aceita na regra {name}.")
+            elif isinstance(node, (ast.List, ast.Tuple)) and id(node) not in lists:
+                raise ValueError(f"Erro: lista fora do operador in na regra {name}.")
+            elif isinstance(node, ast.Name) and node.id not in columns:
+                columns.append(node.id)
+
+        # Os nomes das funções não são colunas
+        calls = {node.func.id for node in ast.walk(tree) if isinstance(node, ast.Call)}
+        self.columns = sorted(column for column in columns if column not in calls)
+
+        tree = ast.fix_missing_locations(_Vectorize().visit(tree))
+        self.code = compile(tree, f'<regra {name}>', 'eval')
+
+    def __reduce__(self):
+        # O código compilado não pode ser serializado, então a regra é compilada
+        # novamente em cada processo
+        return (ConsistencyRule, (self.name, self.expression))
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Retorna a máscara das linhas que satisfazem a regra.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame a ser verificado
+
+        Returns
+        -------
+        np.ndarray
+            Máscara booleana das linhas que não violam a regra
+
+        Raises
+        ------
+        KeyError
+            Alguma coluna da regra não existe no DataFrame
+        ValueError
+            O resultado da expressão não é booleano
+        """
+        values = {}
+        for column in self.columns:
+            try:
+                values[column] = df[column].to_numpy()
+            except KeyError:
+                raise KeyError(f"Erro: Coluna {column} não encontrada.")
+
+        namespace = {'__builtins__': {}, '_isin': np.isin}
+        namespace.update({'_' + name: function for name, function in rule_functions.items()})
+
+        with np.errstate(all='ignore'):
+            result = eval(self.code, namespace, values)
+
+        result = np.asarray(result)
+        if result.dtype != bool:
+            raise ValueError(f"Erro: a regra {self.name} não gera um resultado verdadeiro ou falso.")
+        result = np.broadcast_to(result, (len(df),)).copy()
+
+        # Linhas com valores ausentes não são verificadas
+        for column in values.values():
+            if column.dtype.kind == 'f':
+                result |= np.isnan(column)
+
+        return result
+
+
+class FilterPlan:
+    """Plano de filtros compilado a partir das restrições de valores e das regras de
+    consistência. Para cada coluna cujos valores aceitos são inteiros entre 0 e
+    ``max_table_size``, é criada uma tabela de consulta booleana indexada pelo próprio
+    código; as demais colunas usam ``isin``. Cada regra é compilada em uma
+    ``ConsistencyRule``.
+
+    Parameters
+    ----------
+    restrictions : dict[str, list]
+        Dicionário em que cada chave é uma coluna e o valor é uma lista com os valores
+        aceitos para aquela coluna
+    rules : dict[str, str], optional
+        Dicionário em que cada chave é o nome de uma regra de consistência e o valor é
+        a sua expressão
+
+    Examples
+    --------
+    >>> plan = FilterPlan({'A': [1, 2], 'B': [0]})
+    >>> df = pd.DataFrame({'A': [1, 2, 3, 1], 'B': [0, 1, 0, 0]})
+    >>> plan.apply(df)
+       A  B
+    0  1  0
+    3  1  0
+    >>> plan.rejections(df)
+    {'A': 1, 'B': 1}
+    >>> FilterPlan({}, {'soma': 'A + B <= 2'}).violations(df)
+    {'soma': 2}
+    """
+    def __init__(self, restrictions: dict[str, list], rules: dict[str, str] = None):
+        self.restrictions = dict(restrictions)
+        self.tables = {}
+        self.rules = [ConsistencyRule(name, expression) for name, expression in (rules or {}).items()]
+
+        for column, subset in self.restrictions.items():
+            values = np.asarray(subset)
+            if values.size == 0 or values.dtype.kind not in 'iuf':
+                continue
+            if np.any(values != np.trunc(values)) or values.min() < 0 or values.max() >= max_table_size:
+                continue
+
+            table = np.zeros(int(values.max()) + 1, dtype=bool)
+            table[values.astype(np.intp)] = True
+            self.tables[column] = table
+
+    def column_mask(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """Retorna a máscara das linhas cujo valor na coluna satisfaz a restrição.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame a ser verificado
+        column : str
+            Coluna com restrição
+
+        Returns
+        -------
+        np.ndarray
+            Máscara booleana das linhas válidas
+
+        Raises
+        ------
+        KeyError
+            A coluna não existe no DataFrame
+        """
+        try:
+            series = df[column]
+        except KeyError:
+            raise KeyError(f"Erro: Coluna {column} não encontrada.")
+
+        table = self.tables.get(column)
+        if table is None or series.dtype.kind not in 'iuf':
+            return series.isin(self.restrictions[column]).to_numpy()
+
+        values = series.to_numpy()
+        # Valores fora da tabela, ausentes ou não inteiros não são aceitos
+        with np.errstate(invalid='ignore'):
+            in_table = (values >= 0) & (values < len(table))
+            if values.dtype.kind == 'f':
+                in_table &= values == np.trunc(values)
+
+        codes = np.where(in_table, values, 0).astype(np.intp)
+        return in_table & table[codes]
+
+    @classmethod
+    def from_config(cls, config_data: dict) -> 'FilterPlan':
+        """Compila o plano de filtros a partir das opções ``restrictions`` e
+        ``consistency_rules`` da configuração da limpeza.
+
+        Parameters
+        ----------
+        config_data : dict
+            Configurações da limpeza
+
+        Returns
+        -------
+        FilterPlan
+            Plano de filtros compilado
+        """
+        # Arquivos de configuração antigos não possuem regras de consistência
+        return cls(config_data['restrictions'], config_data.get('consistency_rules') or {})
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Retorna a máscara combinada das linhas que satisfazem todas as restrições
+        e regras.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame a ser verificado
+
+        Returns
+        -------
+        np.ndarray
+            Máscara booleana das linhas válidas
+        """
+        mask = np.ones(len(df), dtype=bool)
+        for column in self.restrictions:
+            mask &= self.column_mask(df, column)
+        for rule in self.rules:
+            mask &= rule.mask(df)
+
+        return mask
+
+    def rejections(self, df: pd.DataFrame) -> dict[str, int]:
+        """Conta as linhas rejeitadas por cada restrição. Uma linha que não satisfaz
+        várias restrições é contada em cada uma delas.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame a ser verificado
+
+        Returns
+        -------
+        dict[str, int]
+            Quantidade de linhas rejeitadas por coluna
+        """
+        return {column: int(len(df) - self.column_mask(df, column).sum()) for column in self.restrictions}
+
+    def violations(self, df: pd.DataFrame) -> dict[str, int]:
+        """Conta as linhas que violam cada regra de consistência. Uma linha que viola
+        várias regras é contada em cada uma delas.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame a ser verificado
+
+        Returns
+        -------
+        dict[str, int]
+            Quantidade de linhas que violam cada regra, pelo nome da regra
+        """
+        return {rule.name: int(len(df) - rule.mask(df).sum()) for rule in self.rules}
+
+    def apply(self, df: pd.DataFrame, counts: dict[str, int] = None, violations: dict[str, int] = None) -> pd.DataFrame:
+        """Filtra o DataFrame, mantendo somente as linhas que satisfazem todas as
+        restrições e regras. A máscara de cada coluna e de cada regra é calculada uma
+        única vez.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame a ser filtrado
+        counts : dict[str, int], optional
+            Dicionário em que são somadas as linhas rejeitadas por cada restrição
+        violations : dict[str, int], optional
+            Dicionário em que são somadas as linhas que violam cada regra
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame somente com as linhas válidas
+        """
+        mask = np.ones(len(df), dtype=bool)
+        for column in self.restrictions:
+            column_mask = self.column_mask(df, column)
+            mask &= column_mask
+
+            if counts is not None:
+                counts[column] = counts.get(column, 0) + int(len(df) - column_mask.sum())
+
+        for rule in self.rules:
+            rule_mask = rule.mask(df)
+            mask &= rule_mask
+
+            if violations is not None:
+                violations[rule.name] = violations.get(rule.name, 0) + int(len(df) - rule_mask.sum())
+
+        return df[mask]
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
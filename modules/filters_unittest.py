@@ -0,0 +1,94 @@
+import unittest
+import pandas as pd
+import pandas.testing as pd_testing
+import numpy as np
+import pickle
+
+import filters
+
+
+class TestFilters(unittest.TestCase):
+    def assertDataFrameEqual(self, a, b, msg):
+        try:
+            pd_testing.assert_frame_equal(a, b)
+        except AssertionError as e:
+            raise self.failureException(msg) from e
+
+    def setUp(self):
+        self.addTypeEqualityFunc(pd.DataFrame, self.assertDataFrameEqual)
+
+    # Teste 1: o plano compilado deve gerar o mesmo resultado que filtrar com isin coluna a coluna
+    def test_apply_equals_isin(self):
+        restrictions = {'A': [1, 2, 9], 'B': [0, 1]}
+        df = pd.DataFrame({
+            'A': [1.0, 2.5, 9.0, np.nan, -1.0, 2000.0, 2.0],
+            'B': [0, 1, 1, 0, 0, 1, 5]
+        })
+
+        expected = df[df['A'].isin(restrictions['A']) & df['B'].isin(restrictions['B'])]
+
+        self.assertEqual(filters.FilterPlan(restrictions).apply(df), expected)
+
+    # Teste 2: cada restrição deve contar as linhas que rejeita, mesmo que outras também as rejeitem
+    def test_rejection_counts(self):
+        plan = filters.FilterPlan({'A': [1], 'B': [1]})
+        df = pd.DataFrame({'A': [1, 2, 2], 'B': [1, 1, 2]})
+        counts = {}
+
+        result = plan.apply(df, counts)
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(counts, {'A': 2, 'B': 1})
+        self.assertEqual(plan.rejections(df), counts)
+
+    # Teste 3: restrições com valores não inteiros devem usar isin
+    def test_non_integer_restrictions(self):
+        plan = filters.FilterPlan({'A': ['x'], 'B': [0.5]})
+        df = pd.DataFrame({'A': ['x', 'y'], 'B': [0.5, 0.5]})
+
+        self.assertEqual(plan.tables, {})
+        self.assertEqual(plan.apply(df), df.iloc[[0]])
+
+    # Teste 4: coluna com restrição ausente no DataFrame deve levantar erro
+    def test_column_not_exists(self):
+        with self.assertRaises(KeyError):
+            filters.FilterPlan({'C': [1]}).apply(pd.DataFrame({'A': [1]}))
+
+    # Teste 5: regras de consistência devem filtrar e contar as violações, ignorando valores ausentes
+    def test_consistency_rules(self):
+        rules = {
+            'partos': 'A + B <= C',
+            'faixa': 'C == 9 or (D == 1 and C == 0) or (D == 2 and 1 <= C <= 3)'
+        }
+        plan = filters.FilterPlan({'D': [1, 2]}, rules)
+        df = pd.DataFrame({
+            'A': [1.0, 2.0, np.nan, 1.0, 1.0],
+            'B': [0, 2, 5, 0, 0],
+            'C': [1, 3, 0, 0, 9],
+            'D': [2, 2, 1, 3, 2]
+        })
+        counts = {}
+        violations = {}
+
+        result = plan.apply(df, counts, violations)
+
+        self.assertEqual(result, df.iloc[[0, 2, 4]])
+        self.assertEqual(counts, {'D': 1})
+        self.assertEqual(violations, {'partos': 2, 'faixa': 1})
+        self.assertEqual(plan.violations(df), violations)
+
+        # O plano deve ser enviado para outros processos com as regras compiladas novamente
+        self.assertEqual(pickle.loads(pickle.dumps(plan)).violations(df), violations)
+
+    # Teste 6: regras com elementos não aceitos devem levantar erro
+    def test_invalid_rules(self):
+        for expression in ['A +', '__import__("os").system("ls")', 'A.real > 0', 'A in B', 'A == "x"', 'A ** 2 > 1']:
+            with self.assertRaises(ValueError):
+                filters.ConsistencyRule('regra', expression)
+
+        with self.assertRaises(KeyError):
+            filters.ConsistencyRule('regra', 'A < E').mask(pd.DataFrame({'A': [1]}))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
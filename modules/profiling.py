@@ -0,0 +1,237 @@
+"""
+Módulo de Instrumentação da Limpeza
+
+Este módulo contém as estruturas usadas para medir cada etapa da limpeza dos dados: o tempo gasto, as linhas que entram e saem e o pico de memória. As medidas de cada bloco são combinadas, inclusive entre processos, e gravadas em um relatório JSON ao lado dos dados tratados a cada execução.
+
+Funcionalidades:
+- Mede o tempo, as linhas de entrada e de saída e o pico de memória de cada etapa.
+- Combina as medidas de vários blocos e processos.
+- Grava e lê o relatório de uma execução da limpeza.
+
+"""
+
+import doctest
+import json
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # O módulo resource não existe no Windows
+    resource = None
+
+
+def peak_memory() -> int:
+    """Retorna o pico de memória do processo, em bytes. Se ``tracemalloc`` estiver
+    ativo, é o pico de memória alocada desde a última chamada de ``reset_peak``; caso
+    contrário, é o pico de memória residente do processo desde o seu início.
+
+    Returns
+    -------
+    int
+        Pico de memória em bytes, ou None se não puder ser medido
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+
+    if resource is None:
+        return None
+
+    # No Linux, ru_maxrss é dado em kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class StageProfile:
+    """Medidas acumuladas de cada etapa da limpeza. Para cada etapa são registrados a
+    quantidade de chamadas, o tempo total, as linhas de entrada e de saída e o maior
+    pico de memória observado. Com ``trace_memory``, o pico de memória de cada etapa é
+    medido com ``tracemalloc``, o que torna a limpeza mais lenta; caso contrário, é o
+    pico de memória residente do processo ao fim da etapa.
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        Mede a memória alocada em cada etapa com ``tracemalloc``
+
+    Examples
+    --------
+    >>> profile = StageProfile()
+    >>> profile.run('filtro', lambda rows: rows[:2], [1, 2, 3])
+    [1, 2]
+    >>> profile.add('filtro', 0.5, 4, 4)
+    >>> stage = profile.stages['filtro']
+    >>> stage['calls'], stage['rows_in'], stage['rows_out']
+    (2, 7, 6)
+    """
+    def __init__(self, trace_memory: bool = False):
+        self.stages = {}
+        self.trace_memory = trace_memory
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add(self, name: str, seconds: float, rows_in: int, rows_out: int, memory: int = None):
+        """Registra uma execução de uma etapa.
+
+        Parameters
+        ----------
+        name : str
+            Nome da etapa
+        seconds : float
+            Tempo gasto, em segundos
+        rows_in : int
+            Quantidade de linhas de entrada
+        rows_out : int
+            Quantidade de linhas de saída
+        memory : int, optional
+            Pico de memória da etapa, em bytes
+        """
+        stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows_in': 0, 'rows_out': 0, 'peak_memory': None})
+
+        stage['calls'] += 1
+        stage['seconds'] += seconds
+        stage['rows_in'] += rows_in
+        stage['rows_out'] += rows_out
+        if memory is not None:
+            stage['peak_memory'] = max(stage['peak_memory'] or 0, memory)
+
+    def start(self) -> float:
+        """Inicia a medida de uma etapa, retornando o instante inicial para ``stop``."""
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        return time.perf_counter()
+
+    def stop(self, name: str, started: float, rows_in: int, rows_out: int):
+        """Encerra a medida de uma etapa iniciada por ``start`` e a registra.
+
+        Parameters
+        ----------
+        name : str
+            Nome da etapa
+        started : float
+            Instante retornado por ``start``
+        rows_in : int
+            Quantidade de linhas de entrada
+        rows_out : int
+            Quantidade de linhas de saída
+        """
+        self.add(name, time.perf_counter() - started, rows_in, rows_out, peak_memory())
+
+    def run(self, name: str, function, data, *args):
+        """Aplica ``function(data, *args)`` medindo a etapa, com as linhas de entrada e
+        de saída dadas pelo tamanho de ``data`` e do resultado.
+
+        Parameters
+        ----------
+        name : str
+            Nome da etapa
+        function : Callable
+            Função da etapa
+        data : pd.DataFrame
+            Dados de entrada da etapa
+        *args
+            Argumentos adicionais passados para ``function``
+
+        Returns
+        -------
+        Any
+            Resultado de ``function``
+        """
+        started = self.start()
+        result = function(data, *args)
+        self.stop(name, started, len(data), len(result))
+
+        return result
+
+    def merge(self, stages: dict):
+        """Combina as medidas de outro ``StageProfile``, por exemplo as de um bloco
+        tratado em outro processo.
+
+        Parameters
+        ----------
+        stages : dict
+            Atributo ``stages`` do outro ``StageProfile``
+        """
+        for name, other in stages.items():
+            stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows_in': 0, 'rows_out': 0, 'peak_memory': None})
+
+            for key in ('calls', 'seconds', 'rows_in', 'rows_out'):
+                stage[key] += other[key]
+            if other['peak_memory'] is not None:
+                stage['peak_memory'] = max(stage['peak_memory'] or 0, other['peak_memory'])
+
+    def report(self) -> dict:
+        """Retorna as medidas de cada etapa, com a vazão em linhas por segundo.
+
+        Returns
+        -------
+        dict
+            Medidas de cada etapa, na ordem em que foram registradas pela primeira vez
+        """
+        report = {}
+        for name, stage in self.stages.items():
+            report[name] = dict(stage)
+            report[name]['rows_per_second'] = stage['rows_in'] / stage['seconds'] if stage['seconds'] > 0 else None
+
+        return report
+
+
+def report_path(path_output: str) -> str:
+    """Retorna o endereço do relatório de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    str
+        Endereço do relatório
+
+    Examples
+    --------
+    >>> report_path('data/dados.csv')
+    'data/dados.csv.report.json'
+    """
+    return path_output.rstrip('/\\') + '.report.json'
+
+
+def save_report(path_output: str, report: dict):
+    """Grava o relatório de uma execução da limpeza, substituindo o anterior.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+    report : dict
+        Relatório da execução
+    """
+    with open(report_path(path_output), 'w') as file:
+        json.dump(report, file, indent=1)
+
+
+def load_report(path_output: str) -> dict:
+    """Lê o relatório da última execução da limpeza.
+
+    Parameters
+    ----------
+    path_output : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    dict
+        Relatório da execução, ou None se não existir
+    """
+    try:
+        with open(report_path(path_output), 'r') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
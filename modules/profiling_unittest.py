@@ -0,0 +1,59 @@
+import unittest
+import pandas as pd
+import os
+
+import profiling
+import cleaning
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        if os.path.exists(profiling.report_path('output.csv')):
+            os.remove(profiling.report_path('output.csv'))
+
+    # Teste 1: medidas de outro processo devem ser somadas, mantendo o maior pico de memória
+    def test_merge(self):
+        profile = profiling.StageProfile()
+        profile.add('parse', 1.0, 10, 10, 100)
+
+        other = profiling.StageProfile()
+        other.add('parse', 2.0, 5, 4, 300)
+        other.add('write', 0.5, 4, 4)
+        profile.merge(other.stages)
+
+        self.assertEqual(profile.stages['parse'], {'calls': 2, 'seconds': 3.0, 'rows_in': 15, 'rows_out': 14, 'peak_memory': 300})
+        self.assertEqual(profile.report()['write']['rows_per_second'], 8.0)
+
+    # Teste 2: função clean_chunk deve registrar as linhas de entrada e de saída de cada etapa
+    def test_clean_chunk_stages(self):
+        config_data = {
+            'df_index': 'CONTADOR',
+            'columns_to_remove': [],
+            'columns_to_dropna': ['A'],
+            'columns_to_fill_mean': [],
+            'columns_to_fill_values': {},
+            'restrictions': {'A': [1, 2]},
+            'columns_to_filter_by_z_score': [],
+            'z_score_limit': 4
+        }
+        chunk = pd.DataFrame({'CONTADOR': range(5), 'A': [1, 2, 3, None, 1], 'B': range(5)})
+
+        stages = cleaning.clean_chunk(chunk, config_data).attrs['stages']
+
+        self.assertEqual((stages['dedup']['rows_in'], stages['dedup']['rows_out']), (5, 5))
+        self.assertEqual((stages['dropna']['rows_in'], stages['dropna']['rows_out']), (5, 4))
+        self.assertEqual((stages['filter_rows']['rows_in'], stages['filter_rows']['rows_out']), (4, 3))
+        self.assertEqual(stages['filter_by_z_score']['rows_out'], 3)
+
+    # Teste 3: relatório gravado deve ser lido igual e relatório inexistente deve ser None
+    def test_save_and_load_report(self):
+        self.assertIsNone(profiling.load_report('output.csv'))
+
+        report = {'rows_read': 10, 'stages': {'parse': {'calls': 1}}}
+        profiling.save_report('output.csv', report)
+
+        self.assertEqual(profiling.load_report('output.csv'), report)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
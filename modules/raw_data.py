@@ -0,0 +1,565 @@
+"""
+Módulo de Leitura dos Dados Brutos
+
+Este módulo contém funções para ler o arquivo de dados brutos do SINASC em blocos de linhas. Cada bloco é lido como bytes, junto com sua posição no arquivo, e depois convertido em DataFrame, o que permite retomar a leitura a partir de um bloco e converter os blocos em outros processos. O arquivo pode estar compactado (gzip, bzip2, xz ou zip), e é descompactado durante a leitura, sem ser gravado no disco. Arquivos DBF e DBC do DATASUS são lidos em blocos de registros pelo módulo ``dbf``, com as mesmas funções.
+
+Funcionalidades:
+- Abre o arquivo de dados brutos, descompactando-o durante a leitura, inclusive um arquivo dentro de um zip.
+- Lê o cabeçalho do arquivo de dados brutos.
+- Divide o arquivo de dados brutos em blocos de linhas, com a posição de cada bloco.
+- Calcula o hash de cada linha de um bloco, usado para identificar linhas repetidas sem ler as colunas removidas.
+- Converte um bloco em DataFrame com o leitor configurado (pandas ou pyarrow), lendo somente as colunas mantidas na limpeza e declarando seus tipos.
+- Divide um bloco em linhas ou registros e calcula o hash de cada um, para CSV e DBF.
+- Lê o arquivo de dados brutos em blocos já convertidos em DataFrame.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+import zipfile
+import gzip
+import lzma
+import bz2
+import io
+import os
+from itertools import islice
+
+import dbf
+
+
+# Leitores suportados
+engines = ('c', 'python', 'pyarrow')
+
+# Coluna com o hash de cada linha do arquivo, sem o campo do índice
+row_hash_column = 'ROW_HASH'
+
+# Funções que abrem os arquivos compactados de cada extensão
+decompressors = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open
+}
+
+
+def split_archive_path(path_input: str) -> tuple[str, str]:
+    """Separa o endereço de um arquivo dentro de um zip, como
+    'data/DNOPEN21.zip/DNOPEN21.csv', no endereço do zip e no nome do arquivo.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+
+    Returns
+    -------
+    tuple[str, str]
+        Endereço do arquivo no disco e nome do arquivo dentro do zip, ou None se o
+        endereço não indicar um arquivo dentro de um zip
+
+    Examples
+    --------
+    >>> split_archive_path('data/DNOPEN21.zip/DNOPEN21.csv')
+    ('data/DNOPEN21.zip', 'DNOPEN21.csv')
+    >>> split_archive_path('data/SINASC_2021.csv.gz')
+    ('data/SINASC_2021.csv.gz', None)
+    """
+    normalized = path_input.replace('\\', '/')
+    position = normalized.lower().find('.zip/')
+    if position == -1:
+        return path_input, None
+
+    return path_input[:position + 4], normalized[position + 5:]
+
+
+def _zip_member(archive: zipfile.ZipFile, path_archive: str, member: str) -> str:
+    """Escolhe o arquivo lido de um zip: o informado ou, se não for informado, o único
+    arquivo CSV do zip."""
+    names = [name for name in archive.namelist() if not name.endswith('/')]
+
+    if member is not None:
+        if member not in names:
+            raise FileNotFoundError(f"Erro: Arquivo {member} não encontrado em {path_archive}.")
+        return member
+
+    csv_names = [name for name in names if name.lower().endswith('.csv')]
+    if len(csv_names) != 1:
+        raise ValueError(f"Erro: o arquivo {path_archive} deve conter um único CSV; informe o arquivo com {path_archive}/<arquivo>. Arquivos: {names}.")
+
+    return csv_names[0]
+
+
+def open_raw(path_input: str):
+    """Abre o arquivo de dados brutos para leitura em bytes. Arquivos compactados são
+    descompactados durante a leitura, de acordo com a extensão: '.gz', '.bz2', '.xz',
+    '.lzma' ou '.zip'. De um zip, é lido o arquivo indicado no endereço (como
+    'dados.zip/DNOPEN21.csv') ou o único arquivo CSV. As posições (``tell`` e ``seek``)
+    são sempre as do conteúdo descompactado.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+
+    Returns
+    -------
+    io.BufferedIOBase
+        Arquivo aberto
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada, ou o arquivo dentro do zip, não existe
+    ValueError
+        O zip não contém exatamente um arquivo CSV e nenhum foi indicado
+
+    Examples
+    --------
+    >>> with gzip.open('exemplo.csv.gz', 'wb') as file:
+    ...     _ = file.write(b'A;B\\n1;2\\n')
+    >>> with open_raw('exemplo.csv.gz') as file:
+    ...     file.read()
+    b'A;B\\n1;2\\n'
+    >>> os.remove('exemplo.csv.gz')
+    """
+    path_file, member = split_archive_path(path_input)
+    if not os.path.isfile(path_file):
+        raise FileNotFoundError(f"Erro: Arquivo {path_input} não encontrado.")
+
+    extension = os.path.splitext(path_file)[1].lower()
+    if extension == '.zip':
+        # O arquivo aberto continua válido depois que o zip é fechado
+        with zipfile.ZipFile(path_file) as archive:
+            return archive.open(_zip_member(archive, path_file, member))
+
+    if extension in decompressors:
+        return decompressors[extension](path_file, 'rb')
+
+    return open(path_file, 'rb')
+
+
+def read_raw_header(path_input: str) -> bytes:
+    """Lê a primeira linha (cabeçalho) do arquivo de dados brutos, que pode estar
+    compactado (ver ``open_raw``).
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+
+    Returns
+    -------
+    bytes
+        Cabeçalho do arquivo, incluindo a quebra de linha
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada não existe
+    """
+    with open_raw(path_input) as file:
+        return file.readline()
+
+
+def read_raw_blocks(path_input: str, chunksize: int = 100000, offset: int = None):
+    """Divide o arquivo de dados brutos em blocos de ``chunksize`` linhas, sem o
+    cabeçalho. O tamanho pode ser uma função chamada antes de cada bloco, como um
+    ``chunking.ChunkSizer``. Supõe que nenhum campo contém quebras de linha. Um arquivo compactado
+    é descompactado durante a leitura (ver ``open_raw``), e as posições são as do
+    conteúdo descompactado; retomar a partir de uma posição exige descompactar o
+    arquivo até ela. Arquivos DBF e DBC são divididos em blocos de registros por
+    ``dbf.read_blocks``.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    chunksize : int | Callable[[], int], optional
+        Quantidade de linhas de cada bloco, ou função que retorna a quantidade de
+        linhas do próximo bloco
+    offset : int, optional
+        Posição, em bytes, a partir da qual a leitura começa. Deve ser o início de
+        uma linha. Se não for informado, a leitura começa logo após o cabeçalho
+
+    Returns
+    -------
+    Iterator[tuple[int, int, bytes]]
+        Iterador sobre a posição inicial, a quantidade de linhas e o conteúdo de cada bloco
+
+    Examples
+    --------
+    >>> with open('exemplo.csv', 'w') as file:
+    ...     _ = file.write('A;B\\n1;2\\n3;4\\n5;6\\n')
+    >>> list(read_raw_blocks('exemplo.csv', chunksize=2))
+    [(4, 2, b'1;2\\n3;4\\n'), (12, 1, b'5;6\\n')]
+    >>> list(read_raw_blocks('exemplo.csv', chunksize=2, offset=12))
+    [(12, 1, b'5;6\\n')]
+    >>> os.remove('exemplo.csv')
+    """
+    if dbf.is_dbf(path_input):
+        yield from dbf.read_blocks(path_input, chunksize, offset)
+        return
+
+    file = open_raw(path_input)
+
+    with file:
+        if offset is None:
+            file.readline()
+        else:
+            file.seek(offset)
+
+        position = file.tell()
+        while True:
+            lines = list(islice(file, chunksize() if callable(chunksize) else chunksize))
+            if not lines:
+                break
+
+            block = b''.join(lines)
+            yield position, len(lines), block
+            position += len(block)
+
+
+def reader_options(path_input: str, df_index: str, columns_to_remove: list[str], engine: str = 'c',
+                   encoding: str = 'latin-1') -> dict:
+    """Monta as opções usadas por ``parse_raw_block`` para converter os blocos de um
+    arquivo. Somente o índice e as colunas que serão mantidas na limpeza são lidos, e
+    essas colunas são declaradas como ``np.float64``, evitando que o tipo de cada coluna
+    seja inferido a cada bloco. Para arquivos DBF e DBC, as opções são geradas por
+    ``dbf.reader_options``.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    df_index : str
+        Coluna usada como índice do DataFrame
+    columns_to_remove : list[str]
+        Colunas que serão removidas na limpeza e que, portanto, não são lidas
+    engine : str, optional
+        Leitor utilizado: 'c' ou 'python' (leitores do pandas) ou 'pyarrow'
+    encoding : str, optional
+        Codificação do arquivo de entrada
+
+    Returns
+    -------
+    dict
+        Opções de leitura: cabeçalho, colunas do arquivo, colunas lidas, posição do
+        índice, tipos, leitor, codificação e se o hash das linhas é calculado
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada não existe
+    KeyError
+        A coluna do índice não existe no arquivo
+    ValueError
+        O leitor informado não é suportado
+    """
+    if engine not in engines:
+        raise ValueError(f"Erro: leitor {engine} não suportado.")
+
+    if dbf.is_dbf(path_input):
+        return dbf.reader_options(path_input, df_index, columns_to_remove, encoding)
+
+    header = read_raw_header(path_input)
+    columns = pd.read_csv(io.BytesIO(header), sep=";", encoding=encoding, nrows=0).columns.tolist()
+
+    # Todas as colunas mantidas são numéricas e podem ter valores ausentes
+    dtypes = {column: np.float64 for column in columns if column != df_index and column not in columns_to_remove}
+
+    if df_index not in columns:
+        raise KeyError(f"Erro: coluna {df_index} não encontrada.")
+
+    return {
+        'header': header,
+        'columns': columns,
+        'usecols': [column for column in columns if column == df_index or column in dtypes],
+        'index_position': columns.index(df_index),
+        'df_index': df_index,
+        'dtypes': dtypes,
+        'engine': engine,
+        'encoding': encoding,
+        'row_hashes': True
+    }
+
+
+def row_hashes(block: bytes, index_position: int, n_columns: int) -> np.ndarray:
+    """Calcula o hash de 64 bits de cada linha não vazia de um bloco, ignorando o
+    campo do índice. Duas linhas têm o mesmo hash quando todos os seus campos, exceto
+    o índice, são iguais, incluindo os campos que não são lidos.
+
+    Parameters
+    ----------
+    block : bytes
+        Linhas do bloco, sem o cabeçalho
+    index_position : int
+        Posição da coluna do índice no arquivo
+    n_columns : int
+        Quantidade de colunas do arquivo
+
+    Returns
+    -------
+    np.ndarray
+        Hash de cada linha, do tipo np.uint64
+
+    Examples
+    --------
+    >>> hashes = row_hashes(b'a;1;b\\na;2;b\\na;3;c\\n', 1, 3)
+    >>> bool(hashes[0] == hashes[1]), bool(hashes[0] == hashes[2])
+    (True, False)
+    """
+    return line_hashes(split_lines(block), index_position, n_columns)
+
+
+def split_lines(block: bytes) -> list[bytes]:
+    """Divide um bloco em linhas, sem as quebras de linha e sem as linhas vazias, que
+    são ignoradas pelos leitores.
+
+    Examples
+    --------
+    >>> split_lines(b'1;2\\n\\n3;4\\r\\n')
+    [b'1;2', b'3;4']
+    """
+    return [line for line in block.splitlines() if line]
+
+
+def line_hashes(lines: list[bytes], index_position: int, n_columns: int) -> np.ndarray:
+    """Calcula o hash de 64 bits de cada linha, ignorando o campo do índice, como em
+    ``row_hashes``.
+
+    Parameters
+    ----------
+    lines : list[bytes]
+        Linhas geradas por ``split_lines``
+    index_position : int
+        Posição da coluna do índice no arquivo
+    n_columns : int
+        Quantidade de colunas do arquivo
+
+    Returns
+    -------
+    np.ndarray
+        Hash de cada linha, do tipo np.uint64
+    """
+    # Remove o campo do índice de cada linha, dividindo somente a parte necessária
+    if index_position == 0:
+        keys = [line.partition(b';')[2] for line in lines]
+    elif index_position == n_columns - 1:
+        keys = [line.rpartition(b';')[0] for line in lines]
+    else:
+        keys = []
+        for line in lines:
+            fields = line.split(b';', index_position + 1)
+            del fields[index_position]
+            keys.append(b';'.join(fields))
+
+    return _hash_bytes(keys)
+
+
+def split_records(block: bytes, options: dict) -> list[bytes]:
+    """Divide um bloco nos seus registros: as linhas não vazias de um CSV (ver
+    ``split_lines``) ou os registros não removidos de um DBF.
+
+    Parameters
+    ----------
+    block : bytes
+        Bloco gerado por ``read_raw_blocks``
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    list[bytes]
+        Registros do bloco
+    """
+    if options.get('format') == 'dbf':
+        return dbf.split_records(block, options)
+
+    return split_lines(block)
+
+
+def record_hashes(records: list[bytes], options: dict) -> np.ndarray:
+    """Calcula o hash de 64 bits de cada registro gerado por ``split_records``,
+    ignorando o índice.
+
+    Parameters
+    ----------
+    records : list[bytes]
+        Registros gerados por ``split_records``
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    np.ndarray
+        Hash de cada registro, do tipo np.uint64
+    """
+    if options.get('format') == 'dbf':
+        return _hash_bytes(dbf.record_keys(dbf.record_array(b''.join(records), options), options))
+
+    return line_hashes(records, options['index_position'], len(options['columns']))
+
+
+def join_records(records: list[bytes], options: dict) -> bytes:
+    """Junta os registros gerados por ``split_records`` em um bloco.
+
+    Examples
+    --------
+    >>> join_records([b'1;2', b'3;4'], {})
+    b'1;2\\n3;4\\n'
+    """
+    if options.get('format') == 'dbf':
+        return b''.join(records)
+
+    return b''.join(record + b'\n' for record in records)
+
+
+def _hash_bytes(keys: list[bytes]) -> np.ndarray:
+    """Calcula um hash de 64 bits de cada sequência de bytes, de forma vetorizada: as
+    sequências são completadas com zeros até um múltiplo de 8 bytes, combinadas palavra
+    a palavra e misturadas ao final pela função do splitmix64."""
+    if len(keys) == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    array = np.array(keys, dtype=bytes)
+    width = -(-array.itemsize // 8) * 8
+    words = array.astype(f'S{width}').view('<u8').reshape(len(array), -1)
+
+    hashes = np.full(len(array), 0xcbf29ce484222325, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for word in words.T:
+            hashes = (hashes ^ word) * np.uint64(0x100000001b3)
+            hashes ^= hashes >> np.uint64(32)
+
+        hashes ^= hashes >> np.uint64(30)
+        hashes *= np.uint64(0xbf58476d1ce4e5b9)
+        hashes ^= hashes >> np.uint64(27)
+        hashes *= np.uint64(0x94d049bb133111eb)
+        hashes ^= hashes >> np.uint64(31)
+
+    return hashes
+
+
+def parse_raw_block(block: bytes, options: dict) -> pd.DataFrame:
+    """Converte um bloco de linhas do arquivo de dados brutos em DataFrame, com o
+    índice, as colunas mantidas na limpeza e a coluna ``row_hash_column``, com o hash
+    de cada linha calculado por ``row_hashes``. A coluna do hash não é criada se a
+    opção ``row_hashes`` for falsa, por exemplo quando as linhas repetidas já foram
+    removidas do bloco.
+
+    Parameters
+    ----------
+    block : bytes
+        Linhas do bloco, sem o cabeçalho
+    options : dict
+        Opções de leitura geradas por ``reader_options``
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame com os dados do bloco
+
+    Raises
+    ------
+    ValueError
+        A quantidade de linhas do bloco é diferente da quantidade de registros lidos
+    """
+    if options.get('format') == 'dbf':
+        df = dbf.parse_block(block, options)
+        if options.get('row_hashes', True):
+            df[row_hash_column] = _hash_bytes(dbf.record_keys(dbf.record_array(block, options), options))
+        return df
+
+    data = io.BytesIO(options['header'] + block)
+
+    if options['engine'] == 'pyarrow':
+        df = _parse_raw_block_arrow(data, options)
+    else:
+        df = pd.read_csv(data, sep=";", encoding=options['encoding'], engine=options['engine'],
+                         usecols=options['usecols'], dtype=options['dtypes'])
+
+    # Blocos já deduplicados não precisam do hash das linhas
+    if not options.get('row_hashes', True):
+        return df
+
+    hashes = row_hashes(block, options['index_position'], len(options['columns']))
+    if len(hashes) != len(df):
+        raise ValueError("Erro: quantidade de linhas do bloco diferente da quantidade de registros lidos.")
+
+    df[row_hash_column] = hashes
+    return df
+
+
+def _parse_raw_block_arrow(data: io.BytesIO, options: dict) -> pd.DataFrame:
+    """Converte um bloco em DataFrame com o leitor de CSV do pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        raise ImportError("Erro: o leitor 'pyarrow' requer o pacote pyarrow instalado.")
+
+    column_types = {column: pa.float64() for column in options['dtypes']}
+
+    # Somente as colunas lidas são convertidas
+    convert_options = pa_csv.ConvertOptions(column_types=column_types, include_columns=options['usecols'])
+
+    table = pa_csv.read_csv(
+        data,
+        read_options=pa_csv.ReadOptions(encoding=options['encoding']),
+        parse_options=pa_csv.ParseOptions(delimiter=";"),
+        convert_options=convert_options
+    )
+
+    return table.to_pandas()
+
+
+def read_raw_data(path_input: str, df_index: str, columns_to_remove: list[str], engine: str = 'c',
+                  encoding: str = 'latin-1', chunksize: int = 100000):
+    """Lê o arquivo de dados brutos em blocos de ``chunksize`` linhas, convertidos
+    em DataFrame com ``parse_raw_block``. As colunas em ``columns_to_remove`` não são lidas.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    df_index : str
+        Coluna usada como índice do DataFrame
+    columns_to_remove : list[str]
+        Colunas que serão removidas na limpeza e que, portanto, não são lidas
+    engine : str, optional
+        Leitor utilizado: 'c' ou 'python' (leitores do pandas) ou 'pyarrow'
+    encoding : str, optional
+        Codificação do arquivo de entrada
+    chunksize : int, optional
+        Quantidade de linhas de cada bloco
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        Iterador sobre os blocos do arquivo
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada não existe
+    ValueError
+        O leitor informado não é suportado
+
+    Examples
+    --------
+    >>> pd.DataFrame({'ID': [1, 2, 3], 'A': [1, None, 3], 'B': ['x', 'y', 'z']}).to_csv('exemplo.csv', sep=';', index=False)
+    >>> chunks = read_raw_data('exemplo.csv', 'ID', ['B'], chunksize=2)
+    >>> [len(chunk) for chunk in chunks]
+    [2, 1]
+    >>> next(read_raw_data('exemplo.csv', 'ID', ['B'])).dtypes.to_dict()
+    {'ID': dtype('int64'), 'A': dtype('float64'), 'ROW_HASH': dtype('uint64')}
+    >>> os.remove('exemplo.csv')
+    """
+    options = reader_options(path_input, df_index, columns_to_remove, engine, encoding)
+
+    return (parse_raw_block(block, options) for _, _, block in read_raw_blocks(path_input, chunksize))
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
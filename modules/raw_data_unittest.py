@@ -0,0 +1,117 @@
+import unittest
+import pandas as pd
+import pandas.testing as pd_testing
+import numpy as np
+import zipfile
+import gzip
+import os
+
+import raw_data
+
+
+class TestRawData(unittest.TestCase):
+    def assertDataFrameEqual(self, a, b, msg):
+        try:
+            pd_testing.assert_frame_equal(a, b)
+        except AssertionError as e:
+            raise self.failureException(msg) from e
+
+    def setUp(self):
+        self.addTypeEqualityFunc(pd.DataFrame, self.assertDataFrameEqual)
+
+    # Teste 1: função read_raw_data com leitores diferentes deve gerar os mesmos blocos
+    def test_read_raw_data_engines_equal(self):
+        # Cria o arquivo de entrada
+        path_input = 'input.csv'
+        data = {
+            'CONTADOR': [1, 2, 3],
+            'A': [1, np.NaN, 3],
+            'B': ['x', 'y', 'z']
+        }
+        pd.DataFrame(data).to_csv(path_input, sep=';', index=False)
+
+        result = pd.concat(raw_data.read_raw_data(path_input, 'CONTADOR', ['B'], engine='c', chunksize=2))
+        expected = pd.concat(raw_data.read_raw_data(path_input, 'CONTADOR', ['B'], engine='python', chunksize=2))
+
+        os.remove(path_input)
+
+        # Verifica se os dois leitores geram o mesmo DataFrame
+        self.assertEqual(result, expected)
+
+    # Teste 2: função read_raw_data com leitor inexistente deve levantar erro
+    def test_read_raw_data_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            raw_data.read_raw_data('input.csv', 'CONTADOR', [], engine='invalid')
+
+    # Teste 3: blocos lidos a partir de uma posição devem continuar a leitura completa
+    def test_read_raw_blocks_resume_from_offset(self):
+        path_input = 'input.csv'
+        with open(path_input, 'w') as file:
+            file.write('CONTADOR;A\n' + ''.join(f'{i};{i * 2}\n' for i in range(10)))
+
+        blocks = list(raw_data.read_raw_blocks(path_input, chunksize=3))
+        resumed = list(raw_data.read_raw_blocks(path_input, chunksize=3, offset=blocks[1][0]))
+
+        os.remove(path_input)
+
+        # Verifica a quantidade de linhas de cada bloco e a continuação da leitura
+        self.assertEqual([rows for _, rows, _ in blocks], [3, 3, 3, 1])
+        self.assertEqual(resumed, blocks[1:])
+
+    # Teste 4: função read_raw_header com arquivo inexistente deve levantar erro
+    def test_read_raw_header_file_not_exists(self):
+        with self.assertRaises(FileNotFoundError):
+            raw_data.read_raw_header('input.csv')
+
+    # Teste 5: colunas removidas não devem ser lidas, mas devem diferenciar linhas no hash
+    def test_read_raw_data_projection(self):
+        path_input = 'input.csv'
+        data = {
+            'A': [1, 1, 1],
+            'CONTADOR': [1, 2, 3],
+            'B': ['x', 'x', 'y']
+        }
+        pd.DataFrame(data).to_csv(path_input, sep=';', index=False)
+
+        chunk = next(raw_data.read_raw_data(path_input, 'CONTADOR', ['B']))
+
+        os.remove(path_input)
+
+        # Verifica as colunas lidas e se somente as duas primeiras linhas têm o mesmo hash
+        self.assertEqual(chunk.columns.tolist(), ['A', 'CONTADOR', raw_data.row_hash_column])
+        hashes = chunk[raw_data.row_hash_column]
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertNotEqual(hashes[0], hashes[2])
+
+    # Teste 6: arquivos compactados devem gerar os mesmos blocos que o arquivo descompactado
+    def test_read_raw_blocks_compressed(self):
+        content = b'CONTADOR;A\n1;2\n3;4\n5;6\n'
+        with gzip.open('input.csv.gz', 'wb') as file:
+            file.write(content)
+        with zipfile.ZipFile('input.zip', 'w') as archive:
+            archive.writestr('DNOPEN21.csv', content)
+            archive.writestr('LEIAME.txt', b'')
+        with zipfile.ZipFile('input2.zip', 'w') as archive:
+            archive.writestr('a.csv', content)
+            archive.writestr('b.csv', content)
+
+        try:
+            expected = [(11, 2, b'1;2\n3;4\n'), (19, 1, b'5;6\n')]
+            for path_input in ['input.csv.gz', 'input.zip', 'input2.zip/b.csv']:
+                self.assertEqual(list(raw_data.read_raw_blocks(path_input, chunksize=2)), expected)
+
+            # Leitura retomada a partir de uma posição do conteúdo descompactado
+            self.assertEqual(list(raw_data.read_raw_blocks('input.csv.gz', chunksize=2, offset=19)), expected[1:])
+
+            # Zip com mais de um CSV exige o nome do arquivo, que deve existir
+            with self.assertRaises(ValueError):
+                raw_data.read_raw_header('input2.zip')
+            with self.assertRaises(FileNotFoundError):
+                raw_data.read_raw_header('input2.zip/c.csv')
+        finally:
+            for path_input in ['input.csv.gz', 'input.zip', 'input2.zip']:
+                os.remove(path_input)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,243 @@
+"""
+Módulo do Índice de Linhas dos Dados Tratados
+
+Este módulo contém funções para gravar e ler o índice de linhas de um conjunto de dados tratados em CSV, com a posição, em bytes, do início de uma a cada ``index_rows`` linhas. Com o índice, o arquivo pode ser dividido em intervalos de bytes disjuntos, cada um com linhas completas, lidos diretamente a partir de uma linha qualquer ou por vários processos ao mesmo tempo. No CSV compactado, cada posição do índice é o início de um membro gzip, a partir do qual o arquivo pode ser descompactado.
+
+Funcionalidades:
+- Determina o endereço do índice de linhas de um conjunto de dados tratados.
+- Encontra, no texto de um bloco gravado, o início das linhas que entram no índice.
+- Grava e lê o índice, descartando um índice que não corresponde mais ao arquivo.
+- Converte um intervalo de linhas no intervalo de bytes que o contém.
+- Divide as linhas do arquivo em intervalos disjuntos alinhados ao índice.
+- Remove o índice de linhas.
+
+"""
+
+import numpy as np
+import doctest
+import json
+import os
+
+import column_store
+
+
+# Sufixo do arquivo com o índice de linhas de um conjunto de dados
+index_suffix = '.index.json'
+
+
+def index_path(path: str) -> str:
+    """Retorna o endereço do índice de linhas de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV com os dados tratados
+
+    Returns
+    -------
+    str
+        Endereço do índice
+
+    Examples
+    --------
+    >>> index_path('data/dados.csv')
+    'data/dados.csv.index.json'
+    """
+    return path + index_suffix
+
+
+def entry_positions(text: bytes, first_row: int, index_rows: int, header: bool = False) -> np.ndarray:
+    """Encontra, no texto de um bloco de linhas gravado no CSV, a posição do início de
+    cada linha cujo número no arquivo é múltiplo de ``index_rows``. Os valores do
+    conjunto de dados tratados não possuem quebras de linha, então cada linha termina
+    no próximo caractere de nova linha.
+
+    Parameters
+    ----------
+    text : bytes
+        Texto do bloco, com uma linha por registro
+    first_row : int
+        Número, no arquivo, da primeira linha de dados do bloco (o cabeçalho não conta)
+    index_rows : int
+        Quantidade de linhas entre duas posições do índice
+    header : bool, optional
+        Se o texto começa com a linha do cabeçalho
+
+    Returns
+    -------
+    np.ndarray
+        Posições, no texto, do início das linhas do índice
+
+    Examples
+    --------
+    >>> entry_positions(b'ID;A\\n1;2\\n3;4\\n5;6\\n', 0, 2, header=True)
+    array([ 5, 13])
+    >>> entry_positions(b'3;4\\n5;6\\n', 1, 2)
+    array([4])
+    """
+    ends = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == ord('\n')) + 1
+    starts = np.concatenate(([0], ends[:-1]))[:len(ends)]
+    if header:
+        starts = starts[1:]
+
+    # Primeira linha do bloco cujo número é múltiplo de ``index_rows``
+    first = -first_row % index_rows
+    return starts[first::index_rows]
+
+
+def save_index(path: str, index_rows: int, offsets: list[int], rows: int):
+    """Grava o índice de linhas de um conjunto de dados tratados, junto com a
+    assinatura do arquivo (ver ``column_store.source_signature``), que deve ser
+    gravada somente depois de o arquivo estar completo.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV com os dados tratados
+    index_rows : int
+        Quantidade de linhas entre duas posições do índice
+    offsets : list[int]
+        Posição, em bytes, do início das linhas 0, ``index_rows``, 2 * ``index_rows``...
+    rows : int
+        Quantidade de linhas de dados do arquivo
+
+    Raises
+    ------
+    ValueError
+        A quantidade de posições não corresponde à quantidade de linhas
+    """
+    if len(offsets) != -(-rows // index_rows):
+        raise ValueError(f"Erro: o índice de linhas de {path} possui {len(offsets)} posições para {rows} linhas.")
+
+    index = {
+        'index_rows': index_rows,
+        'rows': rows,
+        'size': os.path.getsize(path),
+        'offsets': [int(offset) for offset in offsets],
+        'signature': column_store.source_signature(path)
+    }
+    with open(index_path(path), 'w') as file:
+        json.dump(index, file)
+
+
+def load_index(path: str) -> dict:
+    """Lê o índice de linhas de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV com os dados tratados
+
+    Returns
+    -------
+    dict
+        Índice de linhas, ou None se o índice não existir ou se o arquivo foi
+        alterado depois da gravação do índice
+    """
+    if not os.path.isfile(path) or not os.path.exists(index_path(path)):
+        return None
+
+    with open(index_path(path), 'r') as file:
+        index = json.load(file)
+
+    if index['signature'] != column_store.source_signature(path):
+        return None
+
+    return index
+
+
+def byte_range(index: dict, start: int, stop: int) -> tuple[int, int, int]:
+    """Retorna o menor intervalo de bytes, começando e terminando em posições do
+    índice, que contém as linhas de ``start`` até ``stop`` (sem incluir ``stop``).
+
+    Parameters
+    ----------
+    index : dict
+        Índice de linhas (ver ``load_index``)
+    start : int
+        Primeira linha do intervalo
+    stop : int
+        Linha seguinte à última linha do intervalo
+
+    Returns
+    -------
+    tuple[int, int, int]
+        Número da primeira linha do intervalo de bytes, posição do início e posição
+        do fim do intervalo
+
+    Examples
+    --------
+    >>> index = {'index_rows': 10, 'rows': 25, 'size': 500, 'offsets': [20, 200, 380]}
+    >>> byte_range(index, 12, 18), byte_range(index, 5, 25)
+    ((10, 200, 380), (0, 20, 500))
+    """
+    index_rows = index['index_rows']
+    offsets = index['offsets']
+
+    first = start // index_rows
+    last = -(-stop // index_rows)
+    end = offsets[last] if last < len(offsets) else index['size']
+
+    return first * index_rows, offsets[first], end
+
+
+def split_rows(index: dict, rows: int, start: int = 0, stop: int = None) -> list[tuple[int, int]]:
+    """Divide as linhas de ``start`` até ``stop`` em intervalos disjuntos de cerca de
+    ``rows`` linhas, arredondados para múltiplos de ``index_rows``, de forma que os
+    intervalos de bytes de cada um (ver ``byte_range``) não se sobrepõem.
+
+    Parameters
+    ----------
+    index : dict
+        Índice de linhas (ver ``load_index``)
+    rows : int
+        Quantidade aproximada de linhas de cada intervalo
+    start : int, optional
+        Primeira linha dividida
+    stop : int, optional
+        Linha seguinte à última linha dividida. Se não for informado, todas as linhas
+        a partir de ``start`` são divididas
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        Primeira linha e linha seguinte à última de cada intervalo
+
+    Examples
+    --------
+    >>> index = {'index_rows': 10, 'rows': 45, 'size': 500, 'offsets': [20, 120, 220, 320, 420]}
+    >>> split_rows(index, 15)
+    [(0, 20), (20, 40), (40, 45)]
+    >>> split_rows(index, 10, start=5, stop=28)
+    [(5, 10), (10, 20), (20, 28)]
+    """
+    if stop is None or stop > index['rows']:
+        stop = index['rows']
+
+    index_rows = index['index_rows']
+    step = max(-(-rows // index_rows), 1) * index_rows
+
+    ranges = []
+    while start < stop:
+        # O fim de cada intervalo é um múltiplo de ``step``, alinhado ao índice
+        end = min((start // step + 1) * step, stop)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def remove_index(path: str):
+    """Remove o índice de linhas de um conjunto de dados tratados, se existir.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo CSV com os dados tratados
+    """
+    if os.path.exists(index_path(path)):
+        os.remove(index_path(path))
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
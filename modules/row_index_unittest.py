@@ -0,0 +1,47 @@
+import unittest
+import os
+
+import row_index
+
+
+class TestRowIndex(unittest.TestCase):
+    def tearDown(self):
+        for path in ['output.csv', row_index.index_path('output.csv')]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write_output(self, text):
+        with open('output.csv', 'wb') as file:
+            file.write(text)
+
+    # Teste 1: as posições devem ser o início das linhas múltiplas de index_rows, continuando a numeração de outros blocos
+    def test_entry_positions(self):
+        text = b'ID;A\n' + b''.join(f'{i};{i}\n'.encode() for i in range(10))
+        positions = row_index.entry_positions(text, 0, 4, header=True)
+
+        self.assertEqual([text[position:].split(b'\n')[0] for position in positions], [b'0;0', b'4;4', b'8;8'])
+
+        # Bloco que começa na linha 6: as linhas 8 e 12 entram no índice
+        text = b''.join(f'{i};{i}\n'.encode() for i in range(6, 13))
+        self.assertEqual(row_index.entry_positions(text, 6, 4).tolist(), [8, 28])
+        self.assertEqual(row_index.entry_positions(b'', 6, 4).tolist(), [])
+
+    # Teste 2: índice deve ser descartado quando o arquivo é alterado e recusado se estiver incompleto
+    def test_index_stale_and_incomplete(self):
+        self.write_output(b'A\n1\n2\n3\n')
+        row_index.save_index('output.csv', 2, [2, 6], 3)
+        self.assertEqual(row_index.load_index('output.csv')['offsets'], [2, 6])
+
+        with self.assertRaises(ValueError):
+            row_index.save_index('output.csv', 2, [2], 3)
+
+        with open('output.csv', 'ab') as file:
+            file.write(b'4\n')
+        self.assertIsNone(row_index.load_index('output.csv'))
+
+        row_index.remove_index('output.csv')
+        self.assertFalse(os.path.exists(row_index.index_path('output.csv')))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,283 @@
+"""
+Módulo de Amostragem dos Dados Brutos
+
+Este módulo contém funções para sortear uma amostra aleatória uniforme das linhas do arquivo de dados brutos, usada para estimar o efeito das configurações da limpeza sem tratar o arquivo inteiro. Em um arquivo CSV sem compactação, as linhas são sorteadas por posições aleatórias do arquivo, lendo somente as linhas sorteadas; nos demais arquivos, que não permitem posicionamento, a amostra é sorteada durante uma leitura do arquivo.
+
+Funcionalidades:
+- Verifica se o arquivo de dados brutos permite a leitura de linhas em posições aleatórias.
+- Lê a linha que contém uma posição do arquivo.
+- Sorteia uma amostra uniforme de linhas de um CSV por posições aleatórias, estimando a quantidade de linhas do arquivo.
+- Sorteia uma amostra uniforme dos registros de qualquer arquivo durante a sua leitura em blocos.
+- Calcula o intervalo de confiança de uma proporção estimada na amostra e de uma contagem rara, como a de pares de linhas repetidas.
+
+"""
+
+import numpy as np
+import doctest
+import os
+
+import raw_data
+import dbf
+
+
+# Quantil da distribuição normal dos intervalos de confiança de 95%
+confidence_z = 1.959964
+
+# Tamanho inicial, em bytes, da janela lida em torno de uma posição sorteada
+line_window = 4096
+
+# Quantidade máxima de sorteios de posições para cada linha da amostra
+max_draws_per_row = 100
+
+
+def is_seekable(path_input: str) -> bool:
+    """Verifica se o arquivo de dados brutos é um CSV sem compactação, cujas linhas
+    podem ser lidas a partir de qualquer posição.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+
+    Returns
+    -------
+    bool
+        True se o arquivo permite a leitura em posições aleatórias
+
+    Examples
+    --------
+    >>> is_seekable('data/SINASC_2021.csv'), is_seekable('data/SINASC_2021.csv.gz')
+    (True, False)
+    >>> is_seekable('data/DNOPEN21.zip/DNOPEN21.csv'), is_seekable('data/DNSP2021.dbf')
+    (False, False)
+    """
+    path_file, member = raw_data.split_archive_path(path_input)
+    extension = os.path.splitext(path_file)[1].lower()
+
+    return member is None and extension != '.zip' and extension not in raw_data.decompressors and not dbf.is_dbf(path_input)
+
+
+def line_at(file, position: int, data_start: int, size: int) -> tuple[int, bytes]:
+    """Lê a linha que contém a posição ``position`` de um arquivo aberto em bytes. A
+    quebra de linha pertence à linha que ela termina.
+
+    Parameters
+    ----------
+    file : io.BufferedIOBase
+        Arquivo aberto em bytes
+    position : int
+        Posição, em bytes, no arquivo
+    data_start : int
+        Posição do início da primeira linha de dados (após o cabeçalho)
+    size : int
+        Tamanho do arquivo
+
+    Returns
+    -------
+    tuple[int, bytes]
+        Posição do início da linha e a linha, sem a quebra de linha
+
+    Examples
+    --------
+    >>> import io
+    >>> file = io.BytesIO(b'A;B\\n1;2\\n33;44\\n')
+    >>> line_at(file, 9, 4, 15), line_at(file, 7, 4, 15)
+    ((8, b'33;44'), (4, b'1;2'))
+    """
+    window = line_window
+    while True:
+        begin = max(position - window, data_start)
+        file.seek(begin)
+        buffer = file.read(position - begin + window)
+        relative = position - begin
+
+        # A janela é ampliada até conter o início e o fim da linha
+        line_start = buffer.rfind(b'\n', 0, relative) + 1
+        if line_start == 0 and begin > data_start:
+            window *= 2
+            continue
+        line_end = buffer.find(b'\n', relative)
+        if line_end == -1 and begin + len(buffer) < size:
+            window *= 2
+            continue
+
+        line = buffer[line_start:] if line_end == -1 else buffer[line_start:line_end]
+        return begin + line_start, line.rstrip(b'\r')
+
+
+def sample_lines(path_input: str, rows: int, min_length: int, seed: int = None) -> tuple[list[bytes], float]:
+    """Sorteia, sem reposição, uma amostra uniforme de até ``rows`` linhas de dados de
+    um CSV sem compactação. Cada posição sorteada escolhe a linha que a contém, com
+    probabilidade proporcional ao tamanho da linha, e a linha é aceita com
+    probabilidade ``min_length`` dividido pelo seu tamanho, o que torna todas as linhas
+    igualmente prováveis. ``min_length`` não deve ser maior do que a menor linha do
+    arquivo, como a quantidade de colunas (os separadores e a quebra de linha). A
+    quantidade de linhas do arquivo é estimada pelo tamanho médio das linhas sorteadas.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo CSV
+    rows : int
+        Quantidade de linhas da amostra
+    min_length : int
+        Tamanho mínimo, em bytes, de uma linha, incluindo a quebra de linha
+    seed : int, optional
+        Semente do sorteio
+
+    Returns
+    -------
+    tuple[list[bytes], float]
+        Linhas sorteadas, sem as quebras de linha, e a quantidade estimada de linhas
+        do arquivo (0 se nenhuma linha foi aceita)
+
+    Raises
+    ------
+    FileNotFoundError
+        O arquivo de entrada não existe
+    """
+    rng = np.random.default_rng(seed)
+    size = os.path.getsize(path_input)
+
+    with open(path_input, 'rb') as file:
+        data_start = len(file.readline())
+        if size <= data_start:
+            return [], 0.0
+
+        starts = set()
+        lines = []
+        lengths = []
+        for _ in range(rows * max_draws_per_row):
+            if len(lines) >= rows:
+                break
+
+            start, line = line_at(file, int(rng.integers(data_start, size)), data_start, size)
+            length = len(line) + 1
+            if rng.random() * length >= min_length:
+                continue
+
+            # O tamanho de cada linha aceita entra na estimativa, mesmo que repetida
+            lengths.append(length)
+            if start in starts or not line:
+                continue
+            starts.add(start)
+            lines.append(line)
+
+    # Sem linhas aceitas, a quantidade de linhas não pode ser estimada
+    if not lengths:
+        return [], 0.0
+
+    return lines, (size - data_start) / np.mean(lengths)
+
+
+def sample_records(path_input: str, options: dict, rows: int, seed: int = None, chunksize: int = 100000) -> tuple[list[bytes], int]:
+    """Sorteia, sem reposição, uma amostra uniforme de até ``rows`` registros de
+    qualquer arquivo de dados brutos, lido em blocos por ``raw_data.read_raw_blocks``:
+    cada registro recebe uma chave aleatória, e os registros com as menores chaves
+    formam a amostra. O arquivo é lido inteiro, mas somente a amostra é convertida.
+
+    Parameters
+    ----------
+    path_input : str
+        Endereço do arquivo com os dados brutos
+    options : dict
+        Opções de leitura geradas por ``raw_data.reader_options``
+    rows : int
+        Quantidade de registros da amostra
+    seed : int, optional
+        Semente do sorteio
+    chunksize : int, optional
+        Quantidade de linhas de cada bloco lido
+
+    Returns
+    -------
+    tuple[list[bytes], int]
+        Registros sorteados, na ordem do arquivo, e a quantidade de registros do arquivo
+    """
+    rng = np.random.default_rng(seed)
+
+    keys = np.zeros(0)
+    records = []
+    total = 0
+    for _, _, block in raw_data.read_raw_blocks(path_input, chunksize):
+        block_records = raw_data.split_records(block, options)
+        total += len(block_records)
+
+        # Mantém os registros com as menores chaves entre os já mantidos e os do bloco
+        keys = np.concatenate([keys, rng.random(len(block_records))])
+        records += block_records
+        if len(records) > rows:
+            kept = np.sort(np.argpartition(keys, rows)[:rows])
+            keys = keys[kept]
+            records = [records[i] for i in kept]
+
+    return records, total
+
+
+def wilson_interval(count: int, n: int, z: float = confidence_z) -> tuple[float, float]:
+    """Calcula o intervalo de confiança de Wilson da proporção ``count / n``, que se
+    mantém dentro de [0, 1] mesmo para proporções próximas de 0 ou de 1.
+
+    Parameters
+    ----------
+    count : int
+        Quantidade de ocorrências na amostra
+    n : int
+        Tamanho da amostra
+    z : float, optional
+        Quantil da distribuição normal do nível de confiança (95% por padrão)
+
+    Returns
+    -------
+    tuple[float, float]
+        Limites inferior e superior do intervalo
+
+    Examples
+    --------
+    >>> low, high = wilson_interval(50, 1000)
+    >>> round(low, 4), round(high, 4)
+    (0.0381, 0.0653)
+    >>> wilson_interval(0, 0)
+    (0.0, 1.0)
+    """
+    if n == 0:
+        return 0.0, 1.0
+
+    proportion = count / n
+    center = (proportion + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+    margin = z * np.sqrt(proportion * (1 - proportion) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+
+    return float(max(center - margin, 0.0)), float(min(center + margin, 1.0))
+
+
+def poisson_interval(count: int, z: float = confidence_z) -> tuple[float, float]:
+    """Calcula o intervalo de confiança (escore) da média de uma contagem de Poisson,
+    usado para eventos raros na amostra, como as linhas repetidas.
+
+    Parameters
+    ----------
+    count : int
+        Contagem observada
+    z : float, optional
+        Quantil da distribuição normal do nível de confiança (95% por padrão)
+
+    Returns
+    -------
+    tuple[float, float]
+        Limites inferior e superior do intervalo
+
+    Examples
+    --------
+    >>> [round(bound, 2) for bound in poisson_interval(25)]
+    [16.93, 36.91]
+    >>> [round(bound, 2) for bound in poisson_interval(0)]
+    [0.0, 3.84]
+    """
+    center = count + z ** 2 / 2
+    margin = z * np.sqrt(count + z ** 2 / 4)
+
+    return float(max(center - margin, 0.0)), float(center + margin)
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
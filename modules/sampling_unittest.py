@@ -0,0 +1,57 @@
+import unittest
+import warnings
+import gzip
+import os
+
+import raw_data
+import sampling
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        # Metade das linhas é curta e metade é longa, alternadas
+        lines = [f'{i};1;' if i % 2 else f'{i};2;' + 'x' * 200 for i in range(10000)]
+        self.text = ('ID;A;P\n' + '\n'.join(lines) + '\n').encode()
+        with open('input.csv', 'wb') as file:
+            file.write(self.text)
+
+    def tearDown(self):
+        for path in ['input.csv', 'input.csv.gz']:
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Teste 1: a amostra por posições deve ser uniforme, sem favorecer as linhas longas, e estimar a quantidade de linhas
+    def test_sample_lines_uniform(self):
+        lines, total = sampling.sample_lines('input.csv', 2000, 3, seed=0)
+
+        self.assertEqual(len(lines), 2000)
+        self.assertEqual(len(set(lines)), 2000)
+        long_share = sum(line.split(b';')[1] == b'2' for line in lines) / len(lines)
+        self.assertAlmostEqual(long_share, 0.5, delta=0.05)
+        self.assertAlmostEqual(total, 10000, delta=500)
+
+    # Teste 2: a amostra durante a leitura deve ter o tamanho pedido, sem repetições, na ordem do arquivo
+    def test_sample_records_compressed(self):
+        with gzip.open('input.csv.gz', 'wb') as file:
+            file.write(self.text)
+        options = raw_data.reader_options('input.csv.gz', 'ID', [])
+
+        records, total = sampling.sample_records('input.csv.gz', options, 300, seed=0, chunksize=1000)
+        numbers = [int(record.split(b';')[0]) for record in records]
+
+        self.assertEqual(total, 10000)
+        self.assertEqual(len(records), 300)
+        self.assertEqual(numbers, sorted(set(numbers)))
+        self.assertFalse(sampling.is_seekable('input.csv.gz'))
+
+    # Teste 3: sem nenhuma linha aceita nos sorteios, a amostra deve ser vazia, sem estimativa NaN
+    def test_sample_lines_all_rejected(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            lines, total = sampling.sample_lines('input.csv', 5, 0, seed=0)
+
+        self.assertEqual((lines, total), ([], 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,199 @@
+"""
+Módulo de Esquema dos Dados Tratados
+
+Este módulo contém funções para definir o tipo de cada coluna do conjunto de dados tratados a partir do arquivo de configuração, usando o menor tipo inteiro capaz de representar os valores aceitos. O esquema é gravado ao lado dos dados tratados e usado por todos os leitores.
+
+Funcionalidades:
+- Encontra o menor tipo inteiro que representa um conjunto de valores.
+- Infere o tipo de cada coluna a partir das restrições e dos tipos declarados na configuração.
+- Converte um DataFrame para o esquema, verificando se os valores cabem em cada tipo.
+- Grava e lê o esquema de um conjunto de dados tratados.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+import json
+import os
+
+
+# Tipo das colunas sem restrição nem tipo declarado na configuração
+default_dtype = 'int32'
+
+
+def narrowest_integer(values: list[int]) -> str:
+    """Retorna o menor tipo inteiro com sinal capaz de representar todos os valores.
+
+    Parameters
+    ----------
+    values : list[int]
+        Valores a serem representados
+
+    Returns
+    -------
+    str
+        Nome do tipo ('int8', 'int16', 'int32' ou 'int64')
+
+    Examples
+    --------
+    >>> narrowest_integer([1, 2, 3, 9])
+    'int8'
+    >>> narrowest_integer([0, 9999])
+    'int16'
+    """
+    low, high = min(values), max(values)
+
+    for dtype in ('int8', 'int16', 'int32'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+
+    return 'int64'
+
+
+def infer_schema(config_data: dict, columns: list[str]) -> dict[str, str]:
+    """Infere o tipo de cada coluna dos dados tratados. Os tipos declarados em
+    ``column_dtypes`` na configuração têm prioridade; colunas com restrições usam o
+    menor tipo inteiro que representa os valores aceitos e o valor de preenchimento;
+    as demais usam ``np.int32``.
+
+    Parameters
+    ----------
+    config_data : dict
+        Configurações da limpeza
+    columns : list[str]
+        Colunas dos dados tratados
+
+    Returns
+    -------
+    dict[str, str]
+        Dicionário com o nome do tipo de cada coluna
+
+    Examples
+    --------
+    >>> config_data = {'restrictions': {'A': [1, 2, 9]}, 'columns_to_fill_values': {}, 'column_dtypes': {'B': 'int16'}}
+    >>> infer_schema(config_data, ['A', 'B', 'C'])
+    {'A': 'int8', 'B': 'int16', 'C': 'int32'}
+    """
+    restrictions = config_data.get('restrictions', {})
+    fill_values = config_data.get('columns_to_fill_values', {})
+    column_dtypes = config_data.get('column_dtypes') or {}
+
+    dtypes = {}
+    for column in columns:
+        if column in column_dtypes:
+            dtypes[column] = column_dtypes[column]
+        elif column in restrictions:
+            values = list(restrictions[column])
+            if column in fill_values:
+                values.append(fill_values[column])
+            dtypes[column] = narrowest_integer(values)
+        else:
+            dtypes[column] = default_dtype
+
+    return dtypes
+
+
+def apply_schema(df: pd.DataFrame, dtypes: dict[str, str]) -> pd.DataFrame:
+    """Converte as colunas de um DataFrame para os tipos do esquema. Colunas fora do
+    esquema não são alteradas.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame a ser convertido
+    dtypes : dict[str, str]
+        Tipo de cada coluna
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame convertido
+
+    Raises
+    ------
+    ValueError
+        Algum valor não cabe no tipo inteiro da sua coluna
+
+    Examples
+    --------
+    >>> df = apply_schema(pd.DataFrame({'A': [1, 2], 'B': [300, 400]}), {'A': 'int8'})
+    >>> df.dtypes.to_dict()
+    {'A': dtype('int8'), 'B': dtype('int64')}
+    >>> apply_schema(pd.DataFrame({'A': [1, 200]}), {'A': 'int8'})
+    Traceback (most recent call last):
+    ...
+    ValueError: Erro: valores da coluna A não cabem no tipo int8.
+    """
+    dtypes = {column: dtype for column, dtype in dtypes.items() if column in df.columns}
+
+    for column, dtype in dtypes.items():
+        if dtype == 'category' or df.empty:
+            continue
+
+        # A conversão para um tipo inteiro menor não pode alterar os valores
+        info = np.iinfo(dtype)
+        if df[column].min() < info.min or df[column].max() > info.max:
+            raise ValueError(f"Erro: valores da coluna {column} não cabem no tipo {dtype}.")
+
+    return df.astype(dtypes)
+
+
+def schema_path(path: str) -> str:
+    """Retorna o endereço do arquivo com o esquema de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    str
+        Endereço do esquema
+
+    Examples
+    --------
+    >>> schema_path('data/dados.csv')
+    'data/dados.csv.schema.json'
+    """
+    return path.rstrip('/\\') + '.schema.json'
+
+
+def save_schema(path: str, dtypes: dict[str, str]):
+    """Grava o esquema de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+    dtypes : dict[str, str]
+        Tipo de cada coluna
+    """
+    with open(schema_path(path), 'w') as file:
+        json.dump(dtypes, file, indent=1)
+
+
+def load_schema(path: str) -> dict[str, str]:
+    """Lê o esquema de um conjunto de dados tratados.
+
+    Parameters
+    ----------
+    path : str
+        Endereço do arquivo ou diretório com os dados tratados
+
+    Returns
+    -------
+    dict[str, str]
+        Tipo de cada coluna, ou um dicionário vazio se o esquema não existir
+    """
+    if not os.path.exists(schema_path(path)):
+        return {}
+
+    with open(schema_path(path), 'r') as file:
+        return json.load(file)
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
@@ -0,0 +1,59 @@
+import unittest
+import os
+import pandas as pd
+import numpy as np
+
+import schema
+import dataset
+
+
+class TestSchema(unittest.TestCase):
+    def tearDown(self):
+        for path in ['output.csv', schema.schema_path('output.csv')]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Teste 1: colunas com restrições usam o menor tipo que representa os valores aceitos
+    def test_infer_schema_restrictions(self):
+        config_data = {'restrictions': {'A': [1, 2, 9], 'B': [0, 200]}, 'columns_to_fill_values': {}}
+
+        dtypes = schema.infer_schema(config_data, ['A', 'B', 'C'])
+
+        self.assertEqual(dtypes, {'A': 'int8', 'B': 'int16', 'C': 'int32'})
+
+    # Teste 2: o valor de preenchimento também deve caber no tipo da coluna
+    def test_infer_schema_fill_value(self):
+        config_data = {'restrictions': {'A': [1, 2]}, 'columns_to_fill_values': {'A': 1000}}
+
+        self.assertEqual(schema.infer_schema(config_data, ['A']), {'A': 'int16'})
+
+    # Teste 3: tipos declarados na configuração têm prioridade sobre as restrições
+    def test_infer_schema_declared_dtypes(self):
+        config_data = {'restrictions': {'A': [1, 2]}, 'columns_to_fill_values': {},
+                       'column_dtypes': {'A': 'category', 'B': 'int16'}}
+
+        self.assertEqual(schema.infer_schema(config_data, ['A', 'B']), {'A': 'category', 'B': 'int16'})
+
+    # Teste 4: valores que não cabem no tipo devem gerar erro, em vez de serem alterados
+    def test_apply_schema_overflow(self):
+        df = pd.DataFrame({'A': [1, 128]})
+
+        with self.assertRaises(ValueError):
+            schema.apply_schema(df, {'A': 'int8'})
+
+    # Teste 5: os leitores do conjunto de dados usam o esquema gravado
+    def test_read_dataset_with_schema(self):
+        df = pd.DataFrame({'CODMUNNASC': [120001, 355030], 'PESO': [3000, 3100], 'SEXO': [1, 2]})
+        df.to_csv('output.csv', sep=';')
+        schema.save_schema('output.csv', {'CODMUNNASC': 'int32', 'PESO': 'int16', 'SEXO': 'int8'})
+
+        read_df = dataset.read_dataset('output.csv', ['PESO', 'SEXO'])
+        chunk = next(dataset.iter_dataset('output.csv', ['SEXO']))
+
+        self.assertEqual(read_df['PESO'].dtype, np.int16)
+        self.assertEqual(read_df['SEXO'].dtype, np.int8)
+        self.assertEqual(chunk['SEXO'].dtype, np.int8)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
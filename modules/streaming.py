@@ -0,0 +1,448 @@
+"""
+Módulo de Estatísticas em Fluxo
+
+Este módulo contém acumuladores de estatísticas que podem ser atualizados bloco a bloco e combinados entre si, permitindo calcular estatísticas exatas de um arquivo inteiro sem carregá-lo na memória.
+
+Funcionalidades:
+- Acumula contagem, média e variância de várias colunas pelo algoritmo de Welford.
+- Acumula contagem, média e variância de várias colunas por grupo, como a UF ou uma coluna categórica.
+- Acumula a distribuição de colunas de valores inteiros em um histograma, que fornece quantis, medianas e o desvio absoluto mediano (MAD) exatos sem ordenar o arquivo.
+- Combina acumuladores calculados em blocos diferentes.
+
+"""
+
+import pandas as pd
+import numpy as np
+import doctest
+
+
+class RunningStats:
+    """Acumulador de contagem, média e soma dos quadrados dos desvios (M2) de
+    várias colunas, atualizado bloco a bloco pelo algoritmo de Welford na forma
+    em lotes de Chan et al. Valores ausentes são ignorados.
+
+    Parameters
+    ----------
+    columns : list[str]
+        Colunas acumuladas
+
+    Examples
+    --------
+    >>> stats = RunningStats(['A'])
+    >>> stats.update(pd.DataFrame({'A': [1, 2, 3]}))
+    >>> other = RunningStats(['A'])
+    >>> other.update(pd.DataFrame({'A': [4, np.nan, 5]}))
+    >>> stats.merge(other).means()
+    A    3.0
+    dtype: float64
+    >>> stats.stds()
+    A    1.581139
+    dtype: float64
+    """
+    def __init__(self, columns: list[str]):
+        self.columns = list(columns)
+        self.count = np.zeros(len(self.columns))
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+
+    def update(self, df: pd.DataFrame):
+        """Acumula os valores de um bloco.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Bloco com as colunas acumuladas
+
+        Raises
+        ------
+        KeyError
+            Alguma coluna acumulada não existe no bloco
+        """
+        try:
+            values = df[self.columns].to_numpy(dtype=np.float64)
+        except KeyError:
+            raise KeyError(f"Erro: conjunto de colunas {self.columns} inválido")
+
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, values, 0).sum(axis=0) / count
+            m2 = np.where(valid, (values - mean) ** 2, 0).sum(axis=0)
+
+        self._combine(count, mean, m2)
+
+    def add_constant(self, column: str, value: float, count: int):
+        """Acumula ``count`` cópias de um mesmo valor em uma coluna.
+
+        Parameters
+        ----------
+        column : str
+            Coluna acumulada
+        value : float
+            Valor repetido
+        count : int
+            Quantidade de cópias
+        """
+        counts = np.zeros(len(self.columns))
+        means = np.zeros(len(self.columns))
+        counts[self.columns.index(column)] = count
+        means[self.columns.index(column)] = value
+
+        self._combine(counts, means, np.zeros(len(self.columns)))
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """Combina outro acumulador das mesmas colunas com este.
+
+        Parameters
+        ----------
+        other : RunningStats
+            Acumulador a ser combinado
+
+        Returns
+        -------
+        RunningStats
+            O próprio acumulador, já combinado
+        """
+        if other.columns != self.columns:
+            raise ValueError("Erro: os acumuladores devem ter as mesmas colunas.")
+
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, count: np.ndarray, mean: np.ndarray, m2: np.ndarray):
+        """Combina contagem, média e M2 de um lote com os valores acumulados."""
+        total = self.count + count
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            new_mean = self.mean + delta * count / total
+            new_m2 = self.m2 + m2 + delta ** 2 * self.count * count / total
+
+        # Lotes vazios não alteram o acumulador
+        non_empty = count > 0
+        self.mean = np.where(non_empty, new_mean, self.mean)
+        self.m2 = np.where(non_empty, new_m2, self.m2)
+        self.count = total
+
+    def means(self) -> pd.Series:
+        """Retorna a média de cada coluna (NaN para colunas sem valores)."""
+        return pd.Series(np.where(self.count > 0, self.mean, np.nan), index=self.columns)
+
+    def stds(self, ddof: int = 1) -> pd.Series:
+        """Retorna o desvio padrão de cada coluna, com ``ddof`` graus de liberdade
+        descontados, como em ``pd.DataFrame.std``.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+        return pd.Series(np.sqrt(variance), index=self.columns)
+
+
+class GroupedStats:
+    """Acumulador de contagem, média e M2 de várias colunas para cada grupo, como o
+    ``RunningStats``, mas com uma linha por grupo. Os grupos são identificados por
+    chaves numéricas, como os códigos de uma coluna categórica ou da UF; linhas sem
+    chave ou valores ausentes são ignorados. As somas de cada grupo são calculadas de
+    forma vetorizada com ``np.bincount``, sem laços por grupo.
+
+    Parameters
+    ----------
+    columns : list[str]
+        Colunas acumuladas
+
+    Examples
+    --------
+    >>> stats = GroupedStats(['A'])
+    >>> stats.update(pd.DataFrame({'A': [1, 3, 10]}), np.array([1, 1, 2]))
+    >>> other = GroupedStats(['A'])
+    >>> other.update(pd.DataFrame({'A': [5, 20, np.nan]}), np.array([1, 2, 3]))
+    >>> stats.merge(other).means()
+            A
+    1.0   3.0
+    2.0  15.0
+    3.0   NaN
+    >>> stats.stds()['A'].tolist()
+    [2.0, 7.0710678118654755, nan]
+    """
+    def __init__(self, columns: list[str]):
+        self.columns = list(columns)
+        self.keys = np.zeros(0)
+        self.count = np.zeros((0, len(self.columns)))
+        self.mean = np.zeros((0, len(self.columns)))
+        self.m2 = np.zeros((0, len(self.columns)))
+
+    def update(self, df: pd.DataFrame, keys: np.ndarray):
+        """Acumula os valores de um bloco, cada linha no grupo da sua chave.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Bloco com as colunas acumuladas
+        keys : np.ndarray
+            Chave do grupo de cada linha do bloco
+
+        Raises
+        ------
+        KeyError
+            Alguma coluna acumulada não existe no bloco
+        """
+        try:
+            values = df[self.columns].to_numpy(dtype=np.float64)
+        except KeyError:
+            raise KeyError(f"Erro: conjunto de colunas {self.columns} inválido")
+
+        keys = np.asarray(keys, dtype=np.float64)
+        has_key = ~np.isnan(keys)
+        groups, inverse = np.unique(keys[has_key], return_inverse=True)
+        values = values[has_key]
+
+        count = np.zeros((len(groups), len(self.columns)))
+        mean = np.zeros((len(groups), len(self.columns)))
+        m2 = np.zeros((len(groups), len(self.columns)))
+        for position in range(len(self.columns)):
+            column = values[:, position]
+            valid = ~np.isnan(column)
+            group = inverse[valid]
+
+            count[:, position] = np.bincount(group, minlength=len(groups))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean[:, position] = np.bincount(group, weights=column[valid], minlength=len(groups)) / count[:, position]
+            deviations = (column[valid] - mean[group, position]) ** 2
+            m2[:, position] = np.bincount(group, weights=deviations, minlength=len(groups))
+
+        self._combine(groups, count, np.nan_to_num(mean), m2)
+
+    def add_constant(self, key: float, column: str, value: float, count: int):
+        """Acumula ``count`` cópias de um mesmo valor em uma coluna de um grupo.
+
+        Parameters
+        ----------
+        key : float
+            Chave do grupo
+        column : str
+            Coluna acumulada
+        value : float
+            Valor repetido
+        count : int
+            Quantidade de cópias
+        """
+        counts = np.zeros((1, len(self.columns)))
+        means = np.zeros((1, len(self.columns)))
+        counts[0, self.columns.index(column)] = count
+        means[0, self.columns.index(column)] = value
+
+        self._combine(np.array([key], dtype=np.float64), counts, means, np.zeros((1, len(self.columns))))
+
+    def merge(self, other: 'GroupedStats') -> 'GroupedStats':
+        """Combina outro acumulador das mesmas colunas com este.
+
+        Parameters
+        ----------
+        other : GroupedStats
+            Acumulador a ser combinado
+
+        Returns
+        -------
+        GroupedStats
+            O próprio acumulador, já combinado
+        """
+        if other.columns != self.columns:
+            raise ValueError("Erro: os acumuladores devem ter as mesmas colunas.")
+
+        self._combine(other.keys, other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, keys: np.ndarray, count: np.ndarray, mean: np.ndarray, m2: np.ndarray):
+        """Combina contagem, média e M2 de cada grupo de um lote com os valores
+        acumulados, usando a união das chaves dos dois."""
+        union = np.union1d(self.keys, keys)
+
+        def expand(source_keys, array):
+            result = np.zeros((len(union), len(self.columns)))
+            result[np.searchsorted(union, source_keys)] = array
+            return result
+
+        self_count, self_mean, self_m2 = (expand(self.keys, array) for array in (self.count, self.mean, self.m2))
+        count, mean, m2 = (expand(keys, array) for array in (count, mean, m2))
+        total = self_count + count
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self_mean
+            new_mean = self_mean + delta * count / total
+            new_m2 = self_m2 + m2 + delta ** 2 * self_count * count / total
+
+        non_empty = count > 0
+        self.keys = union
+        self.mean = np.where(non_empty, new_mean, self_mean)
+        self.m2 = np.where(non_empty, new_m2, self_m2)
+        self.count = total
+
+    def means(self) -> pd.DataFrame:
+        """Retorna a média de cada coluna em cada grupo (NaN para grupos sem valores),
+        com as chaves dos grupos como índice."""
+        return pd.DataFrame(np.where(self.count > 0, self.mean, np.nan), index=self.keys, columns=self.columns)
+
+    def stds(self, ddof: int = 1) -> pd.DataFrame:
+        """Retorna o desvio padrão de cada coluna em cada grupo, com ``ddof`` graus de
+        liberdade descontados, como em ``pd.DataFrame.std``.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+        return pd.DataFrame(np.sqrt(variance), index=self.keys, columns=self.columns)
+
+
+
+class QuantileSketch:
+    """Resumo da distribuição de várias colunas que pode ser atualizado bloco a bloco
+    e combinado com outros, como o ``RunningStats``. Cada coluna é guardada como um
+    histograma com a contagem de cada valor distinto, que ocupa pouca memória em
+    colunas de valores inteiros pequenos (como QTDPARTCES ou CONSPRENAT) e fornece
+    quantis exatos sem ordenar os dados. Valores ausentes são ignorados.
+
+    Parameters
+    ----------
+    columns : list[str]
+        Colunas acumuladas
+
+    Examples
+    --------
+    >>> sketch = QuantileSketch(['A'])
+    >>> sketch.update(pd.DataFrame({'A': [0, 0, 1, 0]}))
+    >>> other = QuantileSketch(['A'])
+    >>> other.update(pd.DataFrame({'A': [0, 9, np.nan]}))
+    >>> sketch.merge(other).medians()
+    A    0.0
+    dtype: float64
+    >>> sketch.mads()
+    A    0.0
+    dtype: float64
+    >>> sketch.scales()
+    A    2.088857
+    dtype: float64
+    """
+    # Constantes que tornam o MAD e o desvio absoluto médio estimativas do desvio
+    # padrão em uma distribuição normal
+    mad_constant = 1.4826
+    mean_ad_constant = 1.253314
+
+    def __init__(self, columns: list[str]):
+        self.columns = list(columns)
+        self.counts = {column: pd.Series(dtype=np.float64) for column in self.columns}
+
+    def update(self, df: pd.DataFrame):
+        """Acumula os valores de um bloco.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Bloco com as colunas acumuladas
+
+        Raises
+        ------
+        KeyError
+            Alguma coluna acumulada não existe no bloco
+        """
+        for column in self.columns:
+            try:
+                values = df[column]
+            except KeyError:
+                raise KeyError(f"Erro: conjunto de colunas {self.columns} inválido")
+
+            # Contagem por tabela de dispersão, sem ordenar os valores
+            counts = values.astype(np.float64).value_counts(sort=False, dropna=True)
+            self.counts[column] = self.counts[column].add(counts.astype(np.float64), fill_value=0)
+
+    def add_constant(self, column: str, value: float, count: int):
+        """Acumula ``count`` cópias de um mesmo valor em uma coluna.
+
+        Parameters
+        ----------
+        column : str
+            Coluna acumulada
+        value : float
+            Valor repetido
+        count : int
+            Quantidade de cópias
+        """
+        counts = pd.Series([float(count)], index=[float(value)])
+        self.counts[column] = self.counts[column].add(counts, fill_value=0)
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Combina outro resumo das mesmas colunas com este.
+
+        Parameters
+        ----------
+        other : QuantileSketch
+            Resumo a ser combinado
+
+        Returns
+        -------
+        QuantileSketch
+            O próprio resumo, já combinado
+        """
+        if other.columns != self.columns:
+            raise ValueError("Erro: os acumuladores devem ter as mesmas colunas.")
+
+        for column in self.columns:
+            self.counts[column] = self.counts[column].add(other.counts[column], fill_value=0)
+        return self
+
+    @staticmethod
+    def _quantile(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+        """Quantil ``q`` de valores com as contagens informadas, com a interpolação
+        linear de ``np.quantile``."""
+        if counts.sum() == 0:
+            return np.nan
+
+        order = np.argsort(values)
+        values, cumulative = values[order], np.cumsum(counts[order])
+
+        # Posições (a partir de zero) dos dois valores usados na interpolação
+        position = (cumulative[-1] - 1) * q
+        lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+
+        return lower + (position - np.floor(position)) * (upper - lower)
+
+    def quantiles(self, q: float) -> pd.Series:
+        """Retorna o quantil ``q`` (entre 0 e 1) de cada coluna, como em
+        ``pd.DataFrame.quantile`` (NaN para colunas sem valores)."""
+        return pd.Series([self._quantile(self.counts[column].index.to_numpy(), self.counts[column].to_numpy(), q)
+                          for column in self.columns], index=self.columns, dtype=np.float64)
+
+    def medians(self) -> pd.Series:
+        """Retorna a mediana de cada coluna."""
+        return self.quantiles(0.5)
+
+    def mads(self) -> pd.Series:
+        """Retorna o desvio absoluto mediano (MAD) de cada coluna, a mediana das
+        distâncias de cada valor à mediana, calculado sobre o mesmo histograma."""
+        medians = self.medians()
+        return pd.Series([self._quantile(np.abs(self.counts[column].index.to_numpy() - medians[column]),
+                                         self.counts[column].to_numpy(), 0.5)
+                          for column in self.columns], index=self.columns, dtype=np.float64)
+
+    def scales(self) -> pd.Series:
+        """Retorna a escala robusta de cada coluna, usada no lugar do desvio padrão:
+        o MAD multiplicado por 1,4826 ou, quando o MAD é zero (mais da metade dos
+        valores iguais à mediana, comum em contagens como QTDPARTCES), o desvio absoluto
+        médio em relação à mediana multiplicado por 1,253314."""
+        medians, mads = self.medians(), self.mads()
+
+        scales = []
+        for column in self.columns:
+            counts = self.counts[column]
+            if mads[column] > 0 or counts.sum() == 0:
+                scales.append(self.mad_constant * mads[column])
+                continue
+
+            mean_ad = (np.abs(counts.index.to_numpy() - medians[column]) * counts.to_numpy()).sum() / counts.sum()
+            scales.append(self.mean_ad_constant * mean_ad)
+
+        return pd.Series(scales, index=self.columns, dtype=np.float64)
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
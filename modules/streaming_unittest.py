@@ -0,0 +1,75 @@
+import unittest
+import pandas as pd
+import pandas.testing as pd_testing
+import numpy as np
+
+import streaming
+
+
+class TestStreaming(unittest.TestCase):
+    # Teste 1: acumuladores combinados devem ter a média e o desvio padrão do DataFrame inteiro
+    def test_running_stats_merge_equals_full(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'A': rng.normal(10, 3, 1000),
+            'B': rng.integers(0, 100, 1000).astype(float)
+        })
+        df.loc[df.sample(100, random_state=0).index, 'B'] = np.nan
+
+        stats = streaming.RunningStats(['A', 'B'])
+        for start in range(0, 1000, 300):
+            chunk_stats = streaming.RunningStats(['A', 'B'])
+            chunk_stats.update(df.iloc[start:start + 300])
+            stats.merge(chunk_stats)
+
+        pd_testing.assert_series_equal(stats.means(), df.mean())
+        pd_testing.assert_series_equal(stats.stds(), df.std())
+
+    # Teste 2: função add_constant deve equivaler a acumular cópias do valor
+    def test_running_stats_add_constant(self):
+        stats = streaming.RunningStats(['A'])
+        stats.update(pd.DataFrame({'A': [1.0, 2.0, 6.0]}))
+        stats.add_constant('A', 3.0, 2)
+
+        expected = pd.Series([1.0, 2.0, 6.0, 3.0, 3.0])
+
+        self.assertAlmostEqual(stats.means()['A'], expected.mean())
+        self.assertAlmostEqual(stats.stds()['A'], expected.std())
+
+    # Teste 3: coluna sem valores deve ter média ausente
+    def test_running_stats_empty_column(self):
+        stats = streaming.RunningStats(['A'])
+        stats.update(pd.DataFrame({'A': [np.nan, np.nan]}))
+
+        self.assertTrue(np.isnan(stats.means()['A']))
+        self.assertTrue(np.isnan(stats.stds()['A']))
+
+    # Teste 4: bloco sem a coluna acumulada deve levantar erro
+    def test_running_stats_invalid_column(self):
+        stats = streaming.RunningStats(['A'])
+
+        with self.assertRaises(KeyError):
+            stats.update(pd.DataFrame({'B': [1, 2]}))
+
+    # Teste 5: histogramas combinados devem ter os quantis, a mediana e o MAD do DataFrame inteiro
+    def test_quantile_sketch_merge_equals_full(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'A': rng.poisson(1.5, 1001).astype(float),
+            'B': rng.integers(0, 100, 1001).astype(float)
+        })
+        df.loc[df.sample(100, random_state=0).index, 'B'] = np.nan
+
+        sketch = streaming.QuantileSketch(['A', 'B'])
+        for start in range(0, 1001, 300):
+            chunk_sketch = streaming.QuantileSketch(['A', 'B'])
+            chunk_sketch.update(df.iloc[start:start + 300])
+            sketch.merge(chunk_sketch)
+
+        for q in [0.0, 0.1, 0.5, 0.75, 1.0]:
+            pd_testing.assert_series_equal(sketch.quantiles(q), df.quantile(q), check_names=False)
+        pd_testing.assert_series_equal(sketch.mads(), (df - df.median()).abs().median())
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,211 @@
+"""
+Módulo do Grafo de Tarefas
+
+Este módulo contém um agendador de tarefas em grafo, usado por main.py para executar a limpeza, a preparação dos dados e cada análise e gráfico em um único processo. Cada tarefa declara as tarefas de que depende, é executada uma única vez, assim que as dependências terminam, e recebe os resultados delas, de forma que os resultados intermediários, como os dados lidos, são compartilhados entre as tarefas. Tarefas independentes são executadas ao mesmo tempo em threads, e o tempo total fica limitado pelo ramo mais lento do grafo, e não pela soma das tarefas. Tarefas que usam um recurso que não pode ser usado por várias threads ao mesmo tempo, como o estado global do matplotlib, compartilham uma trava.
+
+Funcionalidades:
+- Declara tarefas com as suas dependências e valida o grafo (nomes repetidos, dependências inexistentes e ciclos).
+- Executa cada tarefa uma única vez, em threads, passando os resultados das dependências.
+- Executa uma por vez as tarefas que compartilham uma trava.
+- Interrompe o agendamento no primeiro erro e o levanta depois que as tarefas em andamento terminam.
+- Importa os módulos de um diretório de análise sem conflito com os módulos de mesmo nome de outros diretórios.
+
+"""
+
+import doctest
+import importlib
+import os
+import sys
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class TaskGraph:
+    """Grafo de tarefas com dependências. Cada tarefa é uma função chamada com os
+    resultados das suas dependências, na ordem em que foram declaradas.
+
+    Examples
+    --------
+    >>> graph = TaskGraph()
+    >>> graph.add('dados', lambda: [3, 1, 2])
+    >>> graph.add('soma', sum, ['dados'])
+    >>> graph.add('maior', max, ['dados'])
+    >>> graph.add('resumo', lambda soma, maior: f'{soma} {maior}', ['soma', 'maior'])
+    >>> graph.order()
+    ['dados', 'soma', 'maior', 'resumo']
+    >>> graph.run(jobs=2)['resumo']
+    '6 3'
+    """
+    def __init__(self):
+        self.tasks = {}
+        self.seconds = {}
+
+    def add(self, name: str, function, dependencies: list[str] = (), lock=None):
+        """Declara uma tarefa.
+
+        Parameters
+        ----------
+        name : str
+            Nome da tarefa
+        function : Callable
+            Função chamada com os resultados das dependências
+        dependencies : list[str], optional
+            Nomes das tarefas de que a tarefa depende
+        lock : threading.Lock, optional
+            Trava mantida durante a execução da tarefa, compartilhada pelas tarefas que
+            não podem ser executadas ao mesmo tempo
+
+        Raises
+        ------
+        ValueError
+            Já existe uma tarefa com o mesmo nome
+        """
+        if name in self.tasks:
+            raise ValueError(f"Erro: a tarefa {name} já foi declarada.")
+
+        self.tasks[name] = (function, list(dependencies), lock)
+
+    def order(self) -> list[str]:
+        """Ordena as tarefas de forma que cada uma venha depois das suas dependências.
+
+        Returns
+        -------
+        list[str]
+            Nomes das tarefas em ordem de execução
+
+        Raises
+        ------
+        ValueError
+            Uma tarefa depende de uma tarefa não declarada ou o grafo possui um ciclo
+        """
+        pending = {}
+        for name, (_, dependencies, _) in self.tasks.items():
+            for dependency in dependencies:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Erro: a tarefa {name} depende da tarefa {dependency}, que não foi declarada.")
+            pending[name] = set(dependencies)
+
+        order = []
+        while pending:
+            ready = [name for name, dependencies in pending.items() if not dependencies]
+            if not ready:
+                raise ValueError(f"Erro: as tarefas {', '.join(sorted(pending))} possuem dependências circulares.")
+
+            for name in ready:
+                del pending[name]
+                for dependencies in pending.values():
+                    dependencies.discard(name)
+            order += ready
+
+        return order
+
+    def _call(self, name: str, arguments: list):
+        """Executa uma tarefa, mantendo a sua trava, e registra o tempo de execução."""
+        function, _, lock = self.tasks[name]
+
+        with lock if lock is not None else nullcontext():
+            start = time.perf_counter()
+            result = function(*arguments)
+            self.seconds[name] = time.perf_counter() - start
+
+        return result
+
+    def run(self, jobs: int = None) -> dict:
+        """Executa as tarefas, cada uma assim que as suas dependências terminam. Se uma
+        tarefa falhar, nenhuma outra tarefa é iniciada, e o erro é levantado depois que
+        as tarefas em andamento terminam.
+
+        Parameters
+        ----------
+        jobs : int, optional
+            Quantidade de threads. Se não for informada, usa o padrão de
+            ``ThreadPoolExecutor``
+
+        Returns
+        -------
+        dict
+            Resultado de cada tarefa
+
+        Raises
+        ------
+        ValueError
+            O grafo é inválido (ver ``order``)
+        """
+        self.order()
+
+        pending = {name: set(dependencies) for name, (_, dependencies, _) in self.tasks.items()}
+        results = {}
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            while True:
+                # Inicia as tarefas cujas dependências já terminaram
+                if error is None:
+                    for name in [name for name, dependencies in pending.items() if not dependencies]:
+                        del pending[name]
+                        arguments = [results[dependency] for dependency in self.tasks[name][1]]
+                        running[executor.submit(self._call, name, arguments)] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as exception:
+                        error = error or exception
+                        continue
+
+                    for dependencies in pending.values():
+                        dependencies.discard(name)
+
+        if error is not None:
+            raise error
+
+        return results
+
+
+def import_modules(directory: str, names: list[str]) -> list:
+    """Importa módulos de um diretório de análise, que importam uns aos outros pelo nome
+    (como ``analysis`` e ``visualization``), sem conflito com os módulos de mesmo nome
+    de outros diretórios ou da biblioteca padrão. Os módulos do diretório ficam
+    disponíveis somente durante a importação; depois dela, os módulos de mesmo nome
+    importados antes voltam a ser usados.
+
+    Parameters
+    ----------
+    directory : str
+        Diretório com os módulos
+    names : list[str]
+        Nomes dos módulos importados
+
+    Returns
+    -------
+    list
+        Módulos importados, na ordem de ``names``
+    """
+    local = {os.path.splitext(entry)[0] for entry in os.listdir(directory)
+             if entry.endswith('.py') or os.path.isfile(os.path.join(directory, entry, '__init__.py'))}
+
+    def is_local(module: str) -> bool:
+        return module.split('.')[0] in local
+
+    saved = {module: sys.modules.pop(module) for module in list(sys.modules) if is_local(module)}
+    sys.path.insert(0, directory)
+    try:
+        modules = [importlib.import_module(name) for name in names]
+    finally:
+        sys.path.remove(directory)
+        for module in [module for module in sys.modules if is_local(module)]:
+            del sys.modules[module]
+        sys.modules.update(saved)
+
+    return modules
+
+
+if __name__ == "__main__":
+    doctest.testmod(verbose=True)
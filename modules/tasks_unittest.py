@@ -0,0 +1,124 @@
+import unittest
+import threading
+import tempfile
+import time
+import os
+import sys
+import pandas as pd
+
+import tasks
+
+
+class TestTasks(unittest.TestCase):
+    # Teste 1: cada tarefa deve ser executada uma única vez, depois das dependências, com os resultados delas
+    def test_run_once_with_shared_results(self):
+        calls = []
+
+        def task(name, function):
+            def run(*arguments):
+                calls.append(name)
+                return function(*arguments)
+            return run
+
+        graph = tasks.TaskGraph()
+        graph.add('dados', task('dados', lambda: list(range(10))))
+        graph.add('pares', task('pares', lambda dados: [x for x in dados if x % 2 == 0]), ['dados'])
+        graph.add('soma', task('soma', sum), ['dados'])
+        graph.add('resumo', task('resumo', lambda pares, soma: (len(pares), soma)), ['pares', 'soma'])
+        results = graph.run(jobs=4)
+
+        self.assertEqual(results['resumo'], (5, 45))
+        self.assertEqual(sorted(calls), ['dados', 'pares', 'resumo', 'soma'])
+        self.assertEqual(calls[0], 'dados')
+        self.assertEqual(calls[-1], 'resumo')
+        self.assertEqual(set(graph.seconds), set(calls))
+
+    # Teste 2: ramos independentes devem ser executados ao mesmo tempo, e tarefas com a mesma trava, uma por vez
+    def test_parallel_branches_and_lock(self):
+        graph = tasks.TaskGraph()
+        graph.add('inicio', lambda: None)
+        for branch in range(4):
+            graph.add(f'ramo {branch}', lambda _: time.sleep(0.3), ['inicio'])
+
+        start = time.perf_counter()
+        graph.run(jobs=4)
+        self.assertLess(time.perf_counter() - start, 0.9)
+
+        lock = threading.Lock()
+        active = []
+        largest = []
+
+        def locked():
+            active.append(True)
+            largest.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+
+        graph = tasks.TaskGraph()
+        for figure in range(4):
+            graph.add(f'figura {figure}', locked, lock=lock)
+        graph.run(jobs=4)
+
+        self.assertEqual(max(largest), 1)
+
+    # Teste 3: grafos inválidos devem ser recusados, e o erro de uma tarefa deve impedir as dependentes
+    def test_invalid_graph_and_errors(self):
+        graph = tasks.TaskGraph()
+        graph.add('a', lambda: 1)
+        with self.assertRaises(ValueError):
+            graph.add('a', lambda: 2)
+
+        graph.add('b', lambda a: a, ['c'])
+        with self.assertRaises(ValueError):
+            graph.run()
+
+        graph = tasks.TaskGraph()
+        graph.add('a', lambda b: b, ['b'])
+        graph.add('b', lambda a: a, ['a'])
+        with self.assertRaises(ValueError):
+            graph.order()
+
+        calls = []
+        graph = tasks.TaskGraph()
+        graph.add('leitura', lambda: 1 / 0)
+        graph.add('grafico', lambda dados: calls.append(dados), ['leitura'])
+        with self.assertRaises(ZeroDivisionError):
+            graph.run()
+        self.assertEqual(calls, [])
+
+    # Teste 4: módulos de mesmo nome em diretórios diferentes devem ser importados separadamente
+    def test_import_modules_isolated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ['um', 'dois']:
+                os.mkdir(os.path.join(directory, name))
+                with open(os.path.join(directory, name, 'analysis.py'), 'w') as file:
+                    file.write(f"NAME = '{name}'\n")
+                with open(os.path.join(directory, name, 'make_images.py'), 'w') as file:
+                    file.write("import analysis\n")
+
+            um, = tasks.import_modules(os.path.join(directory, 'um'), ['make_images'])
+            dois, = tasks.import_modules(os.path.join(directory, 'dois'), ['make_images'])
+
+        self.assertEqual((um.analysis.NAME, dois.analysis.NAME), ('um', 'dois'))
+        self.assertNotIn('analysis', sys.modules)
+        self.assertNotIn('make_images', sys.modules)
+
+    # Teste 5: tarefas que separam o mesmo DataFrame por estado e por região ao mesmo tempo não devem interferir entre si
+    def test_shared_dataframe_between_tasks(self):
+        saulo, = tasks.import_modules(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis', 'saulo'), ['analysis'])
+        codes = ['120001', '270002', '530003', '355030', '431490'] * 2000
+
+        graph = tasks.TaskGraph()
+        graph.add('dados', lambda: pd.DataFrame({'CODMUNNASC': codes, 'CONSPRENAT': range(len(codes))}))
+        graph.add('regioes', lambda df: saulo.separate_by_location(df, saulo.region_mapping), ['dados'])
+        graph.add('estados', lambda df: saulo.separate_by_location(df, saulo.state_mapping), ['dados'])
+        results = graph.run(jobs=2)
+
+        self.assertEqual({region: len(df) for region, df in results['regioes'].items()},
+                         {'Norte': 2000, 'Nordeste': 2000, 'Sudeste': 2000, 'Sul': 2000, 'Centro-Oeste': 2000})
+        self.assertEqual(sum(len(df) for df in results['estados'].values()), len(codes))
+        self.assertTrue((results['dados']['CODMUNNASC'] == codes).all())
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)